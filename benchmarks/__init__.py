@@ -0,0 +1,23 @@
+'''
+benchmarks
+
+This package measures how fast pdxscript reads and writes pdx scripts, on
+synthetic scripts generated the same way on every run, so the results of
+two releases can be compared.
+
+Module
+-----------------------------------------------------------------------
+- `corpus` : Generate synthetic pdx scripts of several kinds and sizes.
+- `runner` : Measure each phase, save the result as JSON and compare two.
+
+Usage
+-----------------------------------------------------------------------
+$ python -m benchmarks run --size 4M --output new.json --baseline old.json
+$ python -m benchmarks compare old.json new.json --threshold 0.05
+$ python -m benchmarks corpus ./corpus --size 16M
+'''
+
+from .corpus import KINDS, generate, write_corpus
+from .runner import PHASES, run, compare, save_result, load_result
+
+__all__ = ["KINDS","PHASES","generate","write_corpus","run","compare","save_result","load_result"]
@@ -0,0 +1,128 @@
+'''
+__main__.py
+
+Command line of the benchmarks. Run it from the root of the repository.
+
+Usage
+-----------------------------------------------------------------------
+$ python -m benchmarks run [--size 1M] [--kinds focus events] [--phases parse write]
+                           [--repeat 3] [--seed 0] [--output result.json]
+                           [--baseline old.json] [--threshold 0.1]
+$ python -m benchmarks compare old.json new.json [--threshold 0.1]
+$ python -m benchmarks corpus directory [--size 1M] [--seed 0] [--kinds ...]
+
+`run` and `compare` exit with status 1 when a metric regressed by more
+than the threshold.
+'''
+
+import argparse
+import sys
+
+from .corpus import KINDS, write_corpus
+from .runner import PHASES, run, compare, save_result, load_result, _iterChange
+
+_UNITS = {"K" : 1 << 10, "M" : 1 << 20, "G" : 1 << 30}
+
+def main(arguments:list[str] = None) -> int:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Run the command line.
+
+    Return
+    -----------------------------------------------------------------------
+    int : the exit status.
+    '''
+
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks", description = "Benchmarks of pdxscript.")
+    commands = parser.add_subparsers(dest = "command", required = True)
+
+    runParser = commands.add_parser("run", help = "measure every phase on the synthetic corpus")
+    runParser.add_argument("--size", type = _getSize, default = 1 << 20, help = "characters of each script, like 512K or 4M")
+    runParser.add_argument("--kinds", nargs = "+", choices = KINDS, default = list(KINDS))
+    runParser.add_argument("--phases", nargs = "+", choices = PHASES, default = list(PHASES))
+    runParser.add_argument("--repeat", type = int, default = 3, help = "timed runs of each phase, the best is kept")
+    runParser.add_argument("--seed", type = int, default = 0)
+    runParser.add_argument("--output", help = "save the result as JSON")
+    runParser.add_argument("--baseline", help = "a saved result to compare against")
+    runParser.add_argument("--threshold", type = float, default = 0.1, help = "relative change flagged as a regression")
+
+    compareParser = commands.add_parser("compare", help = "compare two saved results")
+    compareParser.add_argument("old")
+    compareParser.add_argument("new")
+    compareParser.add_argument("--threshold", type = float, default = 0.1, help = "relative change flagged as a regression")
+
+    corpusParser = commands.add_parser("corpus", help = "write the synthetic corpus to a directory")
+    corpusParser.add_argument("directory")
+    corpusParser.add_argument("--size", type = _getSize, default = 1 << 20, help = "characters of each script, like 512K or 4M")
+    corpusParser.add_argument("--kinds", nargs = "+", choices = KINDS, default = list(KINDS))
+    corpusParser.add_argument("--seed", type = int, default = 0)
+
+    options = parser.parse_args(arguments)
+
+    if options.command == "corpus":
+
+        for kind, path in write_corpus(options.directory, options.size, options.seed, options.kinds).items():
+            print(f"{kind:<10} {path}")
+
+        return 0
+
+    if options.command == "compare":
+        return _report(load_result(options.old), load_result(options.new), options.threshold)
+
+    result = run(options.size, options.kinds, options.phases, options.repeat, options.seed)
+
+    for kind, phases in result["results"].items():
+
+        for phase, metrics in phases.items():
+            print(f"{kind:<10} {phase:<16} " + "  ".join(f"{metric} {value:.6g}" for metric, value in metrics.items()))
+
+    if options.output:
+        save_result(result, options.output)
+
+    if options.baseline:
+        return _report(load_result(options.baseline), result, options.threshold)
+
+    return 0
+
+def _getSize(text:str) -> int:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a size from text like `4096`, `512K` or `4M`.
+    '''
+
+    text = text.strip().upper().rstrip("B")
+
+    try:
+        if text and text[-1] in _UNITS:
+            return int(float(text[:-1]) * _UNITS[text[-1]])
+
+        return int(text)
+
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{text}'")
+
+def _report(old:dict, new:dict, threshold:float) -> int:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Print the relative change of every metric, marking
+    the regressions, and get the exit status.
+    '''
+
+    for kind, phase, metric, old_value, new_value, change in _iterChange(old, new):
+        mark = "  REGRESSION" if change > threshold else ""
+        print(f"{kind:<10} {phase:<16} {metric:<18} {old_value:>12.6g} -> {new_value:<12.6g} {new_value / old_value - 1:+7.1%}{mark}")
+
+    regressions = compare(old, new, threshold)
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {threshold:.0%}")
+        return 1
+
+    print(f"No regression over {threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
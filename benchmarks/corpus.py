@@ -0,0 +1,353 @@
+'''
+corpus.py
+
+This module generates synthetic pdx scripts for the benchmarks. The same
+kind, size and seed always give the same text, so runs on different
+releases read exactly the same input.
+
+Function
+-----------------------------------------------------------------------
+- `generate` : Generate a synthetic pdx script of a kind and size.
+- `write_corpus` : Write a synthetic pdx script of each kind to a directory.
+
+Usage
+-----------------------------------------------------------------------
+>>> from benchmarks.corpus import generate, write_corpus
+>>> text = generate("events", 1 << 20)
+>>> paths = write_corpus("./corpus", 4 << 20, seed = 1)
+'''
+
+import os
+import random
+import typing
+
+KINDS = ("focus", "events", "history", "triggers", "strings", "comments", "save")
+
+_TAGS = ("GER", "ENG", "FRA", "ITA", "SOV", "USA", "JAP", "FIN", "POL", "SWE", "CZE", "ROM")
+
+_IDEOLOGIES = ("democratic", "fascism", "communism", "neutrality")
+
+_EFFECTS = (
+    "add_political_power = {number}",
+    "add_stability = 0.0{digit}",
+    "add_war_support = -0.0{digit}",
+    "set_country_flag = flag_{index}",
+    "add_manpower = {number}",
+    "army_experience = {digit}",
+    "add_ideas = idea_{index}",
+    "add_timed_idea = {{ idea = idea_{index} days = {number} }}",
+    "create_wargoal = {{ type = annex_everything target = {tag} }}",
+    "add_opinion_modifier = {{ target = {tag} modifier = opinion_{index} }}",
+)
+
+_TRIGGERS = (
+    "has_war = {boolean}",
+    "tag = {tag}",
+    "has_country_flag = flag_{index}",
+    "num_of_factories > {number}",
+    "has_government = {ideology}",
+    "is_in_faction = {boolean}",
+    "threat > 0.{digit}",
+    "has_completed_focus = {tag}_focus_{index}",
+    "date < 19{digit}{digit}.1.1",
+    "{tag} = {{ has_war_with = ROOT }}",
+)
+
+_WORDS = ("the", "army", "people", "council", "front", "crisis", "reform", "treaty", "border", "war", "peace", "union")
+
+def generate(kind:str, size:int, seed:int = 0) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Generate a synthetic pdx script of about `size` characters. The text
+    is made of units like focuses, events or states, added until the size
+    is reached.
+
+    Kinds
+    -----------------------------------------------------------------------
+    - `focus` : national focus trees.
+    - `events` : country and news events with options.
+    - `history` : state history files with dated blocks.
+    - `triggers` : scripted triggers with deeply nested AND/OR/NOT blocks.
+    - `strings` : quoted strings with escapes, brackets and non-ASCII text.
+    - `comments` : scripts with comments on most lines and commented-out code.
+    - `save` : plaintext save game, `key=value` without spaces.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `kind` (str) : one of `KINDS`.
+    - `size` (int) : the number of characters to reach.
+    - `seed` (int) : the seed of the random choices.
+
+    Return
+    -----------------------------------------------------------------------
+    str : the pdx script.
+
+    Raise
+    -----------------------------------------------------------------------
+    ValueError : if the kind is unknown.
+    '''
+
+    if not kind in _UNITS:
+        raise ValueError(f"Unknown corpus kind '{kind}', expected one of {', '.join(KINDS)}")
+
+    head, unit, tail = _UNITS[kind]
+    generator = random.Random(f"{kind}:{seed}")
+
+    parts = [head]
+    total = len(head) + len(tail)
+    index = 0
+
+    while total < size:
+        text = unit(generator, index)
+        parts.append(text)
+        total += len(text)
+        index += 1
+
+    parts.append(tail)
+
+    return "".join(parts)
+
+def write_corpus(directory:str, size:int, seed:int = 0, kinds:typing.Iterable[str] = KINDS) -> dict[str,str]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Write a synthetic pdx script of each kind to `<directory>/<kind>.txt`,
+    encoded like the game files (utf-8 with BOM).
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `directory` (str) : the directory to write to. It's created if needed.
+    - `size` (int) : the number of characters of each script.
+    - `seed` (int) : the seed of the random choices.
+    - `kinds` (Iterable[str]) : the kinds to write.
+
+    Return
+    -----------------------------------------------------------------------
+    dict[str, str] : the path of each kind.
+    '''
+
+    os.makedirs(directory, exist_ok = True)
+    paths:dict[str,str] = {}
+
+    for kind in kinds:
+        path = os.path.join(directory, kind + ".txt")
+
+        with open(path, "w", encoding = "utf-8-sig", newline = "") as corpusFile:
+            corpusFile.write(generate(kind, size, seed))
+
+        paths[kind] = path
+
+    return paths
+
+def _fill(generator:random.Random, template:str, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Fill the fields of an effect or trigger template.
+    '''
+
+    return template.format(
+        number = generator.randint(1, 500),
+        digit = generator.randint(1, 9),
+        index = index,
+        tag = generator.choice(_TAGS),
+        boolean = generator.choice(("yes", "no")),
+        ideology = generator.choice(_IDEOLOGIES),
+    )
+
+def _getBlock(generator:random.Random, templates:tuple[str,...], count:int, index:int, level:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get `count` filled templates, one per line.
+    '''
+
+    indent = "\t" * level
+
+    return "".join(indent + _fill(generator, generator.choice(templates), index) + "\n" for _ in range(count))
+
+def _getFocus(generator:random.Random, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a focus of a national focus tree.
+    '''
+
+    prerequisite = f"\t\tprerequisite = {{ focus = TAG_focus_{index - 1} }}\n" if index else ""
+
+    return (f"\tfocus = {{\n"
+            f"\t\tid = TAG_focus_{index}\n"
+            f"\t\ticon = GFX_goal_generic_{generator.choice(_WORDS)}\n"
+            f"\t\tx = {index % 20}\n"
+            f"\t\ty = {index // 20}\n"
+            f"\t\tcost = {generator.choice((5, 10, 15))}\n"
+            + prerequisite +
+            f"\t\tmutually_exclusive = {{ focus = TAG_focus_{index + 1} }}\n"
+            f"\t\tavailable = {{\n"
+            + _getBlock(generator, _TRIGGERS, 3, index, 3) +
+            f"\t\t}}\n"
+            f"\t\tai_will_do = {{\n\t\t\tfactor = {generator.randint(1, 10)}\n"
+            f"\t\t\tmodifier = {{ factor = 0 has_war = yes }}\n\t\t}}\n"
+            f"\t\tcompletion_reward = {{\n"
+            + _getBlock(generator, _EFFECTS, 4, index, 3) +
+            f"\t\t}}\n"
+            f"\t}}\n")
+
+def _getEvent(generator:random.Random, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a country or news event with its options.
+    '''
+
+    options = "".join(f"\toption = {{\n"
+                      f"\t\tname = bench.{index}.{chr(97 + option)}\n"
+                      f"\t\tai_chance = {{ factor = {generator.randint(1, 100)} }}\n"
+                      + _getBlock(generator, _EFFECTS, 3, index, 2) +
+                      f"\t}}\n" for option in range(generator.randint(1, 4)))
+
+    return (f"{generator.choice(('country_event', 'news_event'))} = {{\n"
+            f"\tid = bench.{index}\n"
+            f"\ttitle = bench.{index}.t\n"
+            f"\tdesc = bench.{index}.d\n"
+            f"\tpicture = GFX_report_event_{generator.choice(_WORDS)}\n"
+            f"\tis_triggered_only = yes\n"
+            f"\ttrigger = {{\n"
+            + _getBlock(generator, _TRIGGERS, 2, index, 2) +
+            f"\t}}\n"
+            f"\tmean_time_to_happen = {{ days = {generator.randint(10, 400)} }}\n"
+            f"\timmediate = {{ hidden_effect = {{ set_country_flag = bench_{index} }} }}\n"
+            + options +
+            f"}}\n\n")
+
+def _getState(generator:random.Random, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a state with its history and dated changes.
+    '''
+
+    owner = generator.choice(_TAGS)
+    provinces = " ".join(str(generator.randint(1, 13000)) for _ in range(generator.randint(3, 15)))
+    dated = "".join(f"\t\t19{36 + year}.{generator.randint(1, 12)}.1 = {{\n"
+                    f"\t\t\towner = {generator.choice(_TAGS)}\n"
+                    f"\t\t\tbuildings = {{ infrastructure = {generator.randint(1, 5)} }}\n"
+                    f"\t\t}}\n" for year in range(generator.randint(0, 3)))
+
+    return (f"state = {{\n"
+            f"\tid = {index + 1}\n"
+            f"\tname = \"STATE_{index + 1}\"\n"
+            f"\tmanpower = {generator.randint(1000, 5000000)}\n"
+            f"\tstate_category = {generator.choice(('wasteland', 'rural', 'town', 'city', 'metropolis'))}\n"
+            f"\tresources = {{ steel = {generator.randint(1, 40)} oil = {generator.randint(1, 40)} }}\n"
+            f"\thistory = {{\n"
+            f"\t\towner = {owner}\n"
+            f"\t\tadd_core_of = {owner}\n"
+            f"\t\tvictory_points = {{ {generator.randint(1, 13000)} {generator.randint(1, 20)} }}\n"
+            f"\t\tbuildings = {{\n"
+            f"\t\t\tinfrastructure = {generator.randint(1, 5)}\n"
+            f"\t\t\tindustrial_complex = {generator.randint(0, 10)}\n"
+            f"\t\t\t{generator.randint(1, 13000)} = {{ naval_base = {generator.randint(1, 10)} }}\n"
+            f"\t\t}}\n"
+            + dated +
+            f"\t}}\n"
+            f"\tprovinces = {{ {provinces} }}\n"
+            f"}}\n")
+
+def _getTrigger(generator:random.Random, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a scripted trigger nested 8 to 24 levels deep.
+    '''
+
+    depth = generator.randint(8, 24)
+    lines = [f"bench_trigger_{index} = {{\n"]
+
+    for level in range(1, depth + 1):
+        indent = "\t" * level
+        lines.append(indent + _fill(generator, generator.choice(_TRIGGERS), index) + "\n")
+        lines.append(indent + generator.choice(("AND", "OR", "NOT", "any_owned_state", "if = { limit")) + " = {\n")
+
+    lines.append("\t" * (depth + 1) + _fill(generator, generator.choice(_TRIGGERS), index) + "\n")
+
+    for level in range(depth, 0, -1):
+        lines.append("\t" * level + ("} }\n" if lines[level * 2].endswith("limit = {\n") else "}\n"))
+
+    lines.append("}\n")
+
+    return "".join(lines)
+
+def _getString(generator:random.Random, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get statements with quoted values: escaped quotes,
+    brackets and scopes in quotes, colour codes and non-ASCII text.
+    '''
+
+    words = " ".join(generator.choice(_WORDS) for _ in range(generator.randint(2, 8)))
+
+    return (f"bench_text_{index} = {{\n"
+            f"\tname = \"{words.title()}\"\n"
+            f"\tdesc = \"The {words} of [ROOT.GetNameDef] \\\"{generator.choice(_WORDS)}\\\" in {{brackets}}\"\n"
+            f"\tlog = \"[GetDateText]: §Y{generator.choice(_TAGS)}§! {words} \\\"done\\\"\"\n"
+            f"\tcustom_effect_tooltip = \"Größe {generator.randint(1, 99)} — état d'Ålesund\"\n"
+            f"\tkeys = {{ \"{generator.choice(_WORDS)}\" \"{generator.choice(_WORDS)} {index}\" \"}}\" }}\n"
+            f"}}\n")
+
+def _getCommented(generator:random.Random, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a block where most lines carry comments, with
+    commented-out code holding brackets and quotes.
+    '''
+
+    return (f"# Block {index}: {' '.join(generator.choice(_WORDS) for _ in range(8))}\n"
+            f"# {'-' * 60}\n"
+            f"bench_block_{index} = {{ # opens the block {{\n"
+            f"\t# limit = {{ tag = {generator.choice(_TAGS)} }}\n"
+            f"\t{_fill(generator, generator.choice(_EFFECTS), index)} # \"effect\" }}\n"
+            f"\t#{_fill(generator, generator.choice(_EFFECTS), index)}\n"
+            f"\tif = {{ # {{ nested }}\n"
+            f"\t\tlimit = {{ {_fill(generator, generator.choice(_TRIGGERS), index)} }} # trigger\n"
+            f"\t\t{_fill(generator, generator.choice(_EFFECTS), index)}\n"
+            f"\t}} # closes if\n"
+            f"}} # closes the block }}\n\n")
+
+def _getCountry(generator:random.Random, index:int) -> str:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a country of a plaintext save game.
+    '''
+
+    parties = "".join(f"\t\t\t\t{ideology}={{ popularity={generator.random():.3f} name=\"{ideology} party\" }}\n"
+                      for ideology in _IDEOLOGIES)
+    variables = "".join(f"\t\t\tvar_{variable}={generator.random() * 100:.3f}\n" for variable in range(generator.randint(5, 30)))
+    units = "".join(f"\t\t\tdivision={{ id={{ id={generator.randint(1, 99999)} type=41 }} name=\"{unit + 1}. Division\" "
+                    f"location={generator.randint(1, 13000)} strength={generator.random():.2f} }}\n"
+                    for unit in range(generator.randint(1, 20)))
+
+    return (f"\tC{index:04d}={{\n"
+            f"\t\tname=\"C{index:04d}_name\"\n"
+            f"\t\tcapital={generator.randint(1, 900)}\n"
+            f"\t\tpolitics={{\n\t\t\truling_party=\"{generator.choice(_IDEOLOGIES)}\"\n\t\t\tparties={{\n"
+            + parties +
+            f"\t\t\t}}\n\t\t}}\n"
+            f"\t\tvariables={{\n" + variables + f"\t\t}}\n"
+            f"\t\tunits={{\n" + units + f"\t\t}}\n"
+            f"\t}}\n")
+
+# The text before the units, the unit generator, and the text after them.
+_UNITS:dict[str,tuple[str,typing.Callable[[random.Random,int],str],str]] = {
+    "focus" : ("focus_tree = {\n\tid = bench_focus\n\tcountry = { factor = 0 modifier = { add = 10 tag = TAG } }\n", _getFocus, "}\n"),
+    "events" : ("add_namespace = bench\n\n", _getEvent, ""),
+    "history" : ("", _getState, ""),
+    "triggers" : ("", _getTrigger, ""),
+    "strings" : ("", _getString, ""),
+    "comments" : ("# Synthetic comment-heavy script\n\n", _getCommented, ""),
+    "save" : ("date=\"1936.1.1.12\"\nplayer=\"C0000\"\nversion=\"v1.14.1\"\ncountries={\n", _getCountry, "}\n"),
+}
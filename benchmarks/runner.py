@@ -0,0 +1,402 @@
+'''
+runner.py
+
+This module measures each phase of reading and writing pdx scripts on the
+synthetic corpus, and compares the results of two runs.
+
+Function
+-----------------------------------------------------------------------
+- `run` : Measure every phase on a synthetic script of each kind.
+- `compare` : Compare two results and find the regressions.
+- `save_result` : Save a result as JSON.
+- `load_result` : Load a result saved as JSON.
+
+Usage
+-----------------------------------------------------------------------
+>>> from benchmarks.runner import run, compare, save_result, load_result
+>>> result = run(size = 1 << 20)
+>>> save_result(result, "new.json")
+>>> for regression in compare(load_result("old.json"), result):
+>>>     print(regression)
+'''
+
+import gc
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from pdxscript import PDXscript, Statement
+from pdxscript.pdxscript import _LazyBlock
+
+from .corpus import KINDS, generate
+
+RESULT_VERSION = 1
+
+PHASES = ("tokenize", "tokenize_legacy", "structure", "text", "write", "parse", "lazy", "roundtrip")
+
+def run(size:int = 1 << 20,
+        kinds:typing.Iterable[str] = KINDS,
+        phases:typing.Iterable[str] = PHASES,
+        repeat:int = 3,
+        seed:int = 0) -> dict:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Measure the phases on a synthetic script of each kind. Every phase is
+    timed `repeat` times and the best time is kept. Peak memory is taken
+    from a separate run under tracemalloc, so tracing doesn't slow the
+    timed runs.
+
+    Phases
+    -----------------------------------------------------------------------
+    - `tokenize` : `_scanToken()` on the text. tokens/s and MB/s.
+    - `tokenize_legacy` : `_getToken()` on the lines. tokens/s and MB/s.
+    - `structure` : `_getStructure()` on the tokens. statements/s.
+    - `text` : `_getTextBuffer()` on the tree. lines/s and MB/s.
+    - `write` : `write()` to a file. MB/s and peak memory.
+    - `parse` : `PDXscript(path)`. MB/s, statements/s, peak memory, and the
+    memory the tree keeps.
+    - `lazy` : `PDXscript(path, lazy = True)`, then 1% of the top-level
+    blocks expanded, like a tool reading a few of them. MB/s, peak memory,
+    the memory the tree keeps, and its time and kept memory relative to
+    `parse`.
+    - `roundtrip` : `dumps()` then `loads()` of the result. MB/s.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `size` (int) : the number of characters of each script.
+    - `kinds` (Iterable[str]) : the kinds of script, see `corpus.KINDS`.
+    - `phases` (Iterable[str]) : the phases to measure, see `PHASES`.
+    - `repeat` (int) : the number of timed runs of each phase.
+    - `seed` (int) : the seed of the corpus.
+
+    Return
+    -----------------------------------------------------------------------
+    dict : the result, with `meta` about the run and `results` by kind,
+    phase and metric.
+
+    Raise
+    -----------------------------------------------------------------------
+    ValueError : if a phase or kind is unknown.
+    '''
+
+    phases = tuple(phases)
+
+    for phase in phases:
+        if not phase in PHASES:
+            raise ValueError(f"Unknown phase '{phase}', expected one of {', '.join(PHASES)}")
+
+    results:dict[str,dict[str,dict[str,float]]] = {}
+
+    with tempfile.TemporaryDirectory(prefix = "pdxbench") as directory:
+
+        for kind in kinds:
+            text = generate(kind, size, seed)
+            path = os.path.join(directory, kind + ".txt")
+
+            with open(path, "w", encoding = "utf-8-sig", newline = "") as corpusFile:
+                corpusFile.write(text)
+
+            results[kind] = {phase : _PHASES[phase](text, path, repeat) for phase in phases}
+
+    meta = {
+        "version" : RESULT_VERSION,
+        "python" : platform.python_version(),
+        "implementation" : platform.python_implementation(),
+        "platform" : platform.platform(),
+        "machine" : platform.machine(),
+        "time" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "size" : size,
+        "seed" : seed,
+        "repeat" : repeat,
+    }
+
+    return {"meta" : meta, "results" : results}
+
+def compare(old:dict, new:dict, threshold:float = 0.1) -> list[tuple[str,str,str,float,float,float]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Compare two results and find the metrics that got worse by more than
+    `threshold`. Rates (`*_per_s`) are better higher; times and memory
+    (`seconds`, `*_mb`) are better lower. Metrics that only one result
+    has are left out.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `old` (dict) : the result to compare against, like a release.
+    - `new` (dict) : the result to check.
+    - `threshold` (float) : the relative change allowed, 0.1 for 10%.
+
+    Return
+    -----------------------------------------------------------------------
+    list[tuple] : `(kind, phase, metric, old value, new value, change)` of
+    each regression, where change is relative and positive means worse.
+    '''
+
+    regressions = []
+
+    for kind, phase, metric, old_value, new_value, change in _iterChange(old, new):
+
+        if change > threshold:
+            regressions.append((kind, phase, metric, old_value, new_value, change))
+
+    return regressions
+
+def save_result(result:dict, path:str) -> None:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Save a result of `run()` as JSON.
+    '''
+
+    with open(path, "w", encoding = "utf-8") as resultFile:
+        json.dump(result, resultFile, indent = 2, sort_keys = True)
+        resultFile.write("\n")
+
+def load_result(path:str) -> dict:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Load a result saved by `save_result()`.
+
+    Raise
+    -----------------------------------------------------------------------
+    ValueError : if the file isn't a result of a known version.
+    '''
+
+    with open(path, "r", encoding = "utf-8") as resultFile:
+        result = json.load(resultFile)
+
+    if not isinstance(result, dict) or result.get("meta", {}).get("version") != RESULT_VERSION:
+        raise ValueError(f"'{path}' isn't a benchmark result of version {RESULT_VERSION}")
+
+    return result
+
+def _iterChange(old:dict, new:dict) -> typing.Iterator[tuple[str,str,str,float,float,float]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Generate every metric both results have, with its
+    relative change. A positive change is worse.
+    '''
+
+    for kind, phases in new["results"].items():
+
+        for phase, metrics in phases.items():
+
+            old_metrics = old["results"].get(kind, {}).get(phase, {})
+
+            for metric, new_value in metrics.items():
+
+                old_value = old_metrics.get(metric)
+
+                if not old_value or new_value is None:
+                    continue
+
+                if metric.endswith("_per_s"):
+                    change = old_value / new_value - 1 if new_value else float("inf")
+                else:
+                    change = new_value / old_value - 1
+
+                yield kind, phase, metric, old_value, new_value, change
+
+def _getTime(function:typing.Callable[[],typing.Any], repeat:int) -> float:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the best time of `repeat` calls. Garbage is
+    collected before each call, but not held off during it, since the
+    collections a tree causes are part of its cost.
+    '''
+
+    best = float("inf")
+
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return round(best, 6)
+
+def _getPeak(function:typing.Callable[[],typing.Any]) -> tuple[float,float]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Call the function under tracemalloc.
+
+    Return
+    -----------------------------------------------------------------------
+    tuple[float,float] : the peak memory during the call, and the memory
+    still held by its result, in MB.
+    '''
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        result = function()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    del result
+
+    return peak / 1e6, current / 1e6
+
+def _getCount(script:'PDXscript') -> int:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Count the Statements of a tree at every level.
+    '''
+
+    count = 0
+    stack = [script._getStatements()]
+
+    while stack:
+
+        for statement in stack.pop():
+
+            count += 1
+            value = statement.get_value()
+
+            if isinstance(value, PDXscript):
+                stack.append(value._getStatements())
+
+            elif isinstance(value, list) and value and isinstance(value[0], Statement):
+                stack.append(value)
+
+    return count
+
+def _getRate(amount:float, seconds:float) -> float:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get a rate per second, rounded for the JSON file.
+    '''
+
+    return round(amount / seconds, 3) if seconds else 0.0
+
+def _measureTokenize(text:str, path:str, repeat:int) -> dict[str,float]:
+    parser = PDXscript()
+    tokens = parser._scanToken(text)
+    seconds = _getTime(lambda: parser._scanToken(text), repeat)
+
+    return {"seconds" : seconds,
+            "tokens_per_s" : _getRate(len(tokens), seconds),
+            "mb_per_s" : _getRate(len(text.encode("utf-8")) / 1e6, seconds)}
+
+def _measureTokenizeLegacy(text:str, path:str, repeat:int) -> dict[str,float]:
+    parser = PDXscript()
+    lines = text.splitlines(keepends = True)
+    tokens = parser._getToken(lines)
+    seconds = _getTime(lambda: parser._getToken(lines), repeat)
+
+    return {"seconds" : seconds,
+            "tokens_per_s" : _getRate(len(tokens), seconds),
+            "mb_per_s" : _getRate(len(text.encode("utf-8")) / 1e6, seconds)}
+
+def _measureStructure(text:str, path:str, repeat:int) -> dict[str,float]:
+    parser = PDXscript()
+    tokens = parser._scanToken(text)
+    count = _getCount(parser._getStructure(tokens))
+    seconds = _getTime(lambda: parser._getStructure(tokens), repeat)
+
+    return {"seconds" : seconds,
+            "statements_per_s" : _getRate(count, seconds)}
+
+def _measureText(text:str, path:str, repeat:int) -> dict[str,float]:
+    script = PDXscript.loads(text)
+    lines = script._getTextBuffer(script._element)
+    size = sum(len(line.encode("utf-8")) + 1 for line in lines)
+    seconds = _getTime(lambda: script._getTextBuffer(script._element), repeat)
+
+    return {"seconds" : seconds,
+            "lines_per_s" : _getRate(len(lines), seconds),
+            "mb_per_s" : _getRate(size / 1e6, seconds)}
+
+def _measureWrite(text:str, path:str, repeat:int) -> dict[str,float]:
+    script = PDXscript.loads(text)
+    output = path + ".out"
+
+    try:
+        seconds = _getTime(lambda: script.write(output), repeat)
+        size = os.path.getsize(output)
+        peak, _ = _getPeak(lambda: script.write(output))
+
+    finally:
+        if os.path.exists(output):
+            os.remove(output)
+
+    return {"seconds" : seconds,
+            "mb_per_s" : _getRate(size / 1e6, seconds),
+            "peak_mb" : round(peak, 3)}
+
+def _measureParse(text:str, path:str, repeat:int) -> dict[str,float]:
+    size = os.path.getsize(path)
+    count = _getCount(PDXscript(path))
+    seconds = _getTime(lambda: PDXscript(path), repeat)
+    peak, retained = _getPeak(lambda: PDXscript(path))
+
+    return {"seconds" : seconds,
+            "mb_per_s" : _getRate(size / 1e6, seconds),
+            "statements_per_s" : _getRate(count, seconds),
+            "peak_mb" : round(peak, 3),
+            "retained_mb" : round(retained, 3)}
+
+def _measureLazy(text:str, path:str, repeat:int) -> dict[str,float]:
+    size = os.path.getsize(path)
+    seconds = _getTime(lambda: _getLazy(path), repeat)
+    peak, retained = _getPeak(lambda: _getLazy(path))
+    eager_seconds = _getTime(lambda: PDXscript(path), repeat)
+    _, eager_retained = _getPeak(lambda: PDXscript(path))
+
+    return {"seconds" : seconds,
+            "mb_per_s" : _getRate(size / 1e6, seconds),
+            "peak_mb" : round(peak, 3),
+            "retained_mb" : round(retained, 3),
+            "seconds_vs_parse" : round(seconds / eager_seconds, 3) if eager_seconds else 0.0,
+            "retained_vs_parse" : round(retained / eager_retained, 3) if eager_retained else 0.0}
+
+def _getLazy(path:str) -> 'PDXscript':
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Read a script in lazy mode and expand every hundredth
+    of its top-level blocks.
+    '''
+
+    script = PDXscript(path, lazy = True)
+    blocks = [statement for statement in script._getStatements() if type(statement._value) is _LazyBlock]
+
+    for statement in blocks[::100]:
+        statement.get_value()
+
+    return script
+
+def _measureRoundtrip(text:str, path:str, repeat:int) -> dict[str,float]:
+    script = PDXscript.loads(text)
+    size = len(script.dumps().encode("utf-8"))
+    seconds = _getTime(lambda: PDXscript.loads(script.dumps()), repeat)
+
+    return {"seconds" : seconds,
+            "mb_per_s" : _getRate(size / 1e6, seconds)}
+
+_PHASES:dict[str,typing.Callable[[str,str,int],dict[str,float]]] = {
+    "tokenize" : _measureTokenize,
+    "tokenize_legacy" : _measureTokenizeLegacy,
+    "structure" : _measureStructure,
+    "text" : _measureText,
+    "write" : _measureWrite,
+    "parse" : _measureParse,
+    "lazy" : _measureLazy,
+    "roundtrip" : _measureRoundtrip,
+}
@@ -10,9 +10,33 @@ Class
 - `PDXscript` : Data Storing Class for pdx script. It works as list of 
                 Statement objects. And also provide methods to read/write
                 pdx script. 
+- `ParseCache` : On-disk cache of parsed PDXscript objects.
+- `ParseStats` : Collector of per-phase timers and counters.
+- `Overlay` : Ordered layers of game and mod files, resolved into the
+              effective scripts.
+- `SymbolIndex` : Persistent index of symbol definitions and references.
+- `SymbolRule` : A rule telling which Statements define or reference a
+                 symbol.
+- `Template` : A script with `$NAME$` placeholders compiled once and
+               rendered many times.
+- `Workspace` : The scripts of a directory, parsed again as the files
+                change.
 - `ScriptNotClosedException` : Exception Class.
 - `ViolatedPathException` : Exception Class.
 
+Function
+-----------------------------------------------------------------------
+- `load_directory` : Load every matching pdx script file under a directory
+                     with a process pool.
+- `aiter_directory` : Load the matching files under a directory from an
+                      asyncio event loop, for `async for`.
+- `write_many` : Write many scripts with a thread pool, replacing only the
+                 changed files.
+- `diff` : Get the Statements added, removed and changed between two scripts.
+- `diff_directory` : Get the differences of every file between two directories.
+- `to_columns` : Get the typed values at some paths of many scripts as
+                 columns.
+
 Usage
 -----------------------------------------------------------------------
 >>> from hoi4script.pdxscript import PDXscript
@@ -30,7 +54,20 @@ from .pdxscript import Statement
 from .pdxscript import PDXscript
 from .pdxscript import ScriptNotClosedException
 from .pdxscript import ViolatedPathException
+from .cache import ParseCache
+from .stats import ParseStats
+from .loader import load_directory
+from .loader import aiter_directory
+from .writer import write_many
+from .overlay import Overlay
+from .symbols import SymbolIndex
+from .symbols import SymbolRule
+from .template import Template
+from .workspace import Workspace
+from .diff import diff
+from .diff import diff_directory
+from .columns import to_columns
 
-__all__ = ["Statement","PDXscript","ScriptNotClosedException","ViolatedPathException"]
+__all__ = ["Statement","PDXscript","ScriptNotClosedException","ViolatedPathException","ParseCache","ParseStats","Overlay","SymbolIndex","SymbolRule","Template","Workspace","load_directory","aiter_directory","write_many","diff","diff_directory","to_columns"]
 
 __version__ = '1.0.3'
\ No newline at end of file
@@ -0,0 +1,338 @@
+'''
+cache.py
+
+This module keeps parsed pdx scripts on disk, so unchanged files don't
+have to be tokenized again on the next run.
+
+Class
+-----------------------------------------------------------------------
+- `ParseCache` : On-disk cache of parsed PDXscript objects.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import PDXscript, ParseCache
+>>> cache = ParseCache("./.pdxcache")
+>>> script = PDXscript(path, cache = cache)
+'''
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import typing
+
+from .pdxscript import PDXscript
+
+# Bump it whenever the parser or the packed form changes, so old entries
+# are never read back as a different tree.
+CACHE_VERSION = 3
+
+_STAMP = (CACHE_VERSION, marshal.version, sys.version_info[:2])
+
+_SUFFIX = ".pdxc"
+
+class ParseCache:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    On-disk cache of parsed PDXscript objects. Every entry stores the
+    packed tree (see `PDXscript._getPacked()`) with the mtime and size of
+    the source file, and optionally a hash of its content. An entry is only
+    used when all of them still match and its version stamp is current.
+
+    An entry is the length of the header, the marshalled header, then the
+    marshalled tree, so a stale entry is rejected without loading the tree.
+
+    The total size of the entries is kept under `max_bytes` by evicting the
+    least recently used ones.
+
+    Function
+    -----------------------------------------------------------------------
+    - `__init__()` : Initialize the cache on a directory.
+    - `get()` : Get the cached script of a file.
+    - `put()` : Store the script of a file.
+    - `load()` : Get the cached script of a file, or parse and store it.
+    - `clear()` : Remove every entry.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> cache = ParseCache("./.pdxcache", max_bytes = 512 << 20, verify_hash = True)
+    >>> script = cache.load(path)
+    '''
+
+    def __init__(self, directory:str, max_bytes:int = 256 << 20, verify_hash:bool = False) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Initialize the cache on a directory. The directory is created if it
+        doesn't exist.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `directory` (str) : the directory to keep the entries.
+        - `max_bytes` (int) : the total size the entries may take.
+        - `verify_hash` (bool) : also compare a hash of the file content. It
+        costs a read of the file, but catches changes that keep mtime and size.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._verify_hash = verify_hash
+        self._total:typing.Optional[int] = None
+
+        os.makedirs(directory, exist_ok = True)
+
+    def get(self, path:str) -> typing.Optional['PDXscript']:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the cached script of a file.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str) : the path of the pdx script file.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript | None : the script, or None if there's no valid entry.
+        '''
+
+        entry = self._getEntryPath(path)
+
+        try:
+            with open(entry, "rb") as entryFile:
+                data = entryFile.read()
+
+            size = int.from_bytes(data[:4], "little")
+            header = marshal.loads(data[4:4 + size])
+
+            if header[:-1] != self._getHeader(path):
+                return None
+
+            if self._verify_hash and header[-1] != self._getHash(path):
+                return None
+
+            packed = marshal.loads(memoryview(data)[4 + size:])
+
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            return None
+
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+        return PDXscript._fromPacked(packed)
+
+    def put(self, path:str, script:'PDXscript', header:tuple = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Store the script of a file, then evict old entries if the cache is
+        over `max_bytes`. The entry is written to a temporary file first and
+        moved in place, so a reader never sees half an entry.
+
+        The header should be taken before the file is read: if the file is
+        changed while it's parsed, the entry then doesn't match the new file
+        and is never used, while a header taken afterwards would match it.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str) : the path of the pdx script file.
+        - `script` (PDXscript) : the script parsed from it.
+        - `header` (tuple) : the header of the file taken before it was read,
+        see `_getEntryHeader()`. Default to one taken now.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        entry = self._getEntryPath(path)
+        if header is None:
+            header = self._getEntryHeader(path)
+
+        header = marshal.dumps(header)
+        data = len(header).to_bytes(4, "little") + header + marshal.dumps(script._getPacked())
+
+        total = self._getTotal()
+
+        try:
+            total -= os.path.getsize(entry)
+        except OSError:
+            pass
+
+        descriptor, temp_path = tempfile.mkstemp(suffix = ".tmp", dir = self._directory)
+
+        try:
+            with os.fdopen(descriptor, "wb") as tempFile:
+                tempFile.write(data)
+
+            os.replace(temp_path, entry)
+
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        self._total = total + len(data)
+
+        if self._total > self._max_bytes:
+            self._evict(keep = entry)
+
+    def load(self, path:str) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the cached script of a file, or parse and store it. Same as
+        `PDXscript(path, cache = self)`.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str) : the path of the pdx script file.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the script.
+        '''
+
+        return PDXscript(path, cache = self)
+
+    def clear(self) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Remove every entry of the cache.
+        '''
+
+        for name in os.listdir(self._directory):
+
+            if name.endswith(_SUFFIX):
+                try:
+                    os.remove(os.path.join(self._directory, name))
+                except OSError:
+                    pass
+
+        self._total = 0
+
+    def _getEntryPath(self, path:str) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the entry path of a file, named by a hash of its
+        absolute path.
+        '''
+
+        name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+
+        return os.path.join(self._directory, name + _SUFFIX)
+
+    def _getHeader(self, path:str) -> tuple:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the header an entry of the file should have,
+        without the content hash.
+        '''
+
+        status = os.stat(path)
+
+        return (_STAMP, os.path.abspath(path), status.st_mtime_ns, status.st_size)
+
+    def _getEntryHeader(self, path:str) -> tuple:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the header to store in an entry of the file, with
+        the content hash if `verify_hash`.
+        '''
+
+        return self._getHeader(path) + (self._getHash(path) if self._verify_hash else None,)
+
+    def _getHash(self, path:str) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the hash of the file content.
+        '''
+
+        digest = hashlib.blake2b()
+
+        with open(path, "rb") as sourceFile:
+            for block in iter(lambda: sourceFile.read(1 << 20), b""):
+                digest.update(block)
+
+        return digest.hexdigest()
+
+    def _getTotal(self) -> int:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the total size of the entries. It's counted from
+        the directory once and then kept up to date by `put()`.
+        '''
+
+        if self._total is None:
+            self._total = sum(size for size, _, _ in self._getEntries())
+
+        return self._total
+
+    def _getEntries(self) -> list[tuple[int,int,str]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get `(size, mtime, path)` of every entry.
+        '''
+
+        entries = []
+
+        with os.scandir(self._directory) as iterator:
+
+            for dirEntry in iterator:
+
+                if not dirEntry.name.endswith(_SUFFIX):
+                    continue
+
+                try:
+                    status = dirEntry.stat()
+                except OSError:
+                    continue
+
+                entries.append((status.st_size, status.st_mtime_ns, dirEntry.path))
+
+        return entries
+
+    def _evict(self, keep:str) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Remove the least recently used entries until the
+        cache fits in `max_bytes`. `get()` touches the entries it returns,
+        so their mtime is the time of last use.
+        '''
+
+        entries = self._getEntries()
+        total = sum(size for size, _, _ in entries)
+
+        for size, _, entry in sorted(entries, key = lambda item: item[1]):
+
+            if total <= self._max_bytes:
+                break
+
+            if entry == keep:
+                continue
+
+            try:
+                os.remove(entry)
+                total -= size
+            except OSError:
+                pass
+
+        self._total = total
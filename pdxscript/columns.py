@@ -0,0 +1,163 @@
+'''
+columns.py
+
+This module flattens values of many pdx scripts into columns, one row per
+script or per block, for aggregating them with NumPy or any array code.
+
+Function
+-----------------------------------------------------------------------
+- `to_columns` : Get the typed values at some paths of many scripts as
+                 columns.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import load_directory, to_columns
+>>> states = load_directory(f"{game_root}/history/states", "*.txt")
+>>> table = to_columns(states, ["state/id", "state/manpower", "state/history/owner"])
+>>> table["state/manpower"].sum()
+'''
+
+import array
+import datetime
+import typing
+
+from .pdxscript import PDXscript
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def to_columns(scripts:typing.Union[typing.Mapping[str,'PDXscript'],typing.Iterable['PDXscript']],
+               columns:typing.Union[typing.Mapping[str,str],typing.Iterable[str]],
+               rows:str = None,
+               source:typing.Optional[str] = "file",
+               use_numpy:bool = None) -> dict[str,typing.Any]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Get the values at some paths of many scripts as columns of the same
+    length. There's one row per script, or, with `rows`, one row per block
+    found at that path in each script, like each focus of a focus tree.
+
+    Each value is the first Statement found at the path of its column (see
+    `PDXscript.select()`) from the row, decoded by `get_value(typed = True)`.
+    Each column is made from the types of its values:
+
+    - bool, without missing value : NumPy bool, or `array.array("b")`.
+    - int, without missing value : NumPy int64, or `array.array("q")`.
+    - int and float : NumPy float64, or `array.array("d")`, NaN if missing.
+    - date and datetime : NumPy datetime64 by day or by hour, NaT if missing,
+    or a list.
+    - anything else, like text : NumPy object array, or a list, None if
+    missing.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `scripts` (Mapping[str, PDXscript] | Iterable[PDXscript]) : the
+    scripts, like the result of `load_directory()`.
+    - `columns` (Mapping[str, str] | Iterable[str]) : the path of each
+    column by name, or the paths, named by themselves.
+    - `rows` (str) : the path of the blocks to make a row of. Default to a
+    row per script.
+    - `source` (str | None) : the name of a column with the key of the script
+    of each row, when `scripts` is a Mapping. None for no such column.
+    - `use_numpy` (bool) : whether to make NumPy arrays. Default to NumPy if
+    it can be imported, else `array.array` and lists.
+
+    Return
+    -----------------------------------------------------------------------
+    dict[str, numpy.ndarray | array.array | list] : the columns by name, the
+    `source` column first.
+
+    Raise
+    -----------------------------------------------------------------------
+    ImportError : if `use_numpy` is True and NumPy can't be imported.
+    ValueError : if a path can't be parsed.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> trees = load_directory(f"{mod_root}/common/national_focus")
+    >>> table = to_columns(trees, {"id" : "id", "cost" : "cost"}, rows = "focus_tree/focus")
+    >>> table["cost"].mean()
+    '''
+
+    if use_numpy is None:
+        use_numpy = numpy is not None
+
+    elif use_numpy and numpy is None:
+        raise ImportError("NumPy is needed for use_numpy = True")
+
+    if not isinstance(columns, typing.Mapping):
+        columns = {path : path for path in columns}
+
+    items = scripts.items() if isinstance(scripts, typing.Mapping) else ((None, script) for script in scripts)
+    keys:list[typing.Any] = []
+    values:dict[str,list] = {name : [] for name in columns}
+
+    for key, script in items:
+
+        if rows is None:
+            blocks = [script]
+        else:
+            blocks = [statement.get_value() for statement in script.select(rows)]
+            blocks = [block for block in blocks if isinstance(block, PDXscript)]
+
+        for block in blocks:
+
+            keys.append(key)
+
+            for name, path in columns.items():
+                found = block.select(path)
+                values[name].append(found[0].get_value(typed = True) if found else None)
+
+    result:dict[str,typing.Any] = {}
+
+    if source is not None and isinstance(scripts, typing.Mapping):
+        result[source] = _getColumn(keys, use_numpy)
+
+    for name in columns:
+        result[name] = _getColumn(values[name], use_numpy)
+
+    return result
+
+def _getColumn(values:list, use_numpy:bool) -> typing.Any:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the array of a column from its typed values, see
+    `to_columns()`.
+    '''
+
+    kinds = {type(value) for value in values if value is not None}
+    missing = any(value is None for value in values)
+
+    if kinds == {bool} and not missing:
+        return numpy.array(values, dtype = numpy.bool_) if use_numpy else array.array("b", values)
+
+    if kinds == {int} and not missing:
+
+        try:
+            return numpy.array(values, dtype = numpy.int64) if use_numpy else array.array("q", values)
+
+        except OverflowError:
+            pass
+
+    if kinds <= {int, float}:
+        values = [float("nan") if value is None else value for value in values]
+        return numpy.array(values, dtype = numpy.float64) if use_numpy else array.array("d", values)
+
+    if kinds <= {datetime.date, datetime.datetime}:
+
+        if not use_numpy:
+            return values
+
+        return numpy.array(values, dtype = "datetime64[h]" if datetime.datetime in kinds else "datetime64[D]")
+
+    if not use_numpy:
+        return values
+
+    column = numpy.empty(len(values), dtype = object)
+    column[:] = values
+
+    return column
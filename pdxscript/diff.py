@@ -0,0 +1,345 @@
+'''
+diff.py
+
+This module finds the structural differences between two pdx scripts, or
+two directories of them, without writing them as text.
+
+Function
+-----------------------------------------------------------------------
+- `diff` : Get the Statements added, removed and changed between two scripts.
+- `diff_directory` : Get the differences of every file between two directories.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import PDXscript, diff
+>>> for change, path, old, new in diff(PDXscript(vanilla_path), PDXscript(mod_path)):
+>>>     print(change, path)
+changed focus_tree/focus[3]/cost
+added focus_tree/focus[12]
+'''
+
+import collections
+import concurrent.futures
+import filecmp
+import os
+import typing
+
+from .pdxscript import PDXscript, Statement
+from .loader import _getPaths
+
+Change = tuple[str,str,typing.Optional['Statement'],typing.Optional['Statement']]
+
+def diff(old:'PDXscript', new:'PDXscript') -> list[Change]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Get the Statements added, removed and changed from `old` to `new`.
+    Blocks with the same hash (see `PDXscript.get_hash()`) are skipped
+    without being walked, so a diff costs about the size of what changed
+    once the hashes are made.
+
+    In each block, identical Statements are paired first, then the blocks
+    with the same keyword and `id`, then the rest without `id` with the
+    same keyword in order. A pair of blocks is compared inside; any other
+    pair that isn't identical is changed. Moving a Statement inside its
+    block isn't a change.
+
+    A path is the keywords from the top level down to the Statement joined
+    by `/`. A keyword used more than once in its block has its position
+    among them, like `focus[3]`, counted in `old` for a removed Statement
+    and in `new` otherwise.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `old` (PDXscript) : the script to compare against, like vanilla.
+    - `new` (PDXscript) : the script to check.
+
+    Return
+    -----------------------------------------------------------------------
+    list[tuple[str, str, Statement | None, Statement | None]] :
+    `(change, path, old Statement, new Statement)` where change is
+    `added`, `removed` or `changed`.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> changes = diff(PDXscript(old_path), PDXscript(new_path))
+    >>> removed = [path for change, path, _, _ in changes if change == "removed"]
+    '''
+
+    changes:list[Change] = []
+
+    if old.get_hash() != new.get_hash():
+        _diffBlock(old._getStatements(), new._getStatements(), "", changes)
+
+    return changes
+
+def diff_directory(old_root:str,
+                   new_root:str,
+                   pattern:str = "**/*.txt",
+                   workers:int = 1,
+                   errors:dict[str,Exception] = None) -> dict[str,list[Change]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Get the differences of every file matching the glob `pattern` between
+    two directories. Files with the same bytes aren't parsed. A file only
+    in one of the directories is one change with an empty path and no
+    Statements, instead of every Statement in it.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `old_root` (str) : the directory to compare against.
+    - `new_root` (str) : the directory to check.
+    - `pattern` (str) : the glob pattern relative to the roots.
+    - `workers` (int) : the number of processes to parse and compare the
+    files with. None for the CPU count.
+    - `errors` (dict) : if given, the exception of each failed file is put
+    into it by relative path instead of being raised.
+
+    Return
+    -----------------------------------------------------------------------
+    dict[str, list[tuple]] : the changes of each file that changed, by
+    relative path with `/` separators, in path order.
+
+    Raise
+    -----------------------------------------------------------------------
+    Any exception of a failed file, if `errors` isn't given.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> for path, changes in diff_directory(vanilla_root, mod_root, "common/**/*.txt", workers = 4).items():
+    >>>     print(path, len(changes))
+    '''
+
+    old_paths = {os.path.relpath(path, old_root).replace(os.sep, "/") : path for path in _getPaths(old_root, pattern)}
+    new_paths = {os.path.relpath(path, new_root).replace(os.sep, "/") : path for path in _getPaths(new_root, pattern)}
+
+    result:dict[str,list[Change]] = {}
+    pairs:list[tuple[str,str,str]] = []
+
+    for relative in sorted(old_paths.keys() | new_paths.keys()):
+
+        if not relative in new_paths:
+            result[relative] = [("removed", "", None, None)]
+
+        elif not relative in old_paths:
+            result[relative] = [("added", "", None, None)]
+
+        elif not filecmp.cmp(old_paths[relative], new_paths[relative], shallow = False):
+            pairs.append((relative, old_paths[relative], new_paths[relative]))
+
+    failed:dict[str,Exception] = {}
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(pairs) <= 1:
+        results = _diffChunk(pairs)
+
+    else:
+        results = []
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            futures = [executor.submit(_diffChunk, pairs[start::workers]) for start in range(workers)]
+
+            for future in concurrent.futures.as_completed(futures):
+                results.extend(future.result())
+
+    for relative, changes, error in results:
+
+        if error is not None:
+            failed[relative] = error
+
+        elif changes:
+            result[relative] = changes
+
+    if failed and errors is None:
+        raise failed[min(failed)]
+
+    if errors is not None:
+        errors.update(failed)
+
+    return dict(sorted(result.items()))
+
+def _diffChunk(pairs:list[tuple[str,str,str]]) -> list[tuple[str,typing.Optional[list[Change]],typing.Optional[Exception]]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Parse and compare the pairs of files, in this
+    process or in a worker one.
+
+    Return
+    -----------------------------------------------------------------------
+    list[tuple] : `(relative path, changes, None)` for each compared pair,
+    or `(relative path, None, exception)` for each failed one.
+    '''
+
+    results = []
+
+    for relative, old_path, new_path in pairs:
+
+        try:
+            results.append((relative, diff(PDXscript(old_path), PDXscript(new_path)), None))
+
+        except Exception as error:
+            results.append((relative, None, error))
+
+    return results
+
+def _diffBlock(old:list['Statement'], new:list['Statement'], prefix:str, changes:list[Change]) -> None:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Compare two blocks that aren't identical and put the
+    changes in `changes`.
+    '''
+
+    old_texts = [statement._getHashText() for statement in old]
+    new_positions:dict[str,collections.deque[int]] = {}
+
+    for position, statement in enumerate(new):
+        new_positions.setdefault(statement._getHashText(), collections.deque()).append(position)
+
+    old_left:list[int] = []
+    new_paired:set[int] = set()
+
+    for position, text in enumerate(old_texts):
+
+        positions = new_positions.get(text)
+
+        if positions:
+            new_paired.add(positions.popleft())
+        else:
+            old_left.append(position)
+
+    new_left = [position for position in range(len(new)) if not position in new_paired]
+
+    if not old_left and not new_left:
+        return
+
+    pairs:list[tuple[int,int]] = []
+
+    for getKey in (_getIdentity, _getKeyword):
+
+        waiting:dict[typing.Hashable,collections.deque[int]] = {}
+
+        for position in new_left:
+            key = getKey(new[position])
+
+            if key is not None:
+                waiting.setdefault(key, collections.deque()).append(position)
+
+        unpaired = []
+
+        for position in old_left:
+            key = getKey(old[position])
+            positions = waiting.get(key) if key is not None else None
+
+            if positions:
+                pairs.append((position, positions.popleft()))
+            else:
+                unpaired.append(position)
+
+        paired = {new_position for _, new_position in pairs}
+        old_left = unpaired
+        new_left = [position for position in new_left if not position in paired]
+
+    old_names = _getNames(old)
+    new_names = _getNames(new)
+
+    for position in old_left:
+        changes.append(("removed", prefix + old_names[position], old[position], None))
+
+    for old_position, new_position in sorted(pairs, key = lambda pair: pair[1]):
+
+        old_statement = old[old_position]
+        new_statement = new[new_position]
+        path = prefix + new_names[new_position]
+
+        old_block = _getBlock(old_statement)
+        new_block = _getBlock(new_statement)
+
+        if old_block is not None and new_block is not None and old_statement._operator == new_statement._operator:
+            _diffBlock(old_block, new_block, path + "/", changes)
+        else:
+            changes.append(("changed", path, old_statement, new_statement))
+
+    for position in new_left:
+        changes.append(("added", prefix + new_names[position], None, new[position]))
+
+def _getBlock(statement:'Statement') -> typing.Optional[list['Statement']]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the Statements of the block of a Statement, or
+    None if its value isn't a block.
+    '''
+
+    value = statement.get_value()
+
+    if isinstance(value, PDXscript):
+        return value._getStatements()
+
+    if isinstance(value, list) and (not value or isinstance(value[0], Statement)):
+        return value
+
+    return None
+
+def _getIdentity(statement:'Statement') -> typing.Optional[tuple[str,str]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the keyword and `id` of a block, or None if it
+    has no `id`.
+    '''
+
+    block = _getBlock(statement)
+
+    if block is None:
+        return None
+
+    for child in block:
+
+        if child._keyword == "id" and isinstance(child.get_value(), str):
+            return statement._keyword, child.get_value()
+
+    return None
+
+def _getKeyword(statement:'Statement') -> typing.Optional[str]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the keyword of a Statement, or None for a block
+    with an `id`, since blocks with different ids are different objects.
+    '''
+
+    if _getIdentity(statement) is not None:
+        return None
+
+    return statement._keyword
+
+def _getNames(statements:list['Statement']) -> list[str]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the path name of each Statement of a block: its
+    keyword, with its position among the Statements of the same keyword if
+    there are several.
+    '''
+
+    counts = collections.Counter(statement._keyword for statement in statements)
+    seen:dict[str,int] = {}
+    names = []
+
+    for statement in statements:
+
+        keyword = statement._keyword
+
+        if counts[keyword] == 1:
+            names.append(str(keyword))
+            continue
+
+        seen[keyword] = seen.get(keyword, -1) + 1
+        names.append(f"{keyword}[{seen[keyword]}]")
+
+    return names
@@ -0,0 +1,294 @@
+'''
+loader.py
+
+This module loads many pdx script files at once with a process pool, or
+from an asyncio event loop.
+
+Function
+-----------------------------------------------------------------------
+- `load_directory` : Load every matching pdx script file under a directory.
+- `aiter_directory` : Load the matching files concurrently for `async for`.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import load_directory
+>>> root = "C:/Program Files (x86)/Steam/steamapps/common/Hearts of Iron IV"
+>>> scripts = load_directory(root, "common/national_focus/*.txt", workers = 4)
+>>> async for path, script in aiter_directory(root, "events/*.txt", limit = 8):
+>>>     print(path, len(script))
+'''
+
+import asyncio
+import concurrent.futures
+import glob
+import marshal
+import os
+import time
+import typing
+
+from .pdxscript import PDXscript
+
+def load_directory(root:str,
+                   pattern:str = "**/*.txt",
+                   workers:int = None,
+                   ordered:bool = True,
+                   errors:dict[str,Exception] = None,
+                   chunk_bytes:int = 1 << 20,
+                   stats:'ParseStats' = None) -> dict[str,'PDXscript']:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Load every file under `root` matching the glob `pattern` in a process
+    pool. Workers send the parsed trees back as marshalled nested tuples
+    (see `PDXscript._getPacked()`), which is much cheaper to transfer than
+    pickled objects.
+
+    Files are grouped into chunks of about `chunk_bytes` and the chunks are
+    scheduled from the largest file down, so a few huge files start first
+    instead of leaving the other workers idle at the end.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `root` (str) : the directory to search.
+    - `pattern` (str) : the glob pattern relative to root. `**` matches any
+    sub directories.
+    - `workers` (int) : the number of processes. Default to the CPU count.
+    Files are loaded in this process when it's 1.
+    - `ordered` (bool) : keep the result in sorted path order. Otherwise
+    it's in the order the files are finished.
+    - `errors` (dict) : if given, the exception of each failed file is put
+    into it by path instead of being raised.
+    - `chunk_bytes` (int) : the file size a chunk of work aims at.
+    - `stats` (ParseStats) : the collector to add the record of each loaded
+    file to. Records of the workers also have the `pack` and `unpack` phases,
+    the cost of sending the tree back.
+
+    Return
+    -----------------------------------------------------------------------
+    dict[str, PDXscript] : the loaded scripts by path.
+
+    Raise
+    -----------------------------------------------------------------------
+    Any exception of a failed file, if `errors` isn't given.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> failed = {}
+    >>> scripts = load_directory(root, "events/*.txt", errors = failed)
+    >>> for path, error in failed.items():
+    >>>     print(path, error)
+    >>> stats = ParseStats()
+    >>> scripts = load_directory(root, "events/*.txt", stats = stats)
+    >>> print(stats.report())
+    '''
+
+    return _loadPaths(_getPaths(root, pattern), workers, ordered, errors, chunk_bytes, stats)
+
+def _loadPaths(paths:list[str],
+               workers:int = None,
+               ordered:bool = True,
+               errors:dict[str,Exception] = None,
+               chunk_bytes:int = 1 << 20,
+               stats:'ParseStats' = None) -> dict[str,'PDXscript']:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Load the given files the way `load_directory()`
+    does, keeping the given order when `ordered` is set.
+    '''
+
+    scripts:dict[str,'PDXscript'] = {}
+    failed:dict[str,Exception] = {}
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(paths) <= 1:
+
+        for path in paths:
+
+            try:
+                scripts[path] = PDXscript(path, stats = stats)
+
+            except Exception as error:
+                failed[path] = error
+
+    else:
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            futures = [executor.submit(_loadChunk, chunk, stats is not None) for chunk in _getChunk(paths, chunk_bytes)]
+
+            for future in concurrent.futures.as_completed(futures):
+
+                for path, packed, error, record in future.result():
+
+                    if error is not None:
+                        failed[path] = error
+                        continue
+
+                    start = time.perf_counter()
+                    scripts[path] = PDXscript._fromPacked(marshal.loads(packed))
+
+                    if record is not None:
+                        record["seconds"]["unpack"] = time.perf_counter() - start
+                        stats.add(record)
+
+    if failed and errors is None:
+        raise failed[min(failed)]
+
+    if errors is not None:
+        errors.update(failed)
+
+    if ordered:
+        scripts = {path : scripts[path] for path in paths if path in scripts}
+
+    return scripts
+
+async def aiter_directory(root:str,
+                          pattern:str = "**/*.txt",
+                          executor:concurrent.futures.Executor = None,
+                          limit:int = 8,
+                          errors:dict[str,Exception] = None,
+                          stats:'ParseStats' = None) -> typing.AsyncIterator[tuple[str,'PDXscript']]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Load every file under `root` matching the glob `pattern` without
+    blocking the event loop, and generate each script as soon as it's
+    loaded. Each file is loaded by `PDXscript.aload()` in `executor`, and
+    at most `limit` of them are loaded or waiting to be taken at a time.
+
+    Leaving the `async for` early, or cancelling the task running it,
+    cancels the loads not finished yet.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `root` (str) : the directory to search.
+    - `pattern` (str) : the glob pattern relative to root. `**` matches any
+    sub directories.
+    - `executor` (Executor) : a ThreadPoolExecutor or ProcessPoolExecutor.
+    Default to the default executor of the event loop.
+    - `limit` (int) : the number of files loaded at the same time.
+    - `errors` (dict) : if given, the exception of each failed file is put
+    into it by path and the file is skipped, instead of being raised.
+    - `stats` (ParseStats) : the collector to add the record of each loaded
+    file to.
+
+    Return
+    -----------------------------------------------------------------------
+    AsyncIterator[tuple[str, PDXscript]] : `(path, script)` in the order
+    the files are finished.
+
+    Raise
+    -----------------------------------------------------------------------
+    The exception of the first failed file, if `errors` isn't given.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> with concurrent.futures.ProcessPoolExecutor() as pool:
+    >>>     async for path, script in aiter_directory(root, "common/**/*.txt", pool):
+    >>>         index.update(path, script)
+    '''
+
+    loop = asyncio.get_running_loop()
+    paths = await loop.run_in_executor(None, _getPaths, root, pattern)
+    paths.reverse()
+
+    pending:dict[asyncio.Future,str] = {}
+
+    try:
+        while paths or pending:
+
+            while paths and len(pending) < max(limit, 1):
+                path = paths.pop()
+                pending[asyncio.ensure_future(PDXscript.aload(path, executor, stats = stats))] = path
+
+            done, _ = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+
+            for future in done:
+
+                path = pending.pop(future)
+                error = future.exception()
+
+                if error is None:
+                    yield path, future.result()
+
+                elif errors is None:
+                    raise error
+
+                else:
+                    errors[path] = error
+
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions = True)
+
+def _getPaths(root:str, pattern:str) -> list[str]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the sorted paths of the files under `root`
+    matching the glob `pattern`.
+    '''
+
+    return sorted(os.path.join(root, name)
+                  for name in glob.glob(pattern, root_dir = root, recursive = True)
+                  if os.path.isfile(os.path.join(root, name)))
+
+def _getChunk(paths:list[str], chunk_bytes:int) -> list[list[str]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Group the paths into chunks of about `chunk_bytes`,
+    largest files first. A file larger than `chunk_bytes` is a chunk alone.
+    '''
+
+    sized = sorted(((os.path.getsize(path), path) for path in paths), reverse = True)
+
+    chunks:list[list[str]] = []
+    chunk:list[str] = []
+    total = 0
+
+    for size, path in sized:
+
+        if chunk and total + size > chunk_bytes:
+            chunks.append(chunk)
+            chunk = []
+            total = 0
+
+        chunk.append(path)
+        total += size
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+def _loadChunk(paths:list[str], profile:bool = False) -> list[tuple[str,typing.Optional[bytes],typing.Optional[Exception],typing.Optional[dict]]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Load the files of a chunk in a worker process.
+
+    Return
+    -----------------------------------------------------------------------
+    list[tuple] : `(path, marshalled script, None, record)` for each loaded
+    file, or `(path, None, exception, None)` for each failed one. The record
+    of ParseStats is None unless `profile` is set.
+    '''
+
+    results = []
+
+    for path in paths:
+
+        try:
+            packed, record = PDXscript._loadPacked(path, profile = profile)
+            results.append((path, packed, None, record))
+
+        except Exception as error:
+            results.append((path, None, error, None))
+
+    return results
@@ -0,0 +1,466 @@
+'''
+overlay.py
+
+This module merges the files of the game and of its mods into the
+effective scripts the game ends up with.
+
+Class
+-----------------------------------------------------------------------
+- `Overlay` : Ordered layers of game and mod files, resolved into the
+              effective scripts.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import Overlay
+>>> overlay = Overlay()
+>>> overlay.add_layer("vanilla", "C:/Program Files (x86)/Steam/steamapps/common/Hearts of Iron IV")
+>>> overlay.add_mod("C:/Users/me/Documents/Paradox Interactive/Hearts of Iron IV/mod/my_mod/descriptor.mod")
+>>> focuses = overlay.resolve("common/national_focus/*.txt")
+'''
+
+import os
+import posixpath
+import typing
+
+from .pdxscript import PDXscript, Statement
+from .loader import _getPaths, _loadPaths
+
+class Overlay:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Ordered layers of pdx script files, like the game then each mod in load
+    order, resolved into the effective scripts in three steps:
+
+    1. Whole files: a file replaces the file at the same relative path of
+    every earlier layer.
+    2. `replace_path`: a layer drops the files of every earlier layer
+    directly in each of its replaced directories. Sub directories aren't
+    affected.
+    3. Objects: an object Statement replaces every earlier one with the
+    same identity key, like a focus tree or an event with the same `id`.
+    Later layers are later, and in a layer the files go in path order.
+    Objects are the top-level Statements by default. Nested ones, like the
+    focuses in `focus_tree` blocks, are given by their path of keywords.
+
+    Only the files left after the first two steps are read. Identity keys
+    are kept in a dict, so resolving is linear in the number of object
+    Statements. A file that lost nothing is returned as it was read, and
+    the others share the Statements they kept, so no subtree is copied.
+    Only the blocks on the way down to a replaced nested object are new.
+    It also means a change to an effective script changes the layer's.
+
+    Function
+    -----------------------------------------------------------------------
+    - `__init__()` : Initialize an overlay without layers.
+    - `add_layer()` : Add a layer on top of the others.
+    - `add_mod()` : Add a mod layer from its descriptor file.
+    - `resolve()` : Get the effective scripts of the matching files.
+    - `get_origin()` : Get the layer and file that supplied a Statement.
+    - `get_file_origin()` : Get the layer that supplied an effective file.
+    - `get_overrides()` : Get the objects replaced by later ones.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> overlay = Overlay(workers = 4).add_layer("vanilla", game_root).add_layer("my_mod", mod_root, ["events"])
+    >>> events = overlay.resolve("events/*.txt")
+    >>> for path, script in events.items():
+    >>>     for statement in script:
+    >>>         print(overlay.get_origin(statement), statement.get_keyword())
+    >>> effects = overlay.resolve("common/scripted_effects/*.txt", key = lambda statement: statement.get_keyword())
+    >>> focuses = overlay.resolve("common/national_focus/*.txt", objects = "focus_tree/focus")
+    '''
+
+    def __init__(self, workers:int = 1) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Initialize an overlay without layers.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `workers` (int) : the number of processes to read the files with,
+        see `load_directory()`. None for the CPU count.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self._workers = workers
+        self._layers:list[tuple[str,str,frozenset[str]]] = []
+        self._files:dict[str,str] = {}
+        self._origin:dict[int,tuple['Statement',str,str]] = {}
+        self._nested:typing.Optional[dict[int,tuple['Statement',str,str]]] = None
+        self._overrides:list[tuple[typing.Hashable,tuple[str,str],tuple[str,str]]] = []
+
+    def add_layer(self, name:str, root:str, replace_paths:typing.Iterable[str] = ()) -> 'Overlay':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Add a layer on top of the others.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `name` (str) : the name of the layer, as `get_origin()` gives it.
+        - `root` (str) : the root directory of the layer, the one containing
+        `common`, `events` and so on.
+        - `replace_paths` (Iterable[str]) : the directories relative to the root
+        whose files of earlier layers are dropped.
+
+        Return
+        -----------------------------------------------------------------------
+        Overlay : this overlay.
+        '''
+
+        replaced = frozenset(path.replace("\\", "/").strip("/") for path in replace_paths)
+        self._layers.append((name, root, replaced))
+
+        return self
+
+    def add_mod(self, descriptor:str, root:str = None) -> 'Overlay':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Add a mod layer from its descriptor file. The name and the
+        `replace_path` entries are read from it.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `descriptor` (str) : the path of the `descriptor.mod` file.
+        - `root` (str) : the root directory of the mod. Default to the
+        directory of the descriptor.
+
+        Return
+        -----------------------------------------------------------------------
+        Overlay : this overlay.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> overlay.add_mod(mod_root + "/descriptor.mod")
+        '''
+
+        script = PDXscript(descriptor)
+        name = script.find("name")
+        replace_paths = [statement.get_value().strip('"') for statement in script.find_all("replace_path")
+                         if isinstance(statement.get_value(), str)]
+
+        if root is None:
+            root = os.path.dirname(os.path.abspath(descriptor))
+
+        if name is None or not isinstance(name.get_value(), str):
+            name = os.path.basename(root)
+        else:
+            name = name.get_value().strip('"')
+
+        return self.add_layer(name, root, replace_paths)
+
+    def resolve(self,
+                pattern:str = "**/*.txt",
+                key:typing.Union[str,typing.Callable[['Statement'],typing.Optional[typing.Hashable]]] = "id",
+                errors:dict[str,Exception] = None,
+                objects:str = "*") -> dict[str,'PDXscript']:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the effective scripts of the files matching the glob `pattern`
+        in every layer. The origins and overrides of earlier calls are
+        replaced.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `pattern` (str) : the glob pattern relative to the layer roots.
+        - `key` (str | Callable) : the identity of an object Statement. A
+        str is the keyword of the child whose value is the identity, paired
+        with the keyword of the Statement, like `("country_event", "fin.1")`.
+        A callable gets the Statement and gives a hashable identity. A
+        Statement without identity (None) never replaces another.
+        - `errors` (dict) : if given, the exception of each failed file is put
+        into it by path instead of being raised.
+        - `objects` (str) : the keywords from the top level down to the object
+        Statements, separated by `/`, where `*` is any keyword. Default to
+        every top-level Statement.
+
+        Return
+        -----------------------------------------------------------------------
+        dict[str, PDXscript] : the effective scripts by relative path with `/`
+        separators, in path order.
+
+        Raise
+        -----------------------------------------------------------------------
+        Any exception of a failed file, if `errors` isn't given.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> focuses = overlay.resolve("common/national_focus/*.txt")
+        >>> focuses["common/national_focus/finland.txt"]
+        >>> focuses = overlay.resolve("common/national_focus/*.txt", objects = "focus_tree/focus")
+        '''
+
+        if isinstance(key, str):
+            key = _getIdentityKey(key)
+
+        steps = objects.replace("\\", "/").strip("/").split("/")
+
+        winners:dict[str,int] = {}
+
+        for layer, (_, root, replaced) in enumerate(self._layers):
+
+            if replaced:
+                winners = {path : winner for path, winner in winners.items()
+                           if not posixpath.dirname(path) in replaced}
+
+            for path in _getPaths(root, pattern):
+                winners[os.path.relpath(path, root).replace(os.sep, "/")] = layer
+
+        scripts:dict[tuple[int,str],'PDXscript'] = {}
+
+        for layer, (_, root, _) in enumerate(self._layers):
+
+            relative = {os.path.join(root, path) : path for path, winner in winners.items() if winner == layer}
+
+            for path, script in _loadPaths(list(relative), self._workers, False, errors).items():
+                scripts[(layer, relative[path])] = script
+
+        owners:dict[typing.Hashable,tuple['Statement',int,str]] = {}
+        removed:dict[str,set[int]] = {}
+        self._overrides = []
+
+        for layer, path in sorted(scripts):
+
+            for statement in _getObjects(scripts[(layer, path)]._getStatements(), steps):
+
+                identity = key(statement)
+
+                if identity is None:
+                    continue
+
+                owner = owners.get(identity)
+
+                if owner is not None:
+                    removed.setdefault(owner[2], set()).add(id(owner[0]))
+                    self._overrides.append((identity, (self._layers[layer][0], path), (self._layers[owner[1]][0], owner[2])))
+
+                owners[identity] = (statement, layer, path)
+
+        effective:dict[str,'PDXscript'] = {}
+        self._files = {}
+        self._origin = {}
+        self._nested = None
+
+        for layer, path in sorted(scripts, key = lambda item: item[1]):
+
+            script = scripts[(layer, path)]
+            name = self._layers[layer][0]
+
+            if path in removed:
+                kept = _getKept(script._getStatements(), steps, removed[path])
+                script = PDXscript()
+                script._element = PDXscript(statements = kept)
+
+            for statement in script._getStatements():
+                self._origin[id(statement)] = (statement, name, path)
+
+            effective[path] = script
+            self._files[path] = name
+
+        return effective
+
+    def get_origin(self, statement:'Statement') -> typing.Optional[tuple[str,str]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the layer and file that supplied a Statement of the last
+        resolved scripts. A nested Statement comes from the same layer as the
+        top-level one it's in; the first lookup of one indexes every nested
+        Statement.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `statement` (Statement) : a Statement at any level of the effective
+        scripts.
+
+        Return
+        -----------------------------------------------------------------------
+        tuple[str, str] | None : the layer name and the relative path, or
+        None if the Statement isn't in the effective scripts.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> overlay.get_origin(focuses["common/national_focus/finland.txt"][0])
+        ('my_mod', 'common/national_focus/finland.txt')
+        '''
+
+        entry = self._origin.get(id(statement))
+
+        if entry is None or entry[0] is not statement:
+
+            if self._nested is None:
+                self._nested = self._getNested()
+
+            entry = self._nested.get(id(statement))
+
+        if entry is None or entry[0] is not statement:
+            return None
+
+        return entry[1], entry[2]
+
+    def get_file_origin(self, path:str) -> typing.Optional[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the layer that supplied an effective file of the last resolved
+        scripts.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str) : the relative path of the file.
+
+        Return
+        -----------------------------------------------------------------------
+        str | None : the layer name, or None if there's no such file.
+        '''
+
+        return self._files.get(path.replace("\\", "/"))
+
+    def get_overrides(self) -> list[tuple[typing.Hashable,tuple[str,str],tuple[str,str]]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the objects of the last resolved scripts replaced by later ones,
+        in the order they were replaced. Files replaced as a whole aren't
+        listed.
+
+        Return
+        -----------------------------------------------------------------------
+        list[tuple] : `(identity, (winner layer, path), (replaced layer, path))`.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> for identity, winner, replaced in overlay.get_overrides():
+        >>>     print(identity, "from", replaced, "replaced by", winner)
+        '''
+
+        return list(self._overrides)
+
+    def _getNested(self) -> dict[int,tuple['Statement',str,str]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the origin of every nested Statement of the
+        effective scripts, by id.
+        '''
+
+        nested:dict[int,tuple['Statement',str,str]] = {}
+
+        for statement, name, path in self._origin.values():
+
+            stack = [statement]
+
+            while stack:
+
+                value = stack.pop().get_value()
+
+                if isinstance(value, PDXscript):
+                    value = value._getStatements()
+
+                elif not isinstance(value, list):
+                    continue
+
+                for child in value:
+
+                    if isinstance(child, Statement):
+                        nested[id(child)] = (child, name, path)
+                        stack.append(child)
+
+        return nested
+
+def _getIdentityKey(keyword:str) -> typing.Callable[['Statement'],typing.Optional[tuple[str,str]]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the identity function pairing the keyword of a
+    Statement with the value of its child `keyword`.
+    '''
+
+    def getIdentity(statement:'Statement') -> typing.Optional[tuple[str,str]]:
+
+        value = statement.get_value()
+
+        if not isinstance(value, PDXscript):
+            return None
+
+        for child in value._getStatements():
+
+            if child._keyword == keyword and isinstance(child.get_value(), str):
+                return statement._keyword, child.get_value()
+
+        return None
+
+    return getIdentity
+
+def _getObjects(statements:list['Statement'], steps:list[str]) -> list['Statement']:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the object Statements at the path of keywords,
+    in script order.
+    '''
+
+    keyword = steps[0]
+    matching = [statement for statement in statements if keyword == "*" or statement._keyword == keyword]
+
+    if len(steps) == 1:
+        return matching
+
+    found = []
+
+    for statement in matching:
+
+        value = statement.get_value()
+
+        if isinstance(value, PDXscript):
+            found.extend(_getObjects(value._getStatements(), steps[1:]))
+
+    return found
+
+def _getKept(statements:list['Statement'], steps:list[str], removed:set[int]) -> list['Statement']:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the Statements without the removed objects at the
+    path of keywords. A Statement on the way down that lost an object gets
+    a new one with a new block, and every other Statement is kept as it is.
+    '''
+
+    keyword = steps[0]
+    kept = []
+
+    for statement in statements:
+
+        if keyword != "*" and statement._keyword != keyword:
+            kept.append(statement)
+            continue
+
+        if len(steps) == 1:
+
+            if not id(statement) in removed:
+                kept.append(statement)
+
+            continue
+
+        value = statement.get_value()
+
+        if not isinstance(value, PDXscript):
+            kept.append(statement)
+            continue
+
+        children = value._getStatements()
+        inner = _getKept(children, steps[1:], removed)
+
+        if len(inner) == len(children):
+            kept.append(statement)
+        else:
+            kept.append(Statement(statement._keyword, PDXscript(statements = inner), statement.get_operator()))
+
+    return kept
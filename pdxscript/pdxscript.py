@@ -1,6 +1,129 @@
 
 import typing
-import codecs
+import asyncio
+import concurrent.futures
+import datetime
+import hashlib
+import io
+import marshal
+import mmap
+import os
+import re
+import sys
+import time
+
+from .stats import ParseStats, _NULL_TIMER
+
+# Master pattern of the single-pass scanner. Whitespace isn't matched by any
+# alternative, so `finditer` skips it for free. A word may carry a `{` after
+# its first character because the legacy tokenizer emits `#L` for it without
+# flushing the word.
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<word>(?:[^\t \n={}><#"\\]|"[^"\\\n]*")(?:[^\t \n=}><#"\\]|"[^"\\\n]*")*)
+  | (?P<comment>\#[^\n]*)
+  | (?P<escape>["\\])
+  | (?P<symbol>[{}=><])
+''', re.VERBOSE)
+
+_COMMENT_PATTERN = re.compile(r'\#[^\n]*')
+
+# A quote closed on its line, the way _getToken() reads it: a back slash
+# makes the next quote a plain character. Unrolled, so runs of plain
+# characters are matched at once.
+_QUOTED = r'"[^"\\\n]*(?:\\[^"\n]*"[^"\\\n]*)*"'
+
+# A closed quote, captured, or a comment, so comments are split out of the
+# text without a `#` inside quotes being taken for one.
+_QUOTED_COMMENT_PATTERN = re.compile("(" + _QUOTED + r")|\#[^\n]*")
+
+# The longest text without a quote or back slash out of closed quotes and
+# comments. Whatever stops it needs the per-character walk.
+_CLEAN_PATTERN = re.compile(r'[^"\\#]*(?:(?:' + _QUOTED + r'|\#[^\n]*)[^"\\#]*)*')
+
+# Stands for a closed quote while lines are split in bulk. Texts holding it
+# are scanned without the bulk split.
+_QUOTE_MARK = "\x00"
+
+# A closed quote, captured, when the text has no comment.
+_QUOTED_PATTERN = re.compile("(" + _QUOTED + ")")
+
+# A quote mark glued to the character after it, and, on the reversed text,
+# to the one before it. A quote mark not glued to either is a whole token.
+_GLUED_AFTER_PATTERN = re.compile(r'\x00[^\t \n=}><]')
+_GLUED_BEFORE_PATTERN = re.compile(r'\x00[^\t \n={}><]')
+
+# A `{` right after a word character.
+_GLUED_BRACKET_PATTERN = re.compile(r'[^\t \n=}><{]\{')
+
+# Whitespace known by str.split() but not by _getToken().
+_SPACE_PATTERN = re.compile(r'[\r\x0b\x0c\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]')
+
+# Brackets, closed quotes and comments for the bracket matching pass of the
+# lazy mode. A lone quote or back slash stops it for the per-character walk.
+_BRACKET_PATTERN = re.compile(r'"[^"\\\n]*"|\#[^\n]*|[{}]|["\\]')
+
+# Text where brackets can be counted with str.count(): anything but quotes,
+# comments and back slashes, and quoted words without brackets in them.
+_PLAIN_PATTERN = re.compile(r'(?:[^"#\\]*"[^"\n{}#\\]*")*[^"#\\]*')
+
+# Bytes to drop from utf-8 text, keeping the ones that decide how brackets
+# are matched. Bytes of other characters are never any of them.
+_BRACKET_DELETE = bytes(code for code in range(256) if not chr(code) in '"{}#\\\n')
+
+# The text before a block that holds nothing but its keyword and operator.
+_HEAD_PATTERN = re.compile(r'[\t \n]*([^\t \n={}><#"\\]+)[\t \n]*([=><])[\t \n]*$')
+
+# Token standing for a block kept as a source span. No script text can
+# produce it, since `#` always starts a comment.
+_LAZY_TOKEN = "#B"
+
+_SYMBOL_TOKEN = {
+    "{" : "#L",
+    "}" : "#R",
+    "=" : "#E",
+    ">" : "#G",
+    "<" : "#S"
+}
+
+# One step of a select() path, such as `focus[id=FIN_x]`.
+_SELECT_PATTERN = re.compile(r'\s*([^/\[\]\s]+)\s*(?:\[\s*([^=\]\s]+)\s*=\s*([^\]]*?)\s*\])?\s*$')
+
+# Files from this size are memory-mapped and decoded straight from the mapping.
+_MMAP_SIZE = 1 << 16
+
+# Spans from this size ending with a block are split into the spans of the
+# block's content by the incremental mode.
+_SPAN_SIZE = 1 << 12
+
+# Length of the text compared at once when looking for the edited part of
+# a file.
+_COMPARE_SIZE = 1 << 16
+
+# Operators are kept as small integer codes. Any other string a script
+# puts in operator position is kept as it is.
+_OPERATOR_CODE = {
+    "#E" : 0,
+    "#G" : 1,
+    "#S" : 2
+}
+
+_OPERATOR_NAME = ("#E", "#G", "#S")
+
+_OPERATOR_LITERAL = ("=", ">", "<")
+
+# A scalar value read as a number, a date like `1936.1.1` or `1936.1.1.12`
+# with an optional hour, or a quoted string.
+_TYPED_PATTERN = re.compile(r'([+-]?\d+)|([+-]?(?:\d+\.\d*|\.\d+))|(\d+)\.(\d+)\.(\d+)(?:\.(\d+))?|"(.*)"', re.S)
+
+# Typed values by the text they were decoded from. The cache is emptied when
+# it reaches this size.
+_TYPED_CACHE_SIZE = 1 << 16
+
+_TYPED_CACHE:dict[str,typing.Any] = {}
+
+# Holder of a Statement put in several blocks, or of a block set as the value
+# of several Statements. A change to it can't be traced to one block.
+_SEVERAL_HOLDERS = object()
 
 class Statement:
     '''
@@ -13,11 +136,12 @@ class Statement:
     -----------------------------------------------------------------------
     - `__init__()` : initialize the storing object with given keyword and value.
     - `get_keyword()` : get the keyword of the Statement object.
-    - `get_value()` : get the value of the Statement object.
+    - `get_value()` : get the value of the Statement object, as text or typed.
     - `get_operator()` get the operator of the Statement object.
     - `set_keyowrd()` : set the keyword of the Statement object.
     - `set_value()` : set the value of the Statement object.
     - `set_operator()` : set the operator of the Statement object.
+    - `get_hash()` : get the structural hash of the Statement object.
 
     Usage
     -----------------------------------------------------------------------
@@ -29,6 +153,13 @@ class Statement:
 
     '''
 
+    __slots__ = ("_keyword", "_value", "_operator", "_owner")
+
+    # Counts the keyword changes of the Statements held by several blocks. A
+    # keyword index built before the last one is rebuilt on use; the other
+    # changes only drop the index of the block holding the Statement.
+    _renamed = 0
+
     def __init__(self,keyword:str = None, value:typing.Union[str,list,'PDXscript'] = None, operator:typing.Literal["#E","#G","#S"] = "#E") -> None:
         '''
         Description
@@ -68,13 +199,57 @@ class Statement:
         '''
         self._keyword = keyword
         self._value = value
-        self._operator = operator
+        self._operator = _OPERATOR_CODE.get(operator, operator)
+        self._owner = None
+
+        if isinstance(value, PDXscript):
+            PDXscript._setOwner(value, self)
 
     def get_keyword(self) -> str:
         return self._keyword
     
-    def get_value(self) -> typing.Union[str,list,'PDXscript'] :
-        return self._value
+    def get_value(self, typed:bool = False) -> typing.Union[str,list,'PDXscript',typing.Any] :
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the value of the Statement object. Values are kept as the text
+        written in the script. If set typed parameter to True, a text value
+        and the items of a value list like `{ 1 2 3 }` are decoded:
+
+        - `yes` and `no` to bool.
+        - integers to int, and numbers with a `.` to float.
+        - dates like `1936.1.1` to datetime.date, or datetime.datetime with
+        the hour of `1936.1.1.12`.
+        - quoted strings to the text between the quotes.
+
+        Any other text, like a tag or a scope, is kept as it is, and so are
+        blocks. The decoding is only done when asked for, and the result is
+        cached by text, so values written the same way are decoded once.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `typed` (bool) : whether to decode the value.
+
+        Return
+        -----------------------------------------------------------------------
+        str | list | PDXscript | bool | int | float | datetime.date : the value.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> PDXscript.loads("cost = 10 start = 1936.1.1")[1].get_value(typed = True)
+        datetime.date(1936, 1, 1)
+        '''
+
+        value = self._value
+
+        if type(value) is _LazyBlock:
+            value = value._expand()
+            self._putValue(value)
+
+        if typed:
+            return Statement._getTyped(value)
+
+        return value
     
     def get_operator(self,literal:bool = False) -> typing.Literal['#E','#G','#S', '=', ">", "<"]:
 
@@ -95,27 +270,183 @@ class Statement:
 
         '''
 
+        operator = self._operator
+
+        if type(operator) is not int:
+            return None if literal else operator
+
         if not literal:
-            return self._operator
-        
+            return _OPERATOR_NAME[operator]
+
         else:
-            if self._operator == "#E":
-                return "="
-            
-            elif self._operator == "#G":
-                return ">"
-            
-            elif self._operator == "#S":
-                return "<"
+            return _OPERATOR_LITERAL[operator]
 
     def set_keyowrd(self,keyword:str) -> None:
+        renamed = (self._keyword, keyword)
         self._keyword = keyword
+        owner = self._owner
+
+        if owner is _SEVERAL_HOLDERS or (owner is not None and owner._isShared(self)):
+            Statement._renamed += 1
+
+        elif owner is not None:
+            owner._keywordIndex = None
+
+        PDXscript._touch(self, renamed)
 
     def set_value(self,value:typing.Union[str,list,'PDXscript']) -> None:
         self._value = value
 
+        if isinstance(value, PDXscript):
+            PDXscript._setOwner(value, self)
+
+        PDXscript._touch(self, (self._keyword,))
+
     def set_operator(self, operator:typing.Literal["#E","#G","#S"]) -> None:
-        self._operator = operator
+        self._operator = _OPERATOR_CODE.get(operator, operator)
+        PDXscript._touch(self, (self._keyword,))
+
+    def get_hash(self) -> bytes:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the structural hash of the Statement: its keyword, operator and
+        value, with a block hashed by `PDXscript.get_hash()`. Two Statements
+        with the same hash are written as the same text, whatever the
+        formatting of the files they were read from.
+
+        Return
+        -----------------------------------------------------------------------
+        bytes : the 16 bytes hash.
+        '''
+
+        return hashlib.blake2b(self._getHashText().encode("utf-8", "surrogatepass"), digest_size = 16).digest()
+
+    def _getCopy(self) -> 'Statement':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get a copy of the Statement for a script that stops
+        sharing its Statements. A block isn't copied but cloned, so it's only
+        copied in turn when it's changed.
+        '''
+
+        value = self._value
+        copy = Statement.__new__(Statement)
+
+        if isinstance(value, PDXscript):
+            value = value.clone()
+            value._owner = copy
+
+        elif type(value) is list:
+            value = [obj._getCopy() if isinstance(obj, Statement) else obj for obj in value]
+
+        copy._keyword = self._keyword
+        copy._value = value
+        copy._operator = self._operator
+        copy._owner = None
+
+        return copy
+
+    def _putValue(self, value:typing.Union[str,list,'PDXscript']) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Set the value of a Statement being built by a parser.
+        A block is taken over by the Statement without the checks and the
+        change tracking of `set_value()`, since nothing else holds it yet.
+        '''
+
+        self._value = value
+
+        if type(value) is PDXscript:
+            value._owner = self
+
+    @staticmethod
+    def _getTyped(value:typing.Any) -> typing.Any:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Decode a text value, or the texts of a value list,
+        see `get_value()`. Anything else is returned as it is.
+        '''
+
+        if type(value) is list:
+
+            if value and type(value[0]) is str:
+                return [Statement._getTyped(obj) for obj in value]
+
+            return value
+
+        if type(value) is not str:
+            return value
+
+        typed = _TYPED_CACHE.get(value, _TYPED_CACHE)
+
+        if typed is not _TYPED_CACHE:
+            return typed
+
+        typed = value
+        match = _TYPED_PATTERN.fullmatch(value)
+
+        if value == "yes" or value == "no":
+            typed = value == "yes"
+
+        elif match is None:
+            pass
+
+        elif match.group(1) is not None:
+            typed = int(match.group(1))
+
+        elif match.group(2) is not None:
+            typed = float(match.group(2))
+
+        elif match.group(7) is not None:
+            typed = match.group(7)
+
+        else:
+            year, month, day, hour = match.group(3, 4, 5, 6)
+
+            try:
+                if hour is None:
+                    typed = datetime.date(int(year), int(month), int(day))
+                else:
+                    typed = datetime.datetime(int(year), int(month), int(day), int(hour))
+
+            except ValueError:
+                pass
+
+        if len(_TYPED_CACHE) >= _TYPED_CACHE_SIZE:
+            _TYPED_CACHE.clear()
+
+        _TYPED_CACHE[value] = typed
+
+        return typed
+
+    def _getHashText(self) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the text the hash of the Statement is made from.
+        A block stands by the hash of its block, so the text stays short.
+        '''
+
+        value = self.get_value()
+
+        if isinstance(value, PDXscript):
+            value = "\x02" + value.get_hash().hex()
+
+        elif isinstance(value, list):
+
+            if not value or isinstance(value[0], Statement):
+                value = "\x02" + PDXscript._getBlockHash(value).hex()
+            else:
+                value = "\x03" + "\x1f".join([str(obj) for obj in value])
+
+        else:
+            value = "\x01" + str(value)
+
+        return f"{self._keyword}\x1d{self._operator}\x1d{value}"
         
 class PDXscript:
     '''
@@ -133,11 +464,31 @@ class PDXscript:
     - `remove()` : Remove a Statement from the PDXscript object.
     - `pop()` : Remove a Statement from PDXscript object by index.
     - `extend()` : Extend PDXscript objects together.
+    - `find()` : Find the first Statement with the keyword.
+    - `find_all()` : Find every Statement with the keyword.
+    - `select()` : Find the Statements at a path of keywords.
+    - `clone()` : Get a copy of the script sharing everything until it's changed.
+    - `get_hash()` : Get the structural hash of the script.
     - `read()` : Read a given pdx script file and return PDXscript object.
+    - `reload()` : Read the file again, parsing only the blocks that changed.
+    - `loads()` : Get PDXscript object from pdx script text or bytes.
+    - `load()` : Get PDXscript object from an opened file.
+    - `aload()` : Read a pdx script file without blocking the event loop.
+    - `iterparse()` : Iterate the top-level Statements of a pdx script file.
+    - `extract()` : Read only the selected parts of a pdx script file.
     - `write()` : Write the PDXscript object to the file.
+    - `dump()` : Write the PDXscript object to an opened text file.
+    - `dumps()` : Get the PDXscript object as pdx script text.
+    - `awrite()` : Write the PDXscript object without blocking the event loop.
     - `_getTextBuffer()` : Internal method. Get the textBuffer from given script.
+    - `_iterText()` : Internal method. Generate the lines of given script.
     - `_getToken()` : Internal method. Get the tokens from given pdx script.
+    - `_scanToken()` : Internal method. Get the tokens from whole script text.
     - `_getStructure()` : Internal method. Get PDXscript object from given token.
+    - `_getLazyStructure()` : Internal method. Get PDXscript object keeping blocks unparsed.
+    - `_getShape()` : Internal method. Count the Statements and the depth.
+    - `_getPacked()` : Internal method. Get the script as nested tuples.
+    - `_fromPacked()` : Internal method. Get PDXscript object from nested tuples.
 
     Usage
     -----------------------------------------------------------------------
@@ -146,7 +497,15 @@ class PDXscript:
     >>> script.append(myFocus)
     '''
 
-    def __init__(self,path:str = None,statements:list['Statement'] = None) -> None:
+    __slots__ = ("_index", "_element", "_keywordIndex", "_indexRenamed", "_filterIndex", "_filterShared", "_hash", "_hashShared", "_shared", "_source", "_owner")
+
+    # Counts the changes that can't be traced to the blocks they change, like
+    # those of a Statement put in several blocks. A filter index of select()
+    # or a hash of get_hash() made before the last one is made again on use;
+    # the other changes only drop those of the blocks above the change.
+    _sharedModified = 0
+
+    def __init__(self,path:str = None,statements:list['Statement'] = None, legacy_tokenizer:bool = False, cache:'ParseCache' = None, lazy:bool = False, stats:'ParseStats' = None, incremental:bool = False) -> None:
         '''
         Description
         -----------------------------------------------------------------------
@@ -156,6 +515,17 @@ class PDXscript:
         -----------------------------------------------------------------------
         - path (str): The path of the pdx script file.
         - statements (list[Statement]): The Statement objects want to convert to PDXscript.
+        - legacy_tokenizer (bool): Use the per-character `_getToken()` instead of
+        the single-pass `_scanToken()`. Both produce the same tokens.
+        - cache (ParseCache): The on-disk cache to load the script from, if
+        the file is unchanged. Otherwise the parsed script is stored in it.
+        - lazy (bool): Keep every block as its source span and parse it only
+        when its value is first got. Ignored with `legacy_tokenizer` or `cache`.
+        - stats (ParseStats): The collector to add the time of each phase and
+        the counters of the file to. Nothing is measured without it.
+        - incremental (bool): Keep the source spans of the blocks, so
+        `reload()` only parses again the blocks that changed. Ignored with
+        `legacy_tokenizer`, `cache` or `lazy`.
 
         Return
         -----------------------------------------------------------------------
@@ -170,9 +540,21 @@ class PDXscript:
         -----------------------------------------------------------------------
         >>> path = "C:/Program Files (x86)/Steam/steamapps/common/Hearts of Iron IV/common/national_focus/finland.txt"
         >>> script = PDXscript(path)
+        >>> events = PDXscript(path, lazy = True)
+        >>> script = PDXscript(path, stats = stats)
+        >>> script = PDXscript(path, incremental = True)
         '''
 
         self._index = 0
+        self._keywordIndex:dict[str,list[int]] = None
+        self._indexRenamed = 0
+        self._filterIndex:dict[tuple[str,str],dict[str,list[int]]] = None
+        self._filterShared = 0
+        self._hash:typing.Optional[bytes] = None
+        self._hashShared = 0
+        self._shared = False
+        self._source:typing.Optional[_Source] = None
+        self._owner = None
 
         if path == None and statements == None:
             self._element = []
@@ -180,18 +562,82 @@ class PDXscript:
         
         if statements != None:
             self._element = statements
+
+            for statement in statements:
+                if isinstance(statement, Statement):
+                    PDXscript._setOwner(statement, self)
+
             return
 
-        textBuffer:list[str] = []
+        timer = _NULL_TIMER if stats is None else stats._start("read", path)
 
-        with open(file = path,mode = "r",encoding="utf-8-sig") as sourceFile:
-            for line in sourceFile:
-                textBuffer.append(line)
+        if stats is not None:
+            timer.count(bytes = os.path.getsize(path))
+
+        if cache is not None:
+            cached = cache.get(path)
+
+            if cached is None:
+                header = cache._getEntryHeader(path)
+
+            timer.lap("cache")
 
-        self._element:list['Statement'] = self._getStructure(self._getToken(textBuffer))
+            if cached is not None:
+                self._element = cached._element
+                self._element._owner = self
+                timer.stop(self)
+                return
+
+        if lazy and not legacy_tokenizer and cache is None:
+            text = self._readText(path)
+            timer.lap("read")
+            self._element = self._getLazyStructure(text)
+            self._element._owner = self
+            timer.lap("structure")
+            timer.stop(self)
+            return
+
+        if incremental and not legacy_tokenizer and cache is None:
+            text = self._readText(path)
+            timer.lap("read")
+            self._setSource(path, text, self._getSpans(text, 0, len(text)))
+            timer.lap("structure")
+            timer.stop(self)
+            return
+
+        if legacy_tokenizer:
+            textBuffer:list[str] = []
+
+            with open(file = path,mode = "r",encoding="utf-8-sig") as sourceFile:
+                for line in sourceFile:
+                    textBuffer.append(line)
+
+            if textBuffer and not textBuffer[-1].endswith("\n"):
+                textBuffer[-1] += "\n"
+
+            timer.lap("read")
+            tokens = self._getToken(textBuffer)
+
+        else:
+            text = self._readText(path)
+            timer.lap("read")
+            tokens = self._scanToken(text)
+
+        timer.lap("tokenize")
+        timer.count(tokens = len(tokens))
+        self._element:list['Statement'] = self._getStructure(tokens)
+        timer.lap("structure")
 
         if self._element == -1:
             raise ScriptNotClosedException("The bracket isn't closed in the pdx script file")
+
+        self._element._owner = self
+
+        if cache is not None:
+            cache.put(path, self, header)
+            timer.lap("cache")
+
+        timer.stop(self)
         
     def __iter__(self) -> 'PDXscript':
         self._index = 0
@@ -200,7 +646,7 @@ class PDXscript:
     def __next__(self) -> 'Statement':
 
         if self._index < len(self._element):
-            result = self._element[self._index]
+            result = self._element[self._index] if not self._shared else self._getOwned(self._index)
             self._index += 1
             return result
         
@@ -208,14 +654,26 @@ class PDXscript:
             raise StopIteration
 
     def __getitem__(self,index:int) -> 'Statement':
+        if self._shared:
+            return self._getOwned(index)
+
         return self._element[index]
     
     def __setitem__(self,index:int, value:'Statement') -> None:
 
         if not isinstance(value, Statement):
             raise TypeError("The __setitem__() method should always has value in Statement class.")
-        
+
+        if self._shared:
+            self._unshare()
+
+        if type(self._element) is list:
+            self._release(self._element[index])
+
         self._element[index] = value
+        self._hold(value)
+        self._keywordIndex = None
+        PDXscript._touch(self)
 
     def __len__(self) -> int:
         return len(self._element)
@@ -224,8 +682,17 @@ class PDXscript:
 
         if not isinstance(statement, Statement):
             raise TypeError("append() method only takes Statement object as argrument")
+
+        if self._shared:
+            self._unshare()
         
         self._element.append(statement)
+        self._hold(statement)
+        PDXscript._touch(self, (statement._keyword,))
+
+        if self._keywordIndex is not None:
+            self._keywordIndex.setdefault(statement._keyword, []).append(len(self._element) - 1)
+
         return self._element
 
     def insert(self, statement: 'Statement', index: int) -> 'PDXscript':
@@ -233,242 +700,2801 @@ class PDXscript:
         if not isinstance(statement, Statement):
             raise TypeError("insert() method only takes Statement object as argrument")
 
-        self._element.insert(index, statement)
+        if self._shared:
+            self._unshare(moving = True)
+
+        if type(self._element) is list:
+            self._element.insert(index, statement)
+        else:
+            self._element.insert(statement, index)
+        self._hold(statement)
+        self._keywordIndex = None
+        PDXscript._touch(self, (statement._keyword,))
         return self._element
 
     def remove(self, arg: 'Statement') -> 'PDXscript':
 
+        if self._shared:
+            self._unshare(moving = True)
+
         if len(self._element) == 0:
             return PDXscript()
 
-        elif isinstance(arg,'Statement'):
+        elif isinstance(arg,Statement):
             self._element.remove(arg)
+            self._release(arg)
+            self._keywordIndex = None
+            PDXscript._touch(self, (arg._keyword,))
             return self._element
 
         else:
             raise TypeError('remove_statement() only take Statement object as paramenter')
 
     def pop(self,index:int) -> 'PDXscript':
-        self._element.pop(index)
+        if self._shared:
+            self._unshare(moving = True)
+
+        self._release(self._element.pop(index))
+        self._keywordIndex = None
+        PDXscript._touch(self)
         return self._element
 
     def extend(self,script:typing.Union['PDXscript',list['PDXscript']]) -> 'PDXscript':
 
-        if issubclass(type(script),'PDXscript'):
+        if self._shared:
+            self._unshare()
+
+        length = len(self._element)
+
+        if isinstance(script,PDXscript):
 
             self._element.extend(script)
+            self._holdFrom(length)
+            self._keywordIndex = None
+            PDXscript._touch(self)
             return self._element
 
-        elif isinstance(script, list['PDXscript']):
+        elif isinstance(script, list):
 
             for pdxscriptObj in script:
                 self._element.extend(pdxscriptObj)
 
+            self._holdFrom(length)
+            self._keywordIndex = None
+            PDXscript._touch(self)
             return self._element
         
         raise TypeError("Wrong argument type for combine()")
-    
-    def read(self, filePath:str) -> 'PDXscript':
+
+    def find(self, keyword:str) -> typing.Optional['Statement']:
         '''
         Description
         -----------------------------------------------------------------------
-        Read a given PDXscript file and return the PDXscript object.
+        Find the first Statement with the keyword in this script. Nested
+        scripts aren't searched, use `select()` for that.
 
         Parameters
         -----------------------------------------------------------------------
-        - `filePath` (str): the path of the pdx file.
+        - `keyword` (str) : the keyword to find.
 
         Return
         -----------------------------------------------------------------------
-        PDXscript : the transformed object.
+        Statement | None : the Statement found, None if there's none.
 
         Usage
         -----------------------------------------------------------------------
-        >>> my_focus = PDXscript().read(path)
+        >>> focus_tree = script.find("focus_tree")
         '''
 
-        temp_pdx = PDXscript(filePath)
+        positions = self._getIndex().get(keyword)
 
-        return temp_pdx
+        if not positions:
+            return None
+
+        if self._shared:
+            return self._getOwned(positions[0])
 
-    def write(self, filePath:str) -> None:
+        return self._element[positions[0]]
+
+    def find_all(self, keyword:str) -> list['Statement']:
         '''
         Description
         -----------------------------------------------------------------------
-        Write the script as PDX script to the path file.
-        
+        Find every Statement with the keyword in this script, in order.
+        Nested scripts aren't searched, use `select()` for that.
+
         Parameters
         -----------------------------------------------------------------------
-        - `filePath` (str) : the path of the file want to write. Couldn't be
-        the original path of Heart of Iron IV.
+        - `keyword` (str) : the keyword to find.
 
         Return
         -----------------------------------------------------------------------
-        There's no return of the method.
-
-        Raise
-        -----------------------------------------------------------------------
-        ViolatedPathException: When try to write the original game file.
+        list[Statement] : the Statements found.
 
         Usage
         -----------------------------------------------------------------------
-        >>> my_focusTree = FocusTree()...
-        >>> my_focusTree.write(path)
-
+        >>> focuses = focus_tree.get_value().find_all("focus")
         '''
-        
-        invalid_path = "Steam/steamapps/common/Hearts of Iron IV"
 
-        if invalid_path in filePath:
-            raise ViolatedPathException("You cannot write any file at this location! Please try another path.")
+        if self._shared:
+            return [self._getOwned(position) for position in self._getIndex().get(keyword, ())]
 
-        textBuffer = []
+        element = self._element
 
-        textBuffer.append("#This code is generated by Salmoon's generator.")
-        textBuffer.extend(self._getTextBuffer(self._element))
-        textBuffer.append("#EOF")
+        return [element[position] for position in self._getIndex().get(keyword, ())]
 
-        with codecs.open(filePath,"w",'utf-8-sig') as file:
-            for line in textBuffer:
-                file.write(line + "\n")
-        
-    def _getTextBuffer(self,statements:list['Statement'],level:int = 0, textBuffer:list = []) -> list[str]:
+    def select(self, path:str) -> list['Statement']:
         '''
         Description
         -----------------------------------------------------------------------
-        Internal method. Get textBuffer by Iteration from statements.
+        Find the Statements at a path of keywords separated by `/`. Each step
+        can be `*` for any keyword, and can have a `[keyword=value]` filter
+        which keeps only the Statements whose block has a child Statement
+        with that keyword and value. Values are compared as written in the
+        script, quotes included.
 
         Parameters
         -----------------------------------------------------------------------
-        - `statements` (list [ Statement ]) : the statement that want to convert.
-        - `level` (int) : the depth of the tree structure.
-        - `textBuffer` (list) : the buffer using for iteration.
+        - `path` (str) : the path, such as `focus_tree/focus[id=FIN_x]`.
 
         Return
         -----------------------------------------------------------------------
-        list[str] : the textBuffer
+        list[Statement] : the Statements found, in script order.
+
+        Raise
+        -----------------------------------------------------------------------
+        ValueError : if a step of the path can't be parsed.
 
+        Usage
+        -----------------------------------------------------------------------
+        >>> rewards = script.select("focus_tree/focus[id=FIN_x]/completion_reward")
         '''
 
-        for statement in statements:
+        scripts:list['PDXscript'] = [self]
+        found:list['Statement'] = []
+
+        for step in path.strip("/").split("/"):
+
+            match = _SELECT_PATTERN.match(step)
+
+            if match is None:
+                raise ValueError(f"Invalid step '{step}' in path '{path}'")
 
-            if issubclass(type(statement.get_value()), PDXscript) or isinstance(statement.get_value(), list):
+            keyword, key, value = match.groups()
+            found = []
 
-                if len(statement.get_value()) == 0:
-                    textBuffer.append("\t" * level +
-                                      statement.get_keyword() +
-                                      " {\n" +
-                                      "\t" * level +
-                                      "}")
+            for script in scripts:
+
+                if key is None:
+                    found.extend(script[:] if keyword == "*" else script.find_all(keyword))
                     continue
 
-                if isinstance(statement.get_value()[0], Statement):
-                    textBuffer.append("\t" * level +
-                                    statement.get_keyword() +
-                                    " " +
-                                    statement.get_operator(literal=True)+
-                                    " {")
-                    self._getTextBuffer(statement.get_value(), level+1, textBuffer)
-                
-                else:
-                    textBuffer.append("\t" * level +
-                                  statement.get_keyword() +
-                                  " " +
-                                  statement.get_operator(literal=True)+
-                                  " {")
-
-                    text_list = "\t" * (level + 1) + str(statement.get_value()[0])
-                    for obj in statement.get_value()[1:]:
-                        text_list = text_list + " " + str(obj)
-                
-                    textBuffer.append(text_list)
-                    textBuffer.append("\t" * level +"}")
-
-            elif isinstance(statement.get_value(), str):
-                textBuffer.append("\t" * level + 
-                                  statement.get_keyword() + 
-                                  " " +
-                                  statement.get_operator(literal=True) +
-                                  " " +
-                                  statement.get_value())
-        
-        if level != 0:
-            textBuffer.append("\t" * (level-1) +"}")
+                found.extend(script[position] for position in script._getFilterIndex(keyword, key).get(value, ()))
 
-        return textBuffer
+            scripts = [statement.get_value() for statement in found if isinstance(statement.get_value(), PDXscript)]
 
-    def _getToken(self,textBuffer:list[str]) -> list[str]:
+        return found
+
+    def clone(self) -> 'PDXscript':
         '''
         Description
         -----------------------------------------------------------------------
-        Internal method. Get the tokens string from given pdx script.
+        Get a copy of the script in O(1). The copy and the script share their
+        list of Statements until one of them changes it with `[]=`,
+        `append()`, `insert()`, `remove()`, `pop()` or `extend()`; then that
+        one copies the list, not the Statements. A shared Statement is copied
+        when it's first handed out by `[]`, iteration, `find()`, `find_all()`
+        or `select()`, and its block is cloned the same way. So a Statement
+        got from either of them can be changed with `Statement.set_*()`
+        without touching the other, and whatever a variant doesn't reach
+        stays shared by all of them.
+
+        Statements got from the script before cloning are shared by both, so
+        get them again to change one side only. A side that hands one out
+        again gets its own copy, and the old one is left to the other side.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the copy.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> base = PDXscript(path)
+        >>> for tag in tags:
+        >>>     variant = base.clone()
+        >>>     variant.select("focus_tree/country/modifier/tag")[0].set_value(tag)
+        >>>     variant.write(f"{out}/{tag}.txt")
+        '''
+
+        element = self._element
+        script = PDXscript()
+
+        if isinstance(element, PDXscript):
+            script._element = element.clone()
+            script._element._owner = script
+            return script
+
+        self._shared = True
+        script._element = element
+        script._shared = True
+
+        return script
+
+    def _unshare(self, moving:bool = False) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Stop sharing the list of Statements with the clones,
+        by copying the list. The Statements are still shared until each is
+        handed out: `_shared` becomes the shared list, which is never changed
+        again, so a Statement is shared while it's the same object at the
+        same position there. Before a change that moves Statements, like
+        `insert()`, `_shared` becomes the dict of the shared Statements by id.
 
         Parameters
         -----------------------------------------------------------------------
-        - textBuffer (list[str]): the list of lined script.
+        - `moving` (bool) : whether the coming change moves Statements.
 
         Return
         -----------------------------------------------------------------------
-        list[str] : the token string get from the textBuffer.
+        PDXscript : the script holding the list, `self` unless it's wrapped.
         '''
 
-        tokens:list[str] = []
-        word:str = ""
-        
-        for line in textBuffer:
+        owner = self
 
-            has_quoatation_mark = False
-            has_back_slash = False
+        while isinstance(owner._element, PDXscript):
+            owner = owner._element
 
-            for char in line:
+        if owner._shared is True:
+            shared = owner._element
+            owner._element = list(shared)
+            owner._shared = shared
 
-                if not char in "\t \n={}><#\"\\" or has_quoatation_mark and not char in "\"\\":
-                    word += char
-                
-                elif char in "\t \n}#" and not has_quoatation_mark:
+        if moving and isinstance(owner._shared, list):
+            shared = [statement for statement, source in zip(owner._element, owner._shared) if statement is source]
+            owner._shared = dict(zip(map(id, shared), shared)) or False
 
-                    if word:
-                        tokens.append(word)
-                        word = ""
+        return owner
 
-                    if char == "}":
-                        tokens.append("#R")
+    def _getOwned(self, index:typing.Union[int,slice]) -> typing.Union['Statement',list['Statement']]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the Statement at the index as `[]` does, copying
+        it first if it's shared with the clones. The shared list or dict keeps
+        the shared Statements alive, so their ids are never reused by new
+        ones. The shared Statement is then only held by the clones, so it's
+        marked as held by several.
+        '''
 
-                    if char == "#":
-                        break
+        owner = self._unshare()
+        element = owner._element
 
-                elif char in "=><":
+        if isinstance(index, slice):
+            return [owner._getOwned(position) for position in range(*index.indices(len(element)))]
 
-                    if word:
-                        tokens.append(word)
-                        word = ""
+        statement = element[index]
+        shared = owner._shared
 
-                    token_mapping = {
-                        "=" : "#E",
-                        ">" : "#G",
-                        "<" : "#S"
-                    }
-                    tokens.append(token_mapping[char])
+        if isinstance(shared, list):
 
-                elif char == "{":
-                    tokens.append("#L")
-                
-                elif char == "\"":
+            position = index if index >= 0 else index + len(element)
 
-                    word += char
+            if position < len(shared) and shared[position] is statement:
+                statement._owner = _SEVERAL_HOLDERS
+                statement = element[index] = statement._getCopy()
+                statement._owner = owner
 
-                    if not has_back_slash:
-                        has_quoatation_mark = not has_quoatation_mark
-                    else:
-                        has_back_slash = False
-                
-                elif char == "\\":
-                    word += char
-                    has_back_slash = True
-        
-        return tokens
+        elif shared and id(statement) in shared:
+            del shared[id(statement)]
+            statement._owner = _SEVERAL_HOLDERS
+            statement = element[index] = statement._getCopy()
+            statement._owner = owner
 
-    def _getStructure(self,tokens:list[str]) -> 'PDXscript':
+            if not shared:
+                owner._shared = False
+
+        return statement
+
+    def get_hash(self) -> bytes:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the structural hash of the script, made from the Statements in
+        order. Two scripts with the same hash are written as the same text,
+        whatever the formatting of the files they were read from. The hash
+        of every block is kept, so a block is hashed once however many times
+        it's compared. A change made through PDXscript and Statement methods
+        drops the kept hashes of the blocks above it, up to the top level, and
+        the others stay. A change to a Statement put in several blocks, or
+        shared with a clone, drops every kept hash. A list value changed in
+        place doesn't drop any, so set it again with `set_value()`.
+
+        Return
+        -----------------------------------------------------------------------
+        bytes : the 16 bytes hash.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> if PDXscript(mod_path).get_hash() == PDXscript(vanilla_path).get_hash():
+        >>>     print("The mod doesn't change the file")
+        '''
+
+        if isinstance(self._element, PDXscript):
+            return self._element.get_hash()
+
+        if self._hash is None or self._hashShared != PDXscript._sharedModified:
+            self._hash = PDXscript._getBlockHash(self._element)
+            self._hashShared = PDXscript._sharedModified
+
+        return self._hash
+
+    @staticmethod
+    def _getBlockHash(statements:list['Statement']) -> bytes:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the hash of a list of Statements.
+        '''
+
+        text = "\x1e".join([statement._getHashText() for statement in statements])
+
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size = 16).digest()
+
+    def _getStatements(self) -> list['Statement']:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the list of Statements, unwrapping the
+        PDXscript that holds the Statements of a script read from a file.
+        '''
+
+        element = self._element
+
+        while isinstance(element, PDXscript):
+            element = element._element
+
+        return element
+
+    def _getFilterIndex(self, keyword:str, key:str) -> dict[str,list[int]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the index used by a `keyword[key=value]` step of
+        `select()`: the positions of the Statements with the keyword (any for
+        `*`) by the values of the `key` Statements in their blocks. It's built
+        on first use and dropped by a change in the block or below it (see
+        `_touch()`).
+        '''
+
+        if isinstance(self._element, PDXscript):
+            return self._element._getFilterIndex(keyword, key)
+
+        if self._filterIndex is None or self._filterShared != PDXscript._sharedModified:
+            self._filterIndex = {}
+            self._filterShared = PDXscript._sharedModified
+
+        index = self._filterIndex.get((keyword, key))
+
+        if index is None:
+
+            index = {}
+            statements = self._getStatements()
+            positions = range(len(statements)) if keyword == "*" else self._getIndex().get(keyword, ())
+
+            for position in positions:
+                block = statements[position].get_value()
+
+                if not isinstance(block, PDXscript):
+                    continue
+
+                for child in block.find_all(key):
+                    if type(child._value) is str:
+                        matched = index.setdefault(child._value, [])
+
+                        if not matched or matched[-1] != position:
+                            matched.append(position)
+
+            self._filterIndex[(keyword, key)] = index
+
+        return index
+
+    def _getIndex(self) -> dict[str,list[int]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the index of Statement positions by keyword. It's
+        built on first use, kept up to date by `append()`, and dropped by the
+        other methods changing the Statements or by `set_keyowrd()` of one of
+        them.
+        '''
+
+        if isinstance(self._element, PDXscript):
+            return self._element._getIndex()
+
+        if self._keywordIndex is None or self._indexRenamed != Statement._renamed:
+
+            index:dict[str,list[int]] = {}
+
+            for position, statement in enumerate(self._getStatements()):
+                index.setdefault(statement._keyword, []).append(position)
+
+            self._keywordIndex = index
+            self._indexRenamed = Statement._renamed
+
+        return self._keywordIndex
+
+    @staticmethod
+    def _touch(changed:typing.Union['Statement','PDXscript'], keywords:typing.Optional[tuple[str,...]] = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Drop what the change of a block's Statements, or of a
+        Statement, makes out of date in the blocks above it, up to the top
+        level: every kept hash, and the parts of the filter indexes that read
+        the change. A filter index only reads two levels down, so the changed
+        block drops its own and its parent drops the part keyed by the changed
+        keywords. For a changed Statement, its block drops the part of its
+        keywords and the parent the part keyed by them.
+
+        A change that can't be traced to one block, because something on the
+        way is held by several ones or shared with a clone, counts in
+        `_sharedModified` instead, which drops them all.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `changed` (Statement | PDXscript) : the changed Statement or block.
+        - `keywords` (tuple[str] | None) : the keywords of the changed
+        Statements, or None for any.
+        '''
+
+        holder = changed
+        depth = 0 if type(changed) is Statement else -1
+
+        while holder is not None:
+
+            if holder is _SEVERAL_HOLDERS:
+                PDXscript._sharedModified += 1
+                return
+
+            if type(holder) is Statement:
+
+                owner = holder._owner
+
+                if owner is not None and owner is not _SEVERAL_HOLDERS and owner._isShared(holder):
+                    PDXscript._sharedModified += 1
+                    return
+
+            elif type(holder._element) is list:
+
+                holder._hash = None
+
+                if holder._filterIndex is not None and depth < 2:
+                    holder._dropFilterIndex(keywords, depth)
+
+                depth = depth + 1 if depth >= 0 else 1
+
+            holder = holder._owner
+
+    def _dropFilterIndex(self, keywords:typing.Optional[tuple[str,...]], depth:int) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Drop the part of the filter index read by a change
+        `depth` levels down (see `_touch()`): all of it for a change of the
+        block's own Statements (-1), the `keyword[...]` part for a change of
+        one of them (0), and the `[key=...]` part for a change one level
+        further (1).
+        '''
+
+        if depth < 0 or keywords is None:
+            self._filterIndex = None
+            return
+
+        index = self._filterIndex
+
+        for entry in [entry for entry in index if entry[depth] in keywords or entry[depth] == "*"]:
+            del index[entry]
+
+    @staticmethod
+    def _setOwner(obj:typing.Union['Statement','PDXscript'], owner:typing.Union['Statement','PDXscript']) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Set the block holding a Statement, or the Statement
+        holding a block. One already held by something else is marked as held
+        by several.
+        '''
+
+        current = obj._owner
+        obj._owner = owner if current is None or current is owner else _SEVERAL_HOLDERS
+
+    def _hold(self, statement:'Statement') -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Set the block as the holder of a Statement put in it.
+        One put in it twice is marked as held by several, since taking one out
+        leaves the other. A script wrapping its block leaves it to the block.
+        '''
+
+        if type(self._element) is list:
+            statement._owner = self if statement._owner is None else _SEVERAL_HOLDERS
+
+    def _holdFrom(self, position:int) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Set the block as the holder of its Statements from a
+        position on.
+        '''
+
+        if type(self._element) is list:
+
+            for statement in self._element[position:]:
+                statement._owner = self if statement._owner is None else _SEVERAL_HOLDERS
+
+    def _release(self, statement:typing.Any) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Forget the block as the holder of a Statement taken
+        out of it.
+        '''
+
+        if type(statement) is Statement and statement._owner is self:
+            statement._owner = None
+
+    def _isShared(self, statement:'Statement') -> bool:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Check whether a Statement held by the block is still
+        shared with a clone (see `clone()`). The shared list is turned into the
+        dict of the shared Statements by id the first time, so checking every
+        Statement of a big block is linear. One the block replaced by its copy
+        is marked as held by several, so it never gets here.
+        '''
+
+        shared = self._shared
+
+        if type(shared) is bool:
+            return shared
+
+        if type(shared) is list:
+            shared = self._unshare(moving = True)._shared
+
+        return bool(shared) and id(statement) in shared
+
+    @staticmethod
+    def _fromStatements(statements:list['Statement']) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get a block of Statements being built by a parser, or
+        taken over from a block that's dropped. The block is set as their
+        holder without the checks of `PDXscript(statements = ...)`.
+        '''
+
+        script = PDXscript()
+        script._element = statements
+
+        for statement in statements:
+            statement._owner = script
+
+        return script
+    
+    def read(self, filePath:str, cache:'ParseCache' = None, stats:'ParseStats' = None) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Read a given PDXscript file and return the PDXscript object.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `filePath` (str): the path of the pdx file.
+        - `cache` (ParseCache): the on-disk cache to load the script from.
+        - `stats` (ParseStats): the collector to add the timers and counters to.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the transformed object.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> my_focus = PDXscript().read(path)
+        '''
+
+        temp_pdx = PDXscript(filePath, cache = cache, stats = stats)
+
+        return temp_pdx
+
+    def reload(self, stats:'ParseStats' = None) -> bool:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Read the file of a script made with `incremental = True` again,
+        parsing only the blocks whose text changed. The edited part is found
+        by comparing the text with the last one read, then the text is split
+        into blocks again from the block holding the edit until the block
+        ends line up with the old ones. Those blocks are looked up by the hash
+        of their text, and only the new ones are parsed. A large block is
+        split into the blocks in it the same way, so an edit in a focus tree
+        only parses the focus it's in.
+
+        Every Statement out of the edited blocks is kept, the same object as
+        before, and so are changes made to it in memory. The blocks holding
+        an edited block get new Statements and PDXscript objects, and so
+        does the script's own list.
+
+        A block whose content leaves an unfinished statement before its
+        closing bracket is malformed, and its leftover words stay inside it
+        instead of going to the enclosing level like a full parse does.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `stats` (ParseStats): the collector to add the time of each phase and
+        the counters of the file to.
+
+        Return
+        -----------------------------------------------------------------------
+        bool : whether the text of the file changed.
+
+        Raise
+        -----------------------------------------------------------------------
+        ValueError : if the script wasn't made with `incremental = True`.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> script = PDXscript(path, incremental = True)
+        >>> # edit the file
+        >>> script.reload()
+        True
+        '''
+
+        source = self._source
+
+        if source is None:
+            raise ValueError("reload() only works on a script made with incremental = True")
+
+        timer = _NULL_TIMER if stats is None else stats._start("read", source._path)
+
+        if stats is not None:
+            timer.count(bytes = os.path.getsize(source._path))
+
+        old = source._text
+        text = self._readText(source._path)
+        timer.lap("read")
+
+        if text == old:
+            timer.stop(self)
+            return False
+
+        nodes = None
+
+        if source._nodes is not None:
+            prefix = self._getCommonPrefix(old, text)
+            suffix = min(self._getCommonSuffix(old, text), len(old) - prefix, len(text) - prefix)
+            nodes = self._getRespans(source._nodes, text, 0, len(old), False, prefix, len(old) - suffix, len(text) - len(old))
+
+        if nodes is None:
+            nodes = self._getSpans(text, 0, len(text))
+
+        self._setSource(source._path, text, nodes)
+        timer.lap("structure")
+        timer.stop(self)
+
+        return True
+
+    @staticmethod
+    def loads(data:typing.Union[str,bytes], lazy:bool = False, stats:'ParseStats' = None) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the PDXscript object from pdx script text in memory. Bytes are
+        decoded as UTF-8. A leading BOM is dropped and line breaks are read
+        the same way as from a file.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `data` (str | bytes): the pdx script text.
+        - `lazy` (bool): parse the blocks only when their values are first got.
+        - `stats` (ParseStats): the collector to add the timers and counters to.
+        The decoding is counted as the `read` phase.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the transformed object.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> with zipfile.ZipFile(mod_path) as archive:
+        >>>     script = PDXscript.loads(archive.read("common/ideas/FIN.txt"))
+        '''
+
+        script = PDXscript()
+        timer = _NULL_TIMER if stats is None else stats._start("read", None)
+
+        timer.count(bytes = len(data))
+        text = script._getText(data)
+        timer.lap("read")
+
+        if lazy:
+            script._element = script._getLazyStructure(text)
+
+        else:
+            tokens = script._scanToken(text)
+            timer.lap("tokenize")
+            timer.count(tokens = len(tokens))
+            script._element = script._getStructure(tokens)
+
+        script._element._owner = script
+        timer.lap("structure")
+        timer.stop(script)
+
+        return script
+
+    @staticmethod
+    def load(file:typing.Union[typing.TextIO,typing.BinaryIO], lazy:bool = False, stats:'ParseStats' = None) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the PDXscript object from an opened text or binary file.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `file` (TextIO | BinaryIO): the file object to read from.
+        - `lazy` (bool): parse the blocks only when their values are first got.
+        - `stats` (ParseStats): the collector to add the timers and counters to.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the transformed object.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> with archive.open("common/ideas/FIN.txt") as file:
+        >>>     script = PDXscript.load(file)
+        '''
+
+        return PDXscript.loads(file.read(), lazy = lazy, stats = stats)
+
+    @staticmethod
+    async def aload(path:str,
+                    executor:concurrent.futures.Executor = None,
+                    cache:'ParseCache' = None,
+                    lazy:bool = False,
+                    stats:'ParseStats' = None) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Read a given pdx script file without blocking the event loop. The
+        reading and parsing run in `executor`.
+
+        With a ProcessPoolExecutor the tree comes back as marshalled nested
+        tuples (see `_getPacked()`), and `lazy` is ignored since the blocks
+        can't be sent unparsed. The records of `stats` then also have the
+        `pack` and `unpack` phases.
+
+        A cancelled call stops waiting at once. A parse already running in a
+        thread can't be stopped, it finishes in the background and the result
+        is dropped.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str): the path of the pdx file.
+        - `executor` (Executor): a ThreadPoolExecutor or ProcessPoolExecutor.
+        Default to the default executor of the event loop.
+        - `cache` (ParseCache): the on-disk cache to load the script from.
+        - `lazy` (bool): parse the blocks only when their values are first got.
+        - `stats` (ParseStats): the collector to add the timers and counters to.
+        Its callback is called in the worker thread, or in the event loop with
+        a process pool.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the transformed object.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> script = await PDXscript.aload(path)
+        >>> with concurrent.futures.ProcessPoolExecutor() as pool:
+        >>>     scripts = await asyncio.gather(*(PDXscript.aload(path, pool) for path in paths))
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        if not isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            return await loop.run_in_executor(executor, lambda: PDXscript(path, cache = cache, lazy = lazy, stats = stats))
+
+        packed, record = await loop.run_in_executor(executor, PDXscript._loadPacked, path, cache, stats is not None)
+
+        start = time.perf_counter()
+        script = PDXscript._fromPacked(marshal.loads(packed))
+
+        if record is not None:
+            record["seconds"]["unpack"] = time.perf_counter() - start
+            stats.add(record)
+
+        return script
+
+    @staticmethod
+    def iterparse(filePath:str, chunk_size:int = 1 << 20) -> typing.Iterator['Statement']:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Read a given pdx script file in chunks and yield each top-level
+        Statement as soon as it's complete. Only the block being read is kept
+        in memory, so it suits huge files like save games and event files.
+        The Statements are the same as iterating `PDXscript(filePath)`.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `filePath` (str): the path of the pdx file.
+        - `chunk_size` (int): the number of characters read at a time.
+
+        Return
+        -----------------------------------------------------------------------
+        Iterator[Statement] : the top-level Statements in file order.
+
+        Raise
+        -----------------------------------------------------------------------
+        ScriptNotClosedException : if the script's bracket isn't closed.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> for statement in PDXscript.iterparse(path):
+        >>>     if statement.get_keyword() == "country_event":
+        >>>         events.append(statement)
+        '''
+
+        parser = PDXscript()
+
+        with open(file = filePath,mode = "r",encoding="utf-8-sig") as sourceFile:
+            tokens = map(parser._scanToken, parser._iterChunk(sourceFile, chunk_size))
+            yield from parser._iterStructure(tokens)
+
+    @staticmethod
+    def extract(filePath:str, selectors:typing.Iterable[str], chunk_size:int = 1 << 20) -> dict[str,list['Statement']]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Read only the parts of a given pdx script file matched by the
+        selectors, such as one country of a save game. The file is read in
+        chunks, and every block that no selector goes into is skipped by
+        counting its brackets, without making any token or Statement for it.
+
+        A selector is a `select()` path. Its steps are followed while reading
+        up to the last one or the first one with a `[keyword=value]` filter.
+        The blocks at that step are parsed whole, and the rest of the path is
+        applied to them with `select()`.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `filePath` (str): the path of the pdx file.
+        - `selectors` (Iterable[str]): the paths to extract.
+        - `chunk_size` (int): the number of characters read at a time.
+
+        Return
+        -----------------------------------------------------------------------
+        dict[str, list[Statement]] : the Statements found by each selector,
+        in file order.
+
+        Raise
+        -----------------------------------------------------------------------
+        ValueError : if a step of a selector can't be parsed.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> found = PDXscript.extract(save, ["countries/GER", "states/*[owner=\"GER\"]"])
+        >>> germany = found["countries/GER"][0].get_value()
+        '''
+
+        parser = PDXscript()
+        found:dict[str,list['Statement']] = {}
+        level:list[tuple[str,list[tuple[str,bool,str]],int]] = []
+
+        for selector in selectors:
+
+            if selector in found:
+                continue
+
+            found[selector] = []
+            level.append((selector, parser._getSelectorStep(selector), 0))
+
+        with open(file = filePath,mode = "r",encoding="utf-8-sig") as sourceFile:
+            parser._scanSelected(parser._iterChunk(sourceFile, chunk_size), level, found)
+
+        return found
+
+    def write(self, filePath:str, stats:'ParseStats' = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Write the script as PDX script to the path file.
+        
+        Parameters
+        -----------------------------------------------------------------------
+        - `filePath` (str) : the path of the file want to write. Couldn't be
+        the original path of Heart of Iron IV.
+        - `stats` (ParseStats) : the collector to add the time of each phase
+        and the counters of the file to. The text is made in full before it's
+        written then, so the `text` and `write` phases are apart.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of the method.
+
+        Raise
+        -----------------------------------------------------------------------
+        ViolatedPathException: When try to write the original game file.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> my_focusTree = FocusTree()...
+        >>> my_focusTree.write(path)
+
+        '''
+        
+        PDXscript._checkPath(filePath)
+
+        if stats is None:
+            with open(filePath,"w",encoding = "utf-8-sig",newline = "") as file:
+                self.dump(file)
+
+            return
+
+        timer = stats._start("write", filePath)
+
+        with open(filePath,"w",encoding = "utf-8-sig",newline = "") as file:
+            self._dumpTimed(file, timer)
+
+        timer.lap("write")
+        timer.count(bytes = os.path.getsize(filePath))
+        timer.stop(self)
+
+    def dump(self, file:typing.TextIO, stats:'ParseStats' = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Write the script as PDX script to an opened text file. Lines are
+        generated one by one and written in batches, so the whole text is
+        never held in memory. The text is the same as `write()` puts in a
+        file, without the BOM.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `file` (TextIO) : the file object to write to.
+        - `stats` (ParseStats) : the collector to add the timers and counters
+        to, the same as `write()`. The size counted is the number of characters.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of the method.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> with open(path, "w", encoding = "utf-8-sig", newline = "") as file:
+        >>>     my_focusTree.dump(file)
+        '''
+
+        if stats is not None:
+            timer = stats._start("write", getattr(file, "name", None))
+            timer.count(bytes = self._dumpTimed(file, timer))
+            timer.stop(self)
+            return
+
+        write = file.write
+        write("#This code is generated by Salmoon's generator.\n")
+
+        batch:list[str] = []
+
+        for line in self._iterText(self._element):
+            batch.append(line)
+
+            if len(batch) >= 4096:
+                batch.append("")
+                write("\n".join(batch))
+                batch = []
+
+        batch.append("#EOF\n")
+        write("\n".join(batch))
+
+    def _dumpTimed(self, file:typing.TextIO, timer:'_Timer') -> int:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Write the same text as `dump()`, but make all of it
+        first, so the time of making the text and writing it can be charged to
+        the `text` and `write` phases apart.
+
+        Return
+        -----------------------------------------------------------------------
+        int : the number of characters written.
+        '''
+
+        lines = self._getTextBuffer(self._element)
+        lines.append("#EOF\n")
+        text = "#This code is generated by Salmoon's generator.\n" + "\n".join(lines)
+        timer.lap("text")
+        timer.count(lines = len(lines) + 1)
+
+        file.write(text)
+        timer.lap("write")
+
+        return len(text)
+
+    def dumps(self) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the script as PDX script text, the same as `write()` puts in a
+        file without the BOM.
+
+        Return
+        -----------------------------------------------------------------------
+        str : the text of the script.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> print(my_focusTree.dumps())
+        '''
+
+        buffer = io.StringIO()
+        self.dump(buffer)
+
+        return buffer.getvalue()
+
+    async def awrite(self, filePath:str, executor:concurrent.futures.Executor = None, stats:'ParseStats' = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Write the script as PDX script to the path file without blocking the
+        event loop. The writing runs in `executor`. With a
+        ProcessPoolExecutor the script is packed in the default executor of
+        the event loop and sent to the process as marshalled nested tuples.
+
+        A cancelled call stops waiting at once, but a write already running
+        can't be stopped and still finishes.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `filePath` (str) : the path of the file want to write. Couldn't be
+        the original path of Heart of Iron IV.
+        - `executor` (Executor) : a ThreadPoolExecutor or ProcessPoolExecutor.
+        Default to the default executor of the event loop.
+        - `stats` (ParseStats) : the collector to add the timers and counters to.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of the method.
+
+        Raise
+        -----------------------------------------------------------------------
+        ViolatedPathException: When try to write the original game file.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> await my_focusTree.awrite(path)
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        if not isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            await loop.run_in_executor(executor, self.write, filePath, stats)
+            return
+
+        packed = await loop.run_in_executor(None, lambda: marshal.dumps(self._getPacked()))
+        record = await loop.run_in_executor(executor, PDXscript._writePacked, packed, filePath, stats is not None)
+
+        if record is not None:
+            stats.add(record)
+        
+    def _getShape(self) -> tuple[int,int]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Count the Statements at every level and the deepest
+        nesting of blocks. Blocks kept unparsed by the lazy mode are left as
+        they are, so counting doesn't parse them.
+
+        Return
+        -----------------------------------------------------------------------
+        tuple[int,int] : the number of Statements, and the depth. A script
+        without blocks has depth 0.
+        '''
+
+        count = 0
+        depth = 0
+        stack = [(self._getStatements(), 0)]
+
+        while stack:
+
+            statements, level = stack.pop()
+            count += len(statements)
+
+            for statement in statements:
+
+                value = statement._value
+
+                if isinstance(value, PDXscript):
+                    value = value._getStatements()
+
+                elif not isinstance(value, list):
+                    continue
+
+                depth = max(depth, level + 1)
+
+                if value and isinstance(value[0], Statement):
+                    stack.append((value, level + 1))
+
+        return count, depth
+
+    def _getPacked(self) -> tuple:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the script as nested tuples of
+        `(keyword, operator code, value)`, where a PDXscript value is a tuple and a
+        list value stays a list. It's cheap to pickle or marshal, so it's the
+        form used to pass scripts between processes. Strings are interned, so
+        marshal writes every repeated one only once.
+
+        Return
+        -----------------------------------------------------------------------
+        tuple : the packed script.
+        '''
+
+        packed = []
+        intern = sys.intern
+
+        for statement in self._getStatements():
+
+            value = statement.get_value()
+
+            if isinstance(value, PDXscript):
+                value = value._getPacked()
+
+            elif type(value) is str:
+                value = intern(value)
+
+            elif type(value) is list:
+                value = [intern(obj) if type(obj) is str else obj for obj in value]
+
+            keyword = statement._keyword
+
+            if type(keyword) is str:
+                keyword = intern(keyword)
+
+            packed.append((keyword, statement._operator, value))
+
+        return tuple(packed)
+
+    @staticmethod
+    def _fromPacked(packed:tuple) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get PDXscript object from the nested tuples made by
+        `_getPacked()`. The top level is wrapped the same way as a script
+        read by `__init__()`.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - packed (tuple): the packed script.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the unpacked script.
+        '''
+
+        script = PDXscript()
+        script._element = PDXscript._unpack(packed)
+        script._element._owner = script
+
+        return script
+
+    @staticmethod
+    def _unpack(packed:tuple) -> 'PDXscript':
+
+        return PDXscript._fromStatements([Statement(keyword, PDXscript._unpack(value) if type(value) is tuple else value, operator)
+                                          for keyword, operator, value in packed])
+
+    @staticmethod
+    def _loadPacked(path:str, cache:'ParseCache' = None, profile:bool = False) -> tuple[bytes,typing.Optional[dict]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Read a pdx script file in a worker process and get
+        it marshalled, the form cheapest to send back.
+
+        Return
+        -----------------------------------------------------------------------
+        tuple[bytes, dict | None] : the marshalled script, and its record of
+        ParseStats with the `pack` phase if `profile` is set.
+        '''
+
+        stats = ParseStats() if profile else None
+        script = PDXscript(path, cache = cache, stats = stats)
+
+        start = time.perf_counter()
+        packed = marshal.dumps(script._getPacked())
+
+        if stats is None:
+            return packed, None
+
+        record = stats._records[-1]
+        record["seconds"]["pack"] = time.perf_counter() - start
+
+        return packed, record
+
+    @staticmethod
+    def _writePacked(packed:bytes, filePath:str, profile:bool = False) -> typing.Optional[dict]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Write a marshalled script in a worker process.
+
+        Return
+        -----------------------------------------------------------------------
+        dict | None : the record of ParseStats if `profile` is set.
+        '''
+
+        stats = ParseStats() if profile else None
+        start = time.perf_counter()
+        script = PDXscript._fromPacked(marshal.loads(packed))
+        unpack = time.perf_counter() - start
+
+        script.write(filePath, stats = stats)
+
+        if stats is None:
+            return None
+
+        record = stats._records[-1]
+        record["seconds"]["unpack"] = unpack
+
+        return record
+
+    def _getTextBuffer(self,statements:list['Statement'],level:int = 0, textBuffer:list = None) -> list[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get textBuffer by Iteration from statements.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `statements` (list [ Statement ]) : the statement that want to convert.
+        - `level` (int) : the depth of the tree structure.
+        - `textBuffer` (list) : the buffer to append to. A new one by default.
+
+        Return
+        -----------------------------------------------------------------------
+        list[str] : the textBuffer
+
+        '''
+
+        if textBuffer is None:
+            textBuffer = []
+
+        textBuffer.extend(self._iterText(statements, level))
+
+        return textBuffer
+
+    def _iterText(self,statements:list['Statement'],level:int = 0) -> typing.Iterator[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Generate the lines of the statements one by one. It
+        walks the tree with a stack instead of recursion, so a line doesn't
+        pass through a generator for every level above it.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `statements` (list [ Statement ]) : the statement that want to convert.
+        - `level` (int) : the depth of the tree structure. A closing bracket
+        one level up is generated at the end if it's not 0.
+
+        Return
+        -----------------------------------------------------------------------
+        Iterator[str] : the lines without line break.
+        '''
+
+        if isinstance(statements, PDXscript):
+            statements = statements._getStatements()
+
+        stack = [(iter(statements), level)]
+
+        while stack:
+
+            iterator, level = stack[-1]
+            indent = "\t" * level
+
+            for statement in iterator:
+
+                value = statement.get_value()
+
+                if isinstance(value, PDXscript) or isinstance(value, list):
+
+                    if isinstance(value, PDXscript):
+                        value = value._getStatements()
+
+                    if len(value) == 0:
+                        yield indent + statement._keyword + " {\n" + indent + "}"
+                        continue
+
+                    if isinstance(value[0], Statement):
+                        yield indent + statement._keyword + " " + statement.get_operator(literal=True) + " {"
+                        stack.append((iter(value), level + 1))
+                        break
+
+                    yield indent + statement._keyword + " " + statement.get_operator(literal=True) + " {"
+                    yield indent + "\t" + " ".join([str(obj) for obj in value])
+                    yield indent + "}"
+
+                elif isinstance(value, str):
+                    yield indent + statement._keyword + " " + statement.get_operator(literal=True) + " " + value
+
+            else:
+                stack.pop()
+
+                if level != 0:
+                    yield "\t" * (level - 1) + "}"
+
+    def _getToken(self,textBuffer:list[str]) -> list[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the tokens string from given pdx script.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - textBuffer (list[str]): the list of lined script.
+
+        Return
+        -----------------------------------------------------------------------
+        list[str] : the token string get from the textBuffer.
+        '''
+
+        tokens:list[str] = []
+        word:str = ""
+        
+        for line in textBuffer:
+
+            has_quoatation_mark = False
+            has_back_slash = False
+
+            for char in line:
+
+                if not char in "\t \n={}><#\"\\" or has_quoatation_mark and not char in "\"\\":
+                    word += char
+                
+                elif char in "\t \n}#" and not has_quoatation_mark:
+
+                    if word:
+                        tokens.append(word)
+                        word = ""
+
+                    if char == "}":
+                        tokens.append("#R")
+
+                    if char == "#":
+                        break
+
+                elif char in "=><":
+
+                    if word:
+                        tokens.append(word)
+                        word = ""
+
+                    token_mapping = {
+                        "=" : "#E",
+                        ">" : "#G",
+                        "<" : "#S"
+                    }
+                    tokens.append(token_mapping[char])
+
+                elif char == "{":
+                    tokens.append("#L")
+                
+                elif char == "\"":
+
+                    word += char
+
+                    if not has_back_slash:
+                        has_quoatation_mark = not has_quoatation_mark
+                    else:
+                        has_back_slash = False
+                
+                elif char == "\\":
+                    word += char
+                    has_back_slash = True
+        
+        return tokens
+
+    def _scanToken(self,text:str) -> list[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the tokens string from the whole pdx script text
+        in a single pass. Runs of lines whose quotes all close on their line
+        are split in bulk by `_splitToken()`, escaped quotes included. Only a
+        line with an unclosed quote or a back slash out of quotes goes through
+        `_scanWord()` and the per-character `_scanLine()`. The result is
+        identical to `_getToken()` on the same text split into lines.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+
+        Return
+        -----------------------------------------------------------------------
+        list[str] : the token string get from the text.
+        '''
+
+        tokens:list[str] = []
+        length = len(text)
+
+        # str.split() knows more whitespace than _getToken() does.
+        if self._hasExtraSpace(text) or _QUOTE_MARK in text:
+            self._scanWord(text, 0, length, tokens)
+            return tokens
+
+        # _getToken() never flushes the word at the end of an unterminated
+        # last line, so that line always goes through _scanWord().
+        tail = text.rfind("\n") + 1 if not text.endswith("\n") else length
+        pos = 0
+
+        while pos < tail:
+
+            stray = _CLEAN_PATTERN.match(text, pos, tail).end()
+            hard = tail if stray >= tail else text.rfind("\n", pos, stray) + 1 or pos
+
+            if hard > pos:
+                self._splitToken(text[pos:hard], tokens)
+
+            if hard >= tail:
+                break
+
+            end = text.find("\n", stray)
+            end = length if end == -1 else end + 1
+
+            pos = self._scanWord(text, hard, end, tokens)
+
+        if tail < length:
+            self._scanWord(text, max(pos, tail), length, tokens)
+
+        return tokens
+
+    def _splitToken(self,text:str,tokens:list[str]) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the tokens from whole lines whose quotes all close
+        on their line, with no back slash out of them, by padding the symbols
+        and splitting on whitespace. Each closed quote is split as a mark that
+        the quote is put back in afterwards.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the lines, ending with a line break.
+        - tokens (list[str]): the token list to append to.
+        '''
+
+        quotes:list[str] = []
+        alone = False
+
+        if "\"" in text:
+            # Only a comment can hold a `#`, so text without one is split with
+            # the pattern starting with a quote, which is much faster.
+            if "#" in text:
+                parts = _QUOTED_COMMENT_PATTERN.split(text)
+                found = parts[1::2]
+                quotes = [quote for quote in found if quote is not None]
+                parts[1::2] = [_QUOTE_MARK if quote is not None else "" for quote in found]
+
+            else:
+                parts = _QUOTED_PATTERN.split(text)
+                quotes = parts[1::2]
+                parts[1::2] = [_QUOTE_MARK] * len(quotes)
+
+            text = "".join(parts)
+            alone = _GLUED_AFTER_PATTERN.search(text) is None and _GLUED_BEFORE_PATTERN.search(text[::-1]) is None
+
+        elif "#" in text:
+            text = _COMMENT_PATTERN.sub("", text)
+
+        start = len(tokens)
+
+        if self._hasGluedBracket(text):
+            self._scanWord(text, 0, len(text), tokens)
+            alone = False
+
+        else:
+            if alone:
+                text = text.replace(_QUOTE_MARK, " \x00 ")
+
+            tokens.extend(text.replace("=", " #E ")
+                              .replace("{", " #L ")
+                              .replace("}", " #R ")
+                              .replace(">", " #G ")
+                              .replace("<", " #S ")
+                              .split())
+
+        if alone:
+            # Every mark is a whole token, so they're swapped for the quotes
+            # in one pass.
+            found = iter(quotes)
+            tokens[start:] = [next(found) if token == _QUOTE_MARK else token for token in tokens[start:]]
+
+        elif quotes:
+            # Tokens never hold a line break, so the quotes go back in with
+            # one join and one split.
+            pieces = "\n".join(tokens[start:]).split(_QUOTE_MARK)
+            merged:list[str] = [""] * (2 * len(pieces) - 1)
+            merged[0::2] = pieces
+            merged[1::2] = quotes
+            tokens[start:] = "".join(merged).split("\n")
+
+    def _hasExtraSpace(self,text:str) -> bool:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Check if there's whitespace other than tab, space and
+        line break, which `str.split()` would split on but `_getToken()` not.
+
+        Return
+        -----------------------------------------------------------------------
+        bool : whether the text has other whitespace.
+        '''
+
+        if not text.isascii():
+            return _SPACE_PATTERN.search(text) is not None
+
+        for char in "\r\x0b\x0c\x1c\x1d\x1e\x1f":
+            if char in text:
+                return True
+
+        return False
+
+    def _hasGluedBracket(self,text:str) -> bool:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Check if there's a `{` right after a word character
+        in comment-free text. Counting every allowed pair is much cheaper than
+        searching with a pattern, so the pattern only confirms a mismatch.
+
+        Return
+        -----------------------------------------------------------------------
+        bool : whether the text has a glued bracket.
+        '''
+
+        count = text.count("{")
+
+        if not count:
+            return False
+
+        for pair in ("\t{", " {", "\n{", "={", "}{", ">{", "<{", "{{"):
+            count -= text.count(pair)
+
+        if count == text.startswith("{"):
+            return False
+
+        return _GLUED_BRACKET_PATTERN.search(text) is not None
+
+    def _scanWord(self,text:str,pos:int,endpos:int,tokens:list[str]) -> int:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the tokens between `pos` and `endpos` with the
+        compiled master pattern. Words with closed quotes are matched whole.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+        - pos (int): the position to start from. Must be a line start.
+        - endpos (int): the position to stop at. Must be a line start or the end.
+        - tokens (list[str]): the token list to append to.
+
+        Return
+        -----------------------------------------------------------------------
+        int : the position where scanning could continue.
+        '''
+
+        append = tokens.append
+        length = len(text)
+
+        while pos < endpos:
+
+            for match in _TOKEN_PATTERN.finditer(text, pos, endpos):
+                kind = match.lastgroup
+
+                if kind == "word":
+                    end = match.end()
+
+                    if end < length and text[end] in "\"\\":
+                        pos = match.start()
+                        break
+
+                    word = match.group()
+
+                    if "{" in word:
+                        word = self._splitOpenBracket(word, tokens)
+
+                    if word and end < length:
+                        append(word)
+
+                elif kind == "symbol":
+                    append(_SYMBOL_TOKEN[match.group()])
+
+                elif kind == "escape":
+                    pos = match.start()
+                    break
+
+            else:
+                return endpos
+
+            pos = self._scanLine(text, pos, tokens)
+
+        return pos
+
+    def _scanLine(self,text:str,pos:int,tokens:list[str]) -> int:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Tokenize character by character from `pos` to the end
+        of line, the same way as `_getToken()`. A word left open by a quote at
+        the end of line keeps going on the next line.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+        - pos (int): the position to start from. Must be a token boundary.
+        - tokens (list[str]): the token list to append to.
+
+        Return
+        -----------------------------------------------------------------------
+        int : the position where `_scanToken()` could continue.
+        '''
+
+        word:str = ""
+        length = len(text)
+
+        while pos < length:
+
+            end = text.find("\n", pos)
+            end = length if end == -1 else end + 1
+
+            has_quoatation_mark = False
+            has_back_slash = False
+
+            for char in text[pos:end]:
+
+                if not char in "\t \n={}><#\"\\" or has_quoatation_mark and not char in "\"\\":
+                    word += char
+
+                elif char in "\t \n}#" and not has_quoatation_mark:
+
+                    if word:
+                        tokens.append(word)
+                        word = ""
+
+                    if char == "}":
+                        tokens.append("#R")
+
+                    if char == "#":
+                        break
+
+                elif char in "=><":
+
+                    if word:
+                        tokens.append(word)
+                        word = ""
+
+                    tokens.append(_SYMBOL_TOKEN[char])
+
+                elif char == "{":
+                    tokens.append("#L")
+
+                elif char == "\"":
+
+                    word += char
+
+                    if not has_back_slash:
+                        has_quoatation_mark = not has_quoatation_mark
+                    else:
+                        has_back_slash = False
+
+                elif char == "\\":
+                    word += char
+                    has_back_slash = True
+
+            pos = end
+
+            if not word:
+                break
+
+        return pos
+
+    def _splitOpenBracket(self,word:str,tokens:list[str]) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. `_getToken()` emits `#L` for a `{` inside a word
+        without flushing the word. Append those `#L` to tokens and return the
+        word without them.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - word (str): the word matched by the scanner.
+        - tokens (list[str]): the token list to append to.
+
+        Return
+        -----------------------------------------------------------------------
+        str : the word without the unquoted `{`.
+        '''
+
+        if not "\"" in word:
+            tokens.extend(["#L"] * word.count("{"))
+            return word.replace("{", "")
+
+        chars:list[str] = []
+        has_quoatation_mark = False
+
+        for char in word:
+
+            if char == "{" and not has_quoatation_mark:
+                tokens.append("#L")
+                continue
+
+            if char == "\"":
+                has_quoatation_mark = not has_quoatation_mark
+
+            chars.append(char)
+
+        return "".join(chars)
+
+    def _readText(self,path:str) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Read the whole text of a pdx script file. A large
+        file is memory-mapped and decoded straight from the mapping, so its
+        bytes are never copied into a buffer first.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - path (str): the path of the pdx script file.
+
+        Return
+        -----------------------------------------------------------------------
+        str : the text, as `_getText()` gives.
+        '''
+
+        if os.path.getsize(path) >= _MMAP_SIZE:
+            with open(path, "rb") as sourceFile:
+                with mmap.mmap(sourceFile.fileno(), 0, access = mmap.ACCESS_READ) as mapped:
+                    return self._getText(mapped)
+
+        with open(file = path,mode = "r",encoding="utf-8-sig") as sourceFile:
+            return self._getText(sourceFile.read())
+
+    @staticmethod
+    def _checkPath(filePath:str) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Refuse a path in the installation of the game, so
+        no writer ever changes its original files.
+
+        Raise
+        -----------------------------------------------------------------------
+        ViolatedPathException: When the path is in the game directory.
+        '''
+
+        invalid_path = "Steam/steamapps/common/Hearts of Iron IV"
+
+        if invalid_path in filePath:
+            raise ViolatedPathException("You cannot write any file at this location! Please try another path.")
+
+    def _getText(self,data:typing.Union[str,bytes]) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the text as reading a file with `utf-8-sig` in
+        text mode gives: decoded, without a leading BOM, and with `\r\n` and
+        `\r` read as `\n`. A line break is added after an unterminated last
+        line, since the tokenizers only end a word at a separator. The text is
+        only copied when it has to change.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - data (str | bytes): the text, or any buffer of UTF-8 bytes.
+
+        Return
+        -----------------------------------------------------------------------
+        str : the text.
+        '''
+
+        if not isinstance(data, str):
+            data = str(data, "utf-8-sig")
+
+        elif data.startswith("\ufeff"):
+            data = data[1:]
+
+        if "\r" in data:
+            data = data.replace("\r\n", "\n").replace("\r", "\n")
+
+        if data and not data.endswith("\n"):
+            data += "\n"
+
+        return data
+
+    def _iterChunk(self,sourceFile:typing.TextIO,chunk_size:int) -> typing.Iterator[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Read the source file in chunks, cutting each chunk
+        after a line without any quote. A word is never carried over such a
+        line, so every chunk can be tokenized on its own. An unterminated
+        last line gets a line break, like in `_getText()`.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - sourceFile (TextIO): the opened pdx script file.
+        - chunk_size (int): the number of characters read at a time.
+
+        Return
+        -----------------------------------------------------------------------
+        Iterator[str] : the chunks of the script.
+        '''
+
+        rest = ""
+
+        while True:
+
+            data = sourceFile.read(chunk_size)
+
+            if not data:
+                break
+
+            text = rest + data
+            cut = 0
+            end = text.rfind("\n")
+
+            while end != -1:
+                start = text.rfind("\n", 0, end) + 1
+
+                if text.find("\"", start, end) == -1:
+                    cut = end + 1
+                    break
+
+                end = start - 1
+
+            if cut:
+                yield text[:cut]
+
+            rest = text[cut:]
+
+        if rest:
+            yield rest if rest.endswith("\n") else rest + "\n"
+
+    def _iterStructure(self,chunks:typing.Iterable[list[str]]) -> typing.Iterator['Statement']:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Streaming counterpart of `_getStructure()`. Build the
+        Statements from chunks of tokens and yield every top-level Statement
+        once it's complete, without keeping it.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - chunks (Iterable[list[str]]): the lists of tokens in order.
+
+        Return
+        -----------------------------------------------------------------------
+        Iterator[Statement] : the top-level Statements.
+
+        Raise
+        -----------------------------------------------------------------------
+        ScriptNotClosedException : if the script's bracket isn't closed.
+        '''
+        is_statement:bool = False
+        temp:list[str] = []
+        stack:list['PDXscript'] = []
+        current_script:'PDXscript' = PDXscript()
+        intern = sys.intern
+
+        for tokens in chunks:
+
+            for token in tokens:
+
+                if token in "#E#G#S":
+                    is_statement = True
+                    temp.append(token)
+
+                elif token == "#L":
+                    statement = Statement(intern(temp[0]),"",temp[1])
+                    statement._owner = current_script
+                    current_script._element.append(statement)
+                    stack.append(current_script)
+                    temp = []
+                    current_script = PDXscript()
+                    is_statement = False
+
+                elif token == "#R":
+                    if current_script:
+                        last_script = stack.pop()
+                        last_script._element[-1]._putValue(current_script)
+                        current_script = last_script
+
+                    else:
+                        last_script = stack.pop()
+                        last_script._element[-1]._putValue(temp)
+                        temp = []
+                        current_script = last_script
+
+                    if not stack:
+                        statement = current_script._element.pop()
+                        statement._owner = None
+                        yield statement
+
+                else:
+
+                    if is_statement:
+                        is_statement = False
+                        statement = Statement(intern(temp[0]),token,temp[1])
+
+                        if not stack:
+                            yield statement
+                        else:
+                            statement._owner = current_script
+                            current_script._element.append(statement)
+
+                        temp = []
+
+                    else:
+                        temp.append(token)
+
+        if stack:
+            raise ScriptNotClosedException("The bracket isn't closed in the pdx script file")
+
+    def _getSelectorStep(self,selector:str) -> list[tuple[str,bool,str]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Split a selector of `extract()` into steps of
+        `(keyword, is_last, path)`, where path is the rest of the selector
+        from the step on. The first step with a filter, or else the last one,
+        is the last step: the blocks there are parsed whole.
+
+        Raise
+        -----------------------------------------------------------------------
+        ValueError : if a step of the selector can't be parsed.
+        '''
+
+        steps = selector.strip("/").split("/")
+        result:list[tuple[str,bool,str]] = []
+
+        for position, step in enumerate(steps):
+
+            match = _SELECT_PATTERN.match(step)
+
+            if match is None:
+                raise ValueError(f"Invalid step '{step}' in path '{selector}'")
+
+            keyword, key, _ = match.groups()
+
+            is_last = key is not None or position == len(steps) - 1
+            result.append((keyword, is_last, "/".join(steps[position:])))
+
+            if is_last:
+                break
+
+        return result
+
+    def _scanSelected(self,chunks:typing.Iterable[str],level:list[tuple[str,list[tuple[str,bool,str]],int]],found:dict[str,list['Statement']]) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Scan the chunks for `extract()`. The text between the
+        brackets of the levels being followed is tokenized to get the keyword
+        of the next block. A block is then parsed whole if a selector ends at
+        it, followed if a selector goes into it, and skipped otherwise.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - chunks (Iterable[str]): the chunks of the script, see `_iterChunk()`.
+        - level (list[tuple]): the selectors with their steps and the step
+        they're at, for the top level.
+        - found (dict[str, list[Statement]]): the Statements found by selector.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        stack:list[list[tuple[str,list[tuple[str,bool,str]],int]]] = []
+        head:list[str] = []
+        depth = 0
+        parts:typing.Optional[list[str]] = None
+
+        for text in chunks:
+
+            pos = 0
+            end = len(text)
+
+            while pos < end:
+
+                if depth:
+                    close, depth = self._skipBlock(text, pos, end, depth)
+
+                    if close == -1:
+                        if parts is not None:
+                            parts.append(text[pos:end])
+                        break
+
+                    if parts is not None:
+                        parts.append(text[pos:close])
+                        parts.append("}")
+                        block._putValue(self._getStructure(["_", "#E", "#L"] + self._scanToken("".join(parts)))._element[0]._value)
+                        self._putSelected(block, selected, found)
+                        parts = None
+
+                    pos = close + 1
+                    continue
+
+                for position, char, _ in self._iterBracket(text, pos, end):
+
+                    head.append(text[pos:position])
+                    headText = "".join(head)
+                    head = []
+                    pos = position + 1
+
+                    if char == "}":
+
+                        if headText.strip("\t \n"):
+                            self._putSelected(self._getStructure(self._scanToken(headText))._getStatements(), level, found)
+
+                        if stack:
+                            level = stack.pop()
+
+                        continue
+
+                    match = _HEAD_PATTERN.match(headText)
+
+                    if match is not None:
+                        statements = []
+                        block = Statement(sys.intern(match.group(1)), _LAZY_TOKEN, _SYMBOL_TOKEN[match.group(2)])
+
+                    else:
+                        statements = self._getStructure(self._scanToken(headText) + [_LAZY_TOKEN])._getStatements()
+                        block = statements.pop() if statements and statements[-1]._value is _LAZY_TOKEN else None
+
+                    self._putSelected(statements, level, found)
+
+                    selected = []
+                    inner = []
+
+                    if block is not None:
+
+                        keyword = block._keyword
+
+                        for selector, steps, step in level:
+
+                            if steps[step][0] == keyword or steps[step][0] == "*":
+
+                                if steps[step][1]:
+                                    selected.append((selector, steps, step))
+                                else:
+                                    inner.append((selector, steps, step))
+
+                    if selected:
+                        selected.extend(inner)
+                        parts = []
+                        depth = 1
+                        break
+
+                    if inner:
+                        stack.append(level)
+                        level = [(selector, steps, step + 1) for selector, steps, step in inner]
+                        continue
+
+                    depth = 1
+                    break
+
+                else:
+                    head.append(text[pos:end])
+                    pos = end
+
+        if head:
+            self._putSelected(self._getStructure(self._scanToken("".join(head)))._getStatements(), level, found)
+
+    def _putSelected(self,statements:typing.Union['Statement',list['Statement']],level:list[tuple[str,list[tuple[str,bool,str]],int]],found:dict[str,list['Statement']]) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Apply the selectors at their current step to the
+        parsed Statements of `extract()`, and put the results into `found`.
+        A selector further down the Statement is applied to its value.
+        '''
+
+        if isinstance(statements, Statement):
+            statements = [statements]
+
+        if not statements:
+            return
+
+        script = PDXscript._fromStatements(statements)
+
+        for selector, steps, step in level:
+            found[selector].extend(script.select(steps[step][2]))
+
+    def _skipBlock(self,text:str,pos:int,end:int,depth:int) -> tuple[int,int]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Find the bracket closing the block being read. The
+        text is taken in growing windows of whole lines. A window without
+        comments, back slashes or brackets in quotes is passed over by
+        counting its brackets (see `_getBracket()`), and the one holding the
+        closing bracket is halved down to a few lines before it's searched.
+        Any other window is matched with `_PLAIN_PATTERN` and walked from the
+        first line it stops at.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the chunk of the script.
+        - pos (int): the position to start from, at a token boundary.
+        - end (int): the position to stop at, at the end of a line.
+        - depth (int): the number of brackets open at `pos`.
+
+        Return
+        -----------------------------------------------------------------------
+        tuple[int,int] : the position of the closing bracket, or -1 if it
+        isn't in the text, and the depth at that position.
+        '''
+
+        find = text.find
+        count = text.count
+        window = 1 << 10
+
+        while pos < end:
+
+            stop = find("\n", pos + window, end) + 1 or end
+            window = min(window << 1, 1 << 20)
+            brackets = self._getBracket(text, pos, stop)
+
+            if brackets is not None:
+
+                closes = len(brackets) - len(brackets.lstrip(b"}"))
+
+                if closes < depth:
+                    depth += len(brackets) - 2 * closes
+                    pos = stop
+                    continue
+
+                while stop - pos > 1 << 12:
+
+                    half = find("\n", (pos + stop) >> 1, stop) + 1
+
+                    if not half or half == stop:
+                        break
+
+                    brackets = self._getBracket(text, pos, half)
+                    closes = len(brackets) - len(brackets.lstrip(b"}"))
+
+                    if closes < depth:
+                        depth += len(brackets) - 2 * closes
+                        pos = half
+
+                    else:
+                        stop = half
+
+                plain = stop
+
+            else:
+                plain = _PLAIN_PATTERN.match(text, pos, stop).end()
+
+            while True:
+
+                close = find("}", pos, plain)
+
+                if close == -1:
+                    depth += count("{", pos, plain)
+                    break
+
+                depth += count("{", pos, close) - 1
+
+                if depth == 0:
+                    return close, 0
+
+                pos = close + 1
+
+            if plain == stop:
+                pos = stop
+                continue
+
+            walker = self._walkLine(text, plain, end)
+
+            try:
+                while True:
+                    position, char, _ = next(walker)
+                    depth += 1 if char == "{" else -1
+
+                    if depth == 0:
+                        return position, 0
+
+            except StopIteration as result:
+                pos = result.value
+
+        return -1, depth
+
+    def _getBracket(self,text:str,pos:int,end:int) -> typing.Optional[bytes]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the brackets of whole lines of text with every
+        matched pair taken out, leaving some `}` followed by some `{`. Every
+        character but quotes, brackets, comments, back slashes and line
+        breaks is dropped first, so a quoted word without any of them is an
+        empty pair of quotes.
+
+        Return
+        -----------------------------------------------------------------------
+        bytes | None : the unmatched brackets, or None if the text has a
+        comment, a back slash, or a quote that isn't such an empty pair.
+        '''
+
+        marks = text[pos:end].encode("utf-8").translate(None, _BRACKET_DELETE)
+
+        if b"\"" in marks:
+            marks = marks.replace(b"\"\"", b"")
+
+        if b"\"" in marks or b"#" in marks or b"\\" in marks:
+            return None
+
+        marks = marks.replace(b"\n", b"")
+
+        while b"{}" in marks:
+            marks = marks.replace(b"{}", b"")
+
+        return marks
+
+    def _getLazyStructure(self,text:str,start:int = 0,end:int = None) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the PDXscript of the text between `start` and
+        `end`, keeping every block at this level as a `_LazyBlock` span. When
+        `end` is given it's the position of the closing bracket of the block,
+        and the value of that block is returned instead, the same as
+        `_getStructure()` would set it.
+
+        A block is only kept as a span when its brackets are clean token
+        boundaries and it follows an operator. Any other block is parsed
+        right away with the text around it.
+
+        A block whose content leaves an unfinished statement before its
+        closing bracket is malformed. The eager parse carries the leftover
+        words into the enclosing level, but an expanded span keeps them
+        inside the block.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+        - start (int): the position to start from.
+        - end (int): the position of the closing bracket, None for the end of text.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript | list : the script, or the value of the block.
+        '''
+
+        closed = end is not None
+
+        if not closed:
+            end = len(text)
+
+        tokens:list[str] = ["_", "#E", "#L"] if closed else []
+        spans:list[tuple[int,int]] = []
+        pos = start
+        depth = 0
+
+        for position, char, clean in self._iterBracket(text, start, end):
+
+            if char == "{":
+
+                if depth == 0:
+                    opening = position
+                    opening_clean = clean
+
+                depth += 1
+                continue
+
+            depth -= 1
+
+            if depth < 0:
+                break
+
+            if depth == 0 and opening_clean and clean:
+                head = self._scanToken(text[pos:opening])
+                last = head[-1] if head else tokens[-1] if tokens else None
+
+                if last is not None and last in "#E#G#S":
+                    tokens.extend(head)
+                    tokens.append(_LAZY_TOKEN)
+                    spans.append((opening + 1, position))
+                    pos = position + 1
+
+        tokens.extend(self._scanToken(text[pos:end + 1] if closed else text[pos:end]))
+
+        script = self._getStructure(tokens)
+
+        if closed:
+            script = script[0]._value
+
+        if spans and isinstance(script, PDXscript):
+
+            blocks = iter(spans)
+
+            for statement in script._getStatements():
+                if statement._value is _LAZY_TOKEN:
+                    statement._value = _LazyBlock(text, *next(blocks))
+
+        return script
+
+    def _iterBracket(self,text:str,pos:int,end:int) -> typing.Iterator[tuple[int,str,bool]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Find the brackets that `_scanToken()` would make
+        `#L` and `#R` tokens of, without making any token. Closed quotes and
+        comments are skipped by a compiled pattern, and only lines with an
+        escape or unclosed quote are walked character by character.
+
+        A bracket is clean when the text right after it can be tokenized on
+        its own: no back slash is pending, and for `{` no word is pending.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+        - pos (int): the position to start from. Must be a token boundary.
+        - end (int): the position to stop at.
+
+        Return
+        -----------------------------------------------------------------------
+        Iterator[tuple[int,str,bool]] : the position, bracket and cleanness.
+        '''
+
+        while pos < end:
+
+            for match in _BRACKET_PATTERN.finditer(text, pos, end):
+
+                char = match.group()
+
+                if char == "{":
+                    position = match.start()
+                    yield position, char, position == 0 or text[position - 1] in "\t \n=}><{"
+
+                elif char == "}":
+                    yield match.start(), char, True
+
+                elif char == "\"" or char == "\\":
+                    pos = match.start()
+                    break
+
+            else:
+                return
+
+            pos = yield from self._walkLine(text, pos, end)
+
+    def _walkLine(self,text:str,pos:int,end:int) -> typing.Generator[tuple[int,str,bool],None,int]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Character by character counterpart of
+        `_iterBracket()` for lines with escapes or unclosed quotes, following
+        `_scanLine()`. A word left open by a quote at the end of line keeps
+        going on the next line.
+
+        Return
+        -----------------------------------------------------------------------
+        int : the position where `_iterBracket()` could continue.
+        '''
+
+        has_word = False
+
+        while pos < end:
+
+            line_end = text.find("\n", pos, end)
+            line_end = end if line_end == -1 else line_end + 1
+
+            has_quoatation_mark = False
+            has_back_slash = False
+
+            for position in range(pos, line_end):
+
+                char = text[position]
+
+                if not char in "\t \n={}><#\"\\" or has_quoatation_mark and not char in "\"\\":
+                    has_word = True
+
+                elif char in "\t \n}#" and not has_quoatation_mark:
+
+                    has_word = False
+
+                    if char == "}":
+                        yield position, char, not has_back_slash
+
+                    if char == "#":
+                        break
+
+                elif char in "=><":
+                    has_word = False
+
+                elif char == "{":
+                    yield position, char, not has_word and not has_back_slash
+
+                elif char == "\"":
+
+                    has_word = True
+
+                    if not has_back_slash:
+                        has_quoatation_mark = not has_quoatation_mark
+                    else:
+                        has_back_slash = False
+
+                elif char == "\\":
+                    has_word = True
+                    has_back_slash = True
+
+            pos = line_end
+
+            if not has_word:
+                break
+
+        return pos
+
+    def _setSource(self,path:str,text:str,nodes:typing.Optional[list[tuple]]) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Set the Statements of the script from the spans of
+        its text and keep them for `reload()`. Without spans, the text couldn't
+        be split into blocks and is parsed in full, the same as without the
+        incremental mode.
+        '''
+
+        if nodes is None:
+            self._element = self._getStructure(self._scanToken(text))
+
+        else:
+            self._element = PDXscript._fromStatements([statement for node in nodes for statement in node[2]])
+
+        self._element._owner = self
+        self._source = _Source(path, text, nodes)
+
+    def _getSpans(self,text:str,start:int,end:int,closed:bool = False) -> typing.Optional[list[tuple]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Split the text between `start` and `end` into spans
+        ending right after each block at this level, plus the span of what's
+        left after the last block, and parse each of them (see `_getSpan()`).
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+        - start (int): the position to start from. Must be a token boundary.
+        - end (int): the position to stop at.
+        - closed (bool): whether `end` is the position of the bracket closing
+        the block the text is the content of.
+
+        Return
+        -----------------------------------------------------------------------
+        list[tuple] | None : the spans, or None if the brackets don't match.
+        '''
+
+        return self._getRespans(None, text, start, end, closed, start, end, 0)
+
+    def _getRespans(self,
+                    nodes:typing.Optional[list[tuple]],
+                    text:str,
+                    start:int,
+                    end:int,
+                    closed:bool,
+                    edit_start:int,
+                    edit_end:int,
+                    delta:int) -> typing.Optional[list[tuple]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the spans of the text between `start` and `end`
+        of the old text after an edit, reusing the old spans out of the edit.
+        The old text from `edit_start` to `edit_end` was replaced, making the
+        new text `delta` longer; the text before and after is the same.
+
+        When the edit is in the content of one large block, its spans are
+        made again one level down. Otherwise the text is split into spans
+        from the span holding the start of the edit, until a span ends after
+        the edit where an old one ended: the rest is the same as before. An
+        old span in between with the same hash is reused.
+
+        Without old spans, the whole text is split.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - nodes (list[tuple] | None): the old spans, see `_getSpan()`.
+        - text (str): the new text.
+        - start (int): the start of the spans, the same in both texts.
+        - end (int): the end of the spans in the old text.
+        - closed (bool): whether `end` is the position of a closing bracket.
+        - edit_start (int): the start of the edit, the same in both texts.
+        - edit_end (int): the end of the edit in the old text.
+        - delta (int): the change of length of the text.
+
+        Return
+        -----------------------------------------------------------------------
+        list[tuple] | None : the spans, or None if the brackets don't match.
+        '''
+
+        first = 0
+        reused:dict[bytes,list[tuple]] = {}
+        ends:dict[int,int] = {}
+        position = start
+
+        if nodes is not None:
+
+            starts = []
+
+            for node in nodes:
+                starts.append(position)
+                position += node[0]
+
+            first = len(nodes) - 1
+
+            for index, node in enumerate(nodes):
+
+                if starts[index] + node[0] > edit_start:
+                    first = index
+                    break
+
+            last = first
+
+            while last + 1 < len(nodes) and starts[last + 1] < edit_end:
+                last += 1
+
+            node = nodes[first]
+            position = starts[first]
+
+            if first == last and node[4] is not None and edit_start >= position + node[3] and edit_end < position + node[0]:
+
+                children = self._getRespans(node[4], text, position + node[3], position + node[0] - 1, True, edit_start, edit_end, delta)
+                content = [statement for child in children for statement in child[2]] if children is not None else None
+
+                if content:
+                    block = node[2][-1]
+                    statement = Statement(block._keyword, PDXscript._fromStatements(content))
+                    statement._operator = block._operator
+                    length = node[0] + delta
+                    digest = self._getSpanHash(text, position, position + length)
+
+                    return nodes[:first] + [(length, digest, node[2][:-1] + [statement], node[3], children)] + nodes[first + 1:]
+
+            for node in nodes[first:last + 1]:
+                reused.setdefault(node[1], []).append(node)
+
+            for index in range(last, len(nodes)):
+                ends[starts[index] + nodes[index][0] + delta] = index
+
+        end += delta
+        stop = end + 1 if closed else end
+        spans:list[tuple[int,int,typing.Optional[int]]] = []
+        tail = None
+        edit_end += delta
+
+        blocks = self._iterBlock(text, position, stop)
+
+        try:
+            while tail is None:
+
+                opening, close, clean = next(blocks)
+
+                if close == -1 or closed and close == end:
+                    return None
+
+                if clean:
+                    spans.append((position, close + 1, opening))
+                    position = close + 1
+
+                    if position >= edit_end and position in ends:
+                        tail = nodes[ends[position] + 1:]
+
+        except StopIteration as stopped:
+
+            if stopped.value != (end if closed else -1):
+                return None
+
+        if tail is None:
+            spans.append((position, end, None))
+            tail = []
+
+        result = nodes[:first] if nodes is not None else []
+
+        for span_start, span_end, opening in spans:
+
+            digest = self._getSpanHash(text, span_start, span_end)
+            same = reused.get(digest)
+
+            if same:
+                result.append(same.pop(0))
+            else:
+                result.append(self._getSpan(text, span_start, span_end, opening, digest))
+
+        return result + tail
+
+    def _iterBlock(self,text:str,pos:int,end:int) -> typing.Generator[tuple[int,int,bool],None,int]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Find the blocks at the level of `pos`. A block is
+        clean when both its brackets are clean token boundaries (see
+        `_iterBracket()`).
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+        - pos (int): the position to start from. Must be a token boundary.
+        - end (int): the position to stop at.
+
+        Return
+        -----------------------------------------------------------------------
+        Generator : the positions of the opening and closing brackets of
+        each block and its cleanness, the closing one -1 for a block not
+        closed before `end`. It returns the position of the first `}` that
+        closes nothing at this level, or -1.
+        '''
+
+        depth = 0
+
+        for bracket, char, clean in self._iterBracket(text, pos, end):
+
+            if char == "{":
+
+                if depth == 0:
+                    opening = bracket
+                    opening_clean = clean
+
+                depth += 1
+                continue
+
+            if depth == 0:
+                return bracket
+
+            depth -= 1
+
+            if depth == 0:
+                yield opening, bracket, opening_clean and clean
+
+        if depth > 0:
+            yield opening, -1, False
+
+        return -1
+
+    def _getSpan(self,text:str,start:int,end:int,opening:typing.Optional[int],digest:bytes) -> tuple:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Parse a span of text. A span from `_SPAN_SIZE` ending
+        with a block after an operator keeps the spans of the block's content
+        (see `_getSpans()`), and the Statements before the block are parsed
+        apart.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - text (str): the whole script.
+        - start (int): the start of the span.
+        - end (int): the end of the span, right after the closing bracket of
+        its block if it has one.
+        - opening (int | None): the position of the opening bracket of the
+        block, None for the span after the last block.
+        - digest (bytes): the hash of the text of the span.
+
+        Return
+        -----------------------------------------------------------------------
+        tuple : `(length, digest, statements, head, children)`, where `head`
+        is the length of the text up to the content of the block and
+        `children` are the spans of the content, or 0 and None when it's
+        not split.
+        '''
+
+        if opening is not None and end - start >= _SPAN_SIZE:
+
+            head = self._scanToken(text[start:opening + 1] + "}")
+
+            if len(head) >= 4 and head[-3] in ("#E", "#G", "#S"):
+
+                children = self._getSpans(text, opening + 1, end - 1, True)
+                content = [statement for child in children for statement in child[2]] if children is not None else None
+
+                if content:
+                    statements = self._getStructure(head)._getStatements()
+                    statements[-1]._putValue(PDXscript._fromStatements(content))
+
+                    return (end - start, digest, statements, opening + 1 - start, children)
+
+        return (end - start, digest, self._getStructure(self._scanToken(text[start:end]))._getStatements(), 0, None)
+
+    def _getSpanHash(self,text:str,start:int,end:int) -> bytes:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the hash of the text of a span.
+        '''
+
+        return hashlib.blake2b(text[start:end].encode("utf-8", "surrogatepass"), digest_size = 16).digest()
+
+    def _getCommonPrefix(self,old:str,text:str) -> int:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the length of the common start of two texts. The
+        texts are compared by `_COMPARE_SIZE` characters, then the differing
+        part is halved down, so every comparison is done by `str`.
+        '''
+
+        length = min(len(old), len(text))
+        low = 0
+
+        while low < length and old[low:low + _COMPARE_SIZE] == text[low:low + _COMPARE_SIZE]:
+            low += _COMPARE_SIZE
+
+        low = min(low, length)
+        high = min(low + _COMPARE_SIZE, length)
+
+        while low < high:
+
+            middle = (low + high + 1) >> 1
+
+            if old[low:middle] == text[low:middle]:
+                low = middle
+            else:
+                high = middle - 1
+
+        return low
+
+    def _getCommonSuffix(self,old:str,text:str) -> int:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the length of the common end of two texts, the
+        same way as `_getCommonPrefix()`.
+        '''
+
+        length = min(len(old), len(text))
+        old_end = len(old)
+        end = len(text)
+        low = 0
+
+        while low < length and old[max(old_end - low - _COMPARE_SIZE, 0):old_end - low] == text[max(end - low - _COMPARE_SIZE, 0):end - low]:
+            low += _COMPARE_SIZE
+
+        low = min(low, length)
+        high = min(low + _COMPARE_SIZE, length)
+
+        while low < high:
+
+            middle = (low + high + 1) >> 1
+
+            if old[old_end - middle:old_end - low] == text[end - middle:end - low]:
+                low = middle
+            else:
+                high = middle - 1
+
+        return low
+
+    def _getStructure(self,tokens:list[str]) -> 'PDXscript':
         '''
         Description
         -----------------------------------------------------------------------
@@ -486,6 +3512,7 @@ class PDXscript:
         temp:list[str] = []
         stack:list['PDXscript'] = []
         current_script:'PDXscript' = PDXscript()
+        intern = sys.intern
 
         for token in tokens:
             
@@ -494,21 +3521,23 @@ class PDXscript:
                 temp.append(token)
 
             elif token == "#L":
-                current_script.append(Statement(temp[0],"",temp[1]))
+                statement = Statement(intern(temp[0]),"",temp[1])
+                statement._owner = current_script
+                current_script._element.append(statement)
                 stack.append(current_script)
                 temp = []
                 current_script = PDXscript()
                 is_statement = False
 
             elif token == "#R":
-                if current_script:
+                if current_script._element:
                     last_script = stack.pop()
-                    last_script[-1].set_value(current_script)
+                    last_script._element[-1]._putValue(current_script)
                     current_script = last_script
 
                 else:
                     last_script = stack.pop()
-                    last_script[-1].set_value(temp)
+                    last_script._element[-1]._putValue(temp)
                     temp = []
                     current_script = last_script
             
@@ -516,7 +3545,9 @@ class PDXscript:
 
                 if is_statement:
                     is_statement = False
-                    current_script.append(Statement(temp[0],token,temp[1]))
+                    statement = Statement(intern(temp[0]),token,temp[1])
+                    statement._owner = current_script
+                    current_script._element.append(statement)
                     temp = []
 
                 else:
@@ -524,6 +3555,40 @@ class PDXscript:
         
         return current_script
 
+class _LazyBlock:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal class. The value of a Statement kept as the source span of its
+    block by the lazy mode. `Statement.get_value()` replaces it with the
+    parsed value on first use.
+    '''
+
+    __slots__ = ("_text", "_start", "_end")
+
+    def __init__(self,text:str,start:int,end:int) -> None:
+        self._text = text
+        self._start = start
+        self._end = end
+
+    def _expand(self) -> typing.Union[list,'PDXscript']:
+        return PDXscript()._getLazyStructure(self._text, self._start, self._end)
+
+class _Source:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal class. The path, text and spans of a script kept by the
+    incremental mode for `PDXscript.reload()`.
+    '''
+
+    __slots__ = ("_path", "_text", "_nodes")
+
+    def __init__(self,path:str,text:str,nodes:typing.Optional[list[tuple]]) -> None:
+        self._path = path
+        self._text = text
+        self._nodes = nodes
+
 class ScriptNotClosedException(Exception):
     def __init__(self,message) -> None:
         super().__init__(message)
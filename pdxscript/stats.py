@@ -0,0 +1,297 @@
+'''
+stats.py
+
+This module collects where the time of reading and writing pdx scripts
+goes. It's opt-in: nothing is measured unless a ParseStats object is given
+to the reading or writing method.
+
+Class
+-----------------------------------------------------------------------
+- `ParseStats` : Collector of per-phase timers and counters.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import PDXscript, ParseStats, load_directory
+>>> stats = ParseStats()
+>>> scripts = load_directory(root, "events/*.txt", stats = stats)
+>>> print(stats.report())
+'''
+
+import time
+import typing
+
+# Phases in the order they run, so a report reads like the pipeline.
+_PHASE_ORDER = ("cache", "read", "tokenize", "structure", "pack", "unpack", "text", "write")
+
+_COUNTERS = ("bytes", "tokens", "statements", "lines")
+
+class ParseStats:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Collector of per-phase timers and counters of reading and writing pdx
+    scripts. Every file read or written with it adds a record:
+
+    - `operation` (str) : `read` or `write`.
+    - `path` (str | None) : the file, or None for text in memory.
+    - `seconds` (dict[str, float]) : the time of each phase. A read has
+    `read` (file I/O and decoding), `tokenize` and `structure`, and `cache`
+    when a ParseCache is used. A write has `text` and `write`.
+    - `bytes` (int) : the size of the file. Text in memory counts its length.
+    - `tokens` (int) : the number of tokens. 0 when nothing was tokenized.
+    - `statements` (int) : the number of Statements at every level.
+    - `depth` (int) : the deepest nesting of blocks. 0 for a flat script.
+    - `lines` (int) : the number of lines written.
+
+    Blocks kept unparsed by the lazy mode aren't counted.
+
+    Function
+    -----------------------------------------------------------------------
+    - `__init__()` : Initialize an empty collector.
+    - `add()` : Add a record.
+    - `merge()` : Add every record of another collector.
+    - `get_records()` : Get the records.
+    - `get_summary()` : Get the totals of each operation.
+    - `report()` : Get the totals as readable text.
+    - `clear()` : Remove every record.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> stats = ParseStats(callback = lambda record: print(record["path"], record["seconds"]))
+    >>> script = PDXscript(path, stats = stats)
+    >>> script.write(out_path, stats = stats)
+    >>> print(stats.report())
+    '''
+
+    def __init__(self, callback:typing.Callable[[dict],None] = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Initialize an empty collector.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `callback` (Callable[[dict], None]) : called with every record as
+        it's added, like to log slow files as they come.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self._callback = callback
+        self._records:list[dict] = []
+
+    def add(self, record:dict) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Add a record, then call the callback with it.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `record` (dict) : the record, see the class description.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self._records.append(record)
+
+        if self._callback is not None:
+            self._callback(record)
+
+    def merge(self, other:'ParseStats') -> 'ParseStats':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Add every record of another collector, like one per thread.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `other` (ParseStats) : the collector to add.
+
+        Return
+        -----------------------------------------------------------------------
+        ParseStats : this collector.
+        '''
+
+        for record in other._records:
+            self.add(record)
+
+        return self
+
+    def get_records(self) -> list[dict]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the records in the order they were added.
+        '''
+
+        return list(self._records)
+
+    def get_summary(self) -> dict[str,dict]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the totals of each operation: `files`, `seconds` (the total of
+        the phases), the total `seconds` of each phase as `phases`, every
+        counter summed, and `depth` as the deepest of all files.
+
+        Return
+        -----------------------------------------------------------------------
+        dict[str, dict] : the totals by operation.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> summary = stats.get_summary()
+        >>> summary["read"]["phases"]["tokenize"]
+        1.7205
+        '''
+
+        summary:dict[str,dict] = {}
+
+        for record in self._records:
+
+            total = summary.get(record["operation"])
+
+            if total is None:
+                total = summary[record["operation"]] = {"files" : 0, "seconds" : 0.0, "phases" : {}, "depth" : 0}
+                total.update((counter, 0) for counter in _COUNTERS)
+
+            total["files"] += 1
+
+            for phase, seconds in record["seconds"].items():
+                total["phases"][phase] = total["phases"].get(phase, 0.0) + seconds
+                total["seconds"] += seconds
+
+            for counter in _COUNTERS:
+                total[counter] += record.get(counter, 0)
+
+            total["depth"] = max(total["depth"], record.get("depth", 0))
+
+        return summary
+
+    def report(self, slowest:int = 5) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the totals as readable text: the time and share of each phase,
+        the counters, and the slowest files of each operation.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `slowest` (int) : the number of slowest files to list.
+
+        Return
+        -----------------------------------------------------------------------
+        str : the report.
+        '''
+
+        lines:list[str] = []
+
+        for operation, total in self.get_summary().items():
+
+            seconds = total["seconds"]
+            rate = total["bytes"] / 1e6 / seconds if seconds else 0.0
+            lines.append(f"{operation}: {total['files']} file(s), {total['bytes'] / 1e6:.3f} MB in {seconds:.3f} s ({rate:.2f} MB/s)")
+
+            phases = sorted(total["phases"].items(),
+                            key = lambda item: _PHASE_ORDER.index(item[0]) if item[0] in _PHASE_ORDER else len(_PHASE_ORDER))
+
+            for phase, phase_seconds in phases:
+                share = phase_seconds / seconds if seconds else 0.0
+                lines.append(f"  {phase:<10} {phase_seconds:10.4f} s {share:7.1%}")
+
+            counters = ", ".join(f"{counter} {total[counter]}" for counter in _COUNTERS if total[counter])
+            lines.append(f"  {counters}, max depth {total['depth']}" if counters else f"  max depth {total['depth']}")
+
+            records = [record for record in self._records if record["operation"] == operation]
+            records.sort(key = lambda record: sum(record["seconds"].values()), reverse = True)
+
+            if slowest > 0 and records:
+                lines.append("  slowest:")
+
+                for record in records[:slowest]:
+                    lines.append(f"  {sum(record['seconds'].values()):10.4f} s  {record['path']}")
+
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Remove every record.
+        '''
+
+        self._records = []
+
+    def _start(self, operation:str, path:typing.Optional[str]) -> '_Timer':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Start timing a file. The timer adds its record to
+        this collector when it's stopped.
+        '''
+
+        return _Timer(self, {"operation" : operation, "path" : path, "seconds" : {}})
+
+class _Timer:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal class. Times the phases of one file. Each `lap()` charges the
+    time since the previous one to a phase.
+    '''
+
+    __slots__ = ("_stats", "_record", "_last")
+
+    def __init__(self, stats:'ParseStats', record:dict) -> None:
+        self._stats = stats
+        self._record = record
+        self._last = time.perf_counter()
+
+    def lap(self, phase:str) -> None:
+        now = time.perf_counter()
+        seconds = self._record["seconds"]
+        seconds[phase] = seconds.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def count(self, **counters:int) -> None:
+        self._record.update(counters)
+        self._last = time.perf_counter()
+
+    def stop(self, script:typing.Any = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Count the Statements and depth of the script, if given, then add the
+        record to the collector.
+        '''
+
+        if script is not None:
+            self._record["statements"], self._record["depth"] = script._getShape()
+
+        self._stats.add(self._record)
+
+class _NullTimer:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal class. Stands for a timer when no ParseStats is given, so the
+    reading and writing methods take the same path without measuring.
+    '''
+
+    __slots__ = ()
+
+    def lap(self, phase:str) -> None:
+        pass
+
+    def count(self, **counters:int) -> None:
+        pass
+
+    def stop(self, script:typing.Any = None) -> None:
+        pass
+
+_NULL_TIMER = _NullTimer()
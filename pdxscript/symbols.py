@@ -0,0 +1,591 @@
+'''
+symbols.py
+
+This module indexes where the ids of pdx scripts are defined and where
+they're referenced, across the game and its mods, and keeps the index on
+disk so only changed files are read again on the next run.
+
+Class
+-----------------------------------------------------------------------
+- `SymbolRule` : A rule telling which Statements define or reference a
+                 symbol.
+- `SymbolIndex` : Persistent index of symbol definitions and references.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import SymbolIndex
+>>> index = SymbolIndex("./symbols.idx")
+>>> index.update("C:/Program Files (x86)/Steam/steamapps/common/Hearts of Iron IV")
+>>> index.save()
+>>> index.get_definitions("focus", "FIN_continuation_war")
+'''
+
+import concurrent.futures
+import hashlib
+import marshal
+import os
+import pathlib
+import sys
+import tempfile
+import typing
+
+from .pdxscript import PDXscript
+from .loader import _getChunk, _getPaths
+
+# Bump it whenever the stored form or the walk changes, so an old index is
+# never read back with a different meaning.
+INDEX_VERSION = 2
+
+_EVENT_KEYWORDS = ("country_event", "news_event", "state_event", "unit_leader_event", "operative_leader_event")
+
+class SymbolRule:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    A rule telling which Statements define or reference a symbol of a kind.
+    A Statement matches when its keyword, the keyword of the block it's in,
+    its depth and the path of its file all fit the rule.
+
+    The name of the symbol is the value of the Statement, each item of a
+    list value, or the keyword itself for the keyword `*`. Quotes around a
+    name are removed.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> SymbolRule("focus", "definition", "id", parent = "focus")
+    >>> SymbolRule("country_flag", "reference", ("has_country_flag", "clr_country_flag"))
+    >>> SymbolRule("scripted_effect", "definition", "*", depth = 1, path = "common/scripted_effects/*.txt")
+    '''
+
+    __slots__ = ("kind", "role", "keywords", "parents", "depth", "path", "value")
+
+    def __init__(self,
+                 kind:str,
+                 role:typing.Literal["definition","reference"],
+                 keyword:typing.Union[str,typing.Iterable[str]],
+                 parent:typing.Union[str,typing.Iterable[str]] = None,
+                 depth:int = None,
+                 path:str = None,
+                 value:str = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Initialize the rule.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `kind` (str) : the kind of symbol, like `focus` or `event`.
+        - `role` (str) : `definition` or `reference`.
+        - `keyword` (str | Iterable[str]) : the keywords of the Statement. `*`
+        matches a Statement with a block, or with `value`, and names the
+        symbol by its keyword.
+        - `parent` (str | Iterable[str]) : the keywords of the block the
+        Statement must be in. Any block by default.
+        - `depth` (int) : the level the Statement must be at, 1 for top-level.
+        Any level by default.
+        - `path` (str) : a glob the whole path of the file relative to its root
+        must match, where `*` doesn't cross `/`. Any file by default.
+        - `value` (str) : the value the Statement must have, like `yes`.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self.kind = kind
+        self.role = role
+        self.keywords = frozenset((keyword,) if isinstance(keyword, str) else keyword)
+        self.parents = None if parent is None else frozenset((parent,) if isinstance(parent, str) else parent)
+        self.depth = depth
+        self.path = path
+        self.value = value
+
+    def __repr__(self) -> str:
+        return (f"SymbolRule({self.kind!r}, {self.role!r}, {sorted(self.keywords)!r}, "
+                f"{None if self.parents is None else sorted(self.parents)!r}, {self.depth!r}, {self.path!r}, {self.value!r})")
+
+DEFAULT_RULES:tuple['SymbolRule',...] = (
+    SymbolRule("focus", "definition", "id", parent = ("focus", "shared_focus")),
+    SymbolRule("focus", "reference", ("has_completed_focus", "complete_national_focus", "unlock_national_focus", "focus_progress")),
+    SymbolRule("focus", "reference", "focus", parent = ("prerequisite", "mutually_exclusive")),
+    SymbolRule("event", "definition", "id", parent = _EVENT_KEYWORDS, depth = 2),
+    SymbolRule("event", "reference", _EVENT_KEYWORDS),
+    SymbolRule("event", "reference", "id", parent = _EVENT_KEYWORDS),
+    SymbolRule("idea", "definition", "*", depth = 3, path = "common/ideas/*.txt"),
+    SymbolRule("idea", "reference", ("add_ideas", "remove_ideas", "has_idea")),
+    SymbolRule("idea", "reference", "idea", parent = "add_timed_idea"),
+    SymbolRule("idea", "reference", ("add_idea", "remove_idea"), parent = "swap_ideas"),
+    SymbolRule("decision", "definition", "*", depth = 2, path = "common/decisions/*.txt"),
+    SymbolRule("decision", "reference", ("activate_decision", "has_decision", "unlock_decision_tooltip",
+                                         "activate_mission", "remove_mission", "has_active_mission")),
+    SymbolRule("country_flag", "definition", "set_country_flag"),
+    SymbolRule("country_flag", "definition", "flag", parent = "set_country_flag"),
+    SymbolRule("country_flag", "reference", ("has_country_flag", "clr_country_flag")),
+    SymbolRule("country_flag", "reference", "flag", parent = ("has_country_flag", "clr_country_flag")),
+    SymbolRule("global_flag", "definition", "set_global_flag"),
+    SymbolRule("global_flag", "definition", "flag", parent = "set_global_flag"),
+    SymbolRule("global_flag", "reference", ("has_global_flag", "clr_global_flag")),
+    SymbolRule("global_flag", "reference", "flag", parent = ("has_global_flag", "clr_global_flag")),
+    SymbolRule("scripted_effect", "definition", "*", depth = 1, path = "common/scripted_effects/*.txt"),
+)
+
+class SymbolIndex:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Persistent index of where symbols, like focus ids, event ids, ideas,
+    decisions, flags and scripted effects, are defined and referenced. What
+    counts as a definition or a reference is given by `SymbolRule` objects,
+    `DEFAULT_RULES` by default. A Statement is taken by at most one rule
+    of each kind, the first that matches.
+
+    A location is `(path, index, trail)`: the absolute path of the file,
+    the index of the top-level Statement containing the symbol, and the
+    keywords from that Statement down to the matching one, joined by `/`.
+    There are no line numbers, since the tree doesn't keep them.
+
+    Every file is kept with its mtime and size. `update()` reads again only
+    the files whose mtime or size changed, and `save()` writes the index
+    to disk. An index saved with other rules or by another version is
+    ignored when loaded.
+
+    The default rules have no `scripted_effect` references: a call is just
+    `name = yes`, which can't be told from a trigger like `is_ai = yes`
+    without the definitions. To index them anyway, add
+    `SymbolRule("scripted_effect", "reference", "*", value = "yes")` and
+    only look up the names that are also defined.
+
+    Function
+    -----------------------------------------------------------------------
+    - `__init__()` : Initialize the index, loading it from disk if it's there.
+    - `update()` : Index the new and changed files under a directory.
+    - `remove()` : Remove a file from the index.
+    - `save()` : Write the index to disk.
+    - `get_definitions()` : Get the locations defining a symbol.
+    - `get_references()` : Get the locations referencing a symbol.
+    - `get_names()` : Get the names of a kind of symbol.
+    - `get_files()` : Get the indexed files.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> index = SymbolIndex("./symbols.idx")
+    >>> index.update(game_root, workers = 4)
+    >>> index.update(mod_root)
+    >>> index.save()
+    >>> for path, top, trail in index.get_references("event", "finland.1"):
+    >>>     print(path, trail)
+    '''
+
+    def __init__(self, path:str = None, rules:typing.Iterable['SymbolRule'] = DEFAULT_RULES) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Initialize the index, loading it from `path` if there's a valid index
+        saved with the same rules.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str) : the file to keep the index in. The index is only kept
+        in memory if it's None.
+        - `rules` (Iterable[SymbolRule]) : the rules of definitions and
+        references.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self._path = path
+        self._rules = tuple(rules)
+        self._stamp = (INDEX_VERSION, marshal.version, hashlib.sha1(repr(self._rules).encode("utf-8")).hexdigest())
+        self._files:dict[str,tuple[int,int,tuple]] = {}
+        self._symbols:dict[tuple[str,str,str],dict[str,list[tuple[int,str]]]] = {}
+
+        if path is not None:
+            self._load()
+
+    def update(self,
+               root:str,
+               pattern:str = "**/*.txt",
+               workers:int = 1,
+               errors:dict[str,Exception] = None) -> int:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Index the files under `root` matching the glob `pattern` that are
+        new or changed since they were indexed, and remove the indexed files
+        under `root` that don't exist anymore or don't match `pattern`.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `root` (str) : the root directory, the one containing `common`,
+        `events` and so on. Paths of the rules are relative to it.
+        - `pattern` (str) : the glob pattern relative to root.
+        - `workers` (int) : the number of processes. Only the symbols are sent
+        back from them, not the trees. None for the CPU count.
+        - `errors` (dict) : if given, the exception of each failed file is put
+        into it by path instead of being raised.
+
+        Return
+        -----------------------------------------------------------------------
+        int : the number of files indexed.
+
+        Raise
+        -----------------------------------------------------------------------
+        Any exception of a failed file, if `errors` isn't given.
+        '''
+
+        root = os.path.abspath(root)
+        paths = _getPaths(root, pattern)
+        changed:list[tuple[str,str,int,int]] = []
+
+        for path in paths:
+
+            status = os.stat(path)
+            record = self._files.get(path)
+
+            if record is None or record[0] != status.st_mtime_ns or record[1] != status.st_size:
+                changed.append((path, os.path.relpath(path, root).replace(os.sep, "/"), status.st_mtime_ns, status.st_size))
+
+        prefix = os.path.join(root, "")
+        found = set(paths)
+
+        for path in [path for path in self._files if path.startswith(prefix) and not path in found]:
+            self.remove(path)
+
+        failed:dict[str,Exception] = {}
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers <= 1 or len(changed) <= 1:
+            results = _indexChunk([path for path, _, _, _ in changed], [relative for _, relative, _, _ in changed], self._rules)
+
+        else:
+            relatives = {path : relative for path, relative, _, _ in changed}
+            results = []
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+                futures = [executor.submit(_indexChunk, chunk, [relatives[path] for path in chunk], self._rules)
+                           for chunk in _getChunk(list(relatives), 1 << 20)]
+
+                for future in concurrent.futures.as_completed(futures):
+                    results.extend(future.result())
+
+        status = {path : (mtime, size) for path, _, mtime, size in changed}
+
+        for path, entries, error in results:
+
+            if error is not None:
+                failed[path] = error
+                continue
+
+            self.remove(path)
+            self._files[path] = status[path] + (entries,)
+            self._putEntries(path, entries)
+
+        if failed and errors is None:
+            raise failed[min(failed)]
+
+        if errors is not None:
+            errors.update(failed)
+
+        return len(changed) - len(failed)
+
+    def remove(self, path:str) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Remove a file and its symbols from the index.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str) : the path of the file.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        path = os.path.abspath(path)
+        record = self._files.pop(path, None)
+
+        if record is None:
+            return
+
+        for kind, role, name, _, _ in record[2]:
+
+            locations = self._symbols.get((kind, role, name))
+
+            if locations is not None:
+                locations.pop(path, None)
+
+                if not locations:
+                    del self._symbols[(kind, role, name)]
+
+    def save(self) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Write the index to its file. It's written to a temporary file first
+        and moved in place, so a reader never sees half an index.
+
+        Raise
+        -----------------------------------------------------------------------
+        ValueError : if the index was made without a path.
+        '''
+
+        if self._path is None:
+            raise ValueError("The index has no path to be saved to")
+
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, exist_ok = True)
+
+        descriptor, temp_path = tempfile.mkstemp(suffix = ".tmp", dir = directory)
+
+        try:
+            with os.fdopen(descriptor, "wb") as tempFile:
+                tempFile.write(marshal.dumps((self._stamp, self._files)))
+
+            os.replace(temp_path, self._path)
+
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def get_definitions(self, kind:str, name:str) -> list[tuple[str,int,str]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the locations defining a symbol.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `kind` (str) : the kind of symbol, like `focus`.
+        - `name` (str) : the name of the symbol.
+
+        Return
+        -----------------------------------------------------------------------
+        list[tuple[str, int, str]] : `(path, index, trail)` of each definition.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> index.get_definitions("focus", "FIN_continuation_war")
+        [('.../common/national_focus/finland.txt', 0, 'focus_tree/focus/id')]
+        '''
+
+        return self._getLocation(kind, "definition", name)
+
+    def get_references(self, kind:str, name:str) -> list[tuple[str,int,str]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the locations referencing a symbol.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `kind` (str) : the kind of symbol, like `event`.
+        - `name` (str) : the name of the symbol.
+
+        Return
+        -----------------------------------------------------------------------
+        list[tuple[str, int, str]] : `(path, index, trail)` of each reference.
+        '''
+
+        return self._getLocation(kind, "reference", name)
+
+    def get_names(self, kind:str, role:typing.Literal["definition","reference"] = "definition") -> list[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the sorted names of a kind of symbol with definitions, or with
+        references.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> undefined = set(index.get_names("event", "reference")) - set(index.get_names("event"))
+        '''
+
+        return sorted(name for symbol_kind, symbol_role, name in self._symbols if symbol_kind == kind and symbol_role == role)
+
+    def get_files(self) -> list[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the sorted paths of the indexed files.
+        '''
+
+        return sorted(self._files)
+
+    def _getLocation(self, kind:str, role:str, name:str) -> list[tuple[str,int,str]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the locations of a symbol in path order.
+        '''
+
+        locations = self._symbols.get((kind, role, name))
+
+        if locations is None:
+            return []
+
+        return [(path, index, trail) for path in sorted(locations) for index, trail in locations[path]]
+
+    def _putEntries(self, path:str, entries:tuple) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Add the symbols of a file to the lookup table.
+        '''
+
+        symbols = self._symbols
+
+        for kind, role, name, index, trail in entries:
+
+            locations = symbols.get((kind, role, name))
+
+            if locations is None:
+                locations = symbols[(kind, role, name)] = {}
+
+            locations.setdefault(path, []).append((index, trail))
+
+    def _load(self) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Load the index from its file if it's there and was
+        saved with the same stamp.
+        '''
+
+        try:
+            with open(self._path, "rb") as indexFile:
+                stamp, files = marshal.loads(indexFile.read())
+
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+
+        if stamp != self._stamp:
+            return
+
+        self._files = files
+
+        for path, (_, _, entries) in files.items():
+            self._putEntries(path, entries)
+
+def _indexChunk(paths:list[str], relatives:list[str], rules:tuple['SymbolRule',...]) -> list[tuple[str,typing.Optional[tuple],typing.Optional[Exception]]]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Parse the files and get their symbols, in this
+    process or in a worker one.
+
+    Return
+    -----------------------------------------------------------------------
+    list[tuple] : `(path, entries, None)` for each indexed file, or
+    `(path, None, exception)` for each failed one. An entry is
+    `(kind, role, name, index, trail)`.
+    '''
+
+    results = []
+
+    for path, relative in zip(paths, relatives):
+
+        try:
+            results.append((path, _getEntries(PDXscript(path), relative, rules), None))
+
+        except Exception as error:
+            results.append((path, None, error))
+
+    return results
+
+def _getEntries(script:'PDXscript', relative:str, rules:tuple['SymbolRule',...]) -> tuple:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Walk the tree and get the symbols the rules find.
+    Only the rules whose path fits the file are used, grouped by keyword,
+    so a Statement only meets the rules that may match it. PurePath.match()
+    matches from the right, so a rule path also needs as many parts as the
+    file path to match it from the root.
+    '''
+
+    filePath = pathlib.PurePosixPath(relative)
+    parts = len(filePath.parts)
+    byKeyword:dict[str,list['SymbolRule']] = {}
+    anyKeyword:list['SymbolRule'] = []
+
+    for rule in rules:
+
+        if rule.path is not None and (len(pathlib.PurePosixPath(rule.path).parts) != parts or not filePath.match(rule.path)):
+            continue
+
+        for keyword in rule.keywords:
+
+            if keyword == "*":
+                anyKeyword.append(rule)
+            else:
+                byKeyword.setdefault(keyword, []).append(rule)
+
+    entries = []
+    intern = sys.intern
+
+    for index, top in enumerate(script._getStatements()):
+
+        stack:list[tuple['Statement',int,typing.Optional[str],str]] = [(top, 1, None, top._keyword)]
+
+        while stack:
+
+            statement, depth, parent, trail = stack.pop()
+            keyword = statement._keyword
+            value = statement.get_value()
+            matching = byKeyword.get(keyword, ())
+
+            if anyKeyword:
+                matching = list(matching) + anyKeyword
+
+            kinds:set[str] = set()
+
+            for rule in matching:
+
+                if rule.kind in kinds:
+                    continue
+
+                if rule.depth is not None and rule.depth != depth:
+                    continue
+
+                if rule.parents is not None and not parent in rule.parents:
+                    continue
+
+                if rule.value is not None and value != rule.value:
+                    continue
+
+                if "*" in rule.keywords and not keyword in rule.keywords:
+
+                    if rule.value is None and not isinstance(value, (PDXscript, list)):
+                        continue
+
+                    names = [keyword]
+
+                elif isinstance(value, str):
+                    names = [value]
+
+                elif isinstance(value, list):
+                    names = [obj for obj in value if isinstance(obj, str)]
+
+                else:
+                    continue
+
+                kinds.add(rule.kind)
+
+                for name in names:
+                    entries.append((rule.kind, rule.role, intern(name.strip('"')), index, intern(trail)))
+
+            if isinstance(value, PDXscript):
+
+                for child in reversed(value._getStatements()):
+                    stack.append((child, depth + 1, keyword, trail + "/" + child._keyword))
+
+    return tuple(entries)
@@ -0,0 +1,354 @@
+'''
+template.py
+
+This module generates many pdx scripts from one script with placeholders,
+like a focus tree written once for every country tag.
+
+Class
+-----------------------------------------------------------------------
+- `Template` : A script with `$NAME$` placeholders compiled once and
+               rendered many times.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import PDXscript, Template
+>>> template = Template(PDXscript("focus_template.txt"), names = ["TAG"])
+>>> template.render_many((f"{out}/{tag}_focus.txt", {"TAG" : tag}) for tag in tags)
+'''
+
+import concurrent.futures
+import re
+import typing
+
+from .pdxscript import PDXscript, Statement
+from .writer import _writeFile
+
+_PLACEHOLDER_PATTERN = re.compile(r'\$([A-Za-z_][A-Za-z0-9_]*)\$')
+
+class Template:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    A script with `$NAME$` placeholders in keywords, values and the items
+    of lists, compiled once into a render plan:
+
+    - The text of the script is made once, with each placeholder turned
+    into a format field, so rendering text is one `str.format_map()` call
+    instead of a walk of the tree.
+    - The Statements with a placeholder are found once, so rendering a
+    PDXscript clones the script (see `PDXscript.clone()`) and only copies
+    those Statements and the blocks above them. Everything else is shared
+    by the rendered scripts.
+
+    A placeholder is replaced by the text of its value, so a value can't
+    add Statements. The script is copied when it's compiled, so changing it
+    afterwards doesn't change the template.
+
+    Function
+    -----------------------------------------------------------------------
+    - `__init__()` : Compile a script into a template.
+    - `get_names()` : Get the names of the placeholders.
+    - `render()` : Get the text of the script with the placeholders replaced.
+    - `render_script()` : Get the script with the placeholders replaced.
+    - `write()` : Write the rendered text to a file.
+    - `render_many()` : Write the rendered text to many files.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> template = Template(PDXscript.loads("$TAG$_focus = { cost = $COST$ }"))
+    >>> template.render_script({"TAG" : "FIN", "COST" : 10})[0].get_keyword()
+    'FIN_focus'
+    >>> print(template.render({"TAG" : "SWE", "COST" : 5}))
+    '''
+
+    def __init__(self, script:'PDXscript', names:typing.Iterable[str] = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Compile a script into a template.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `script` (PDXscript) : the script with the placeholders.
+        - `names` (Iterable[str]) : the names of the placeholders to replace.
+        Any other `$NAME$` is kept as it is, like the parameters of a
+        scripted effect. Default to every `$NAME$` in the script.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        text = script.dumps()
+        self._filter = frozenset(names) if names is not None else None
+        self._names = {name for name in _PLACEHOLDER_PATTERN.findall(text) if self._isReplaced(name)}
+        self._format = self._getFormat(text)
+        self._script = PDXscript.loads(text)
+        self._plan = self._getPlan()
+
+    def get_names(self) -> set[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the names of the placeholders in the script.
+
+        Return
+        -----------------------------------------------------------------------
+        set[str] : the names, without `$`.
+        '''
+
+        return set(self._names)
+
+    def render(self, values:typing.Mapping[str,typing.Any]) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the text of the script with the placeholders replaced, the same
+        as `dumps()` of the rendered script.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `values` (Mapping[str, Any]) : the value of each placeholder by
+        name. A value that isn't str is put as `str()` of it.
+
+        Return
+        -----------------------------------------------------------------------
+        str : the text of the script.
+
+        Raise
+        -----------------------------------------------------------------------
+        KeyError: When a placeholder has no value.
+        '''
+
+        return self._format.format_map(values)
+
+    def render_script(self, values:typing.Mapping[str,typing.Any]) -> 'PDXscript':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the script with the placeholders replaced, as a clone of the
+        compiled script. It can be changed without touching the template or
+        the other rendered scripts.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `values` (Mapping[str, Any]) : the value of each placeholder by
+        name. A value that isn't str is put as `str()` of it.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript : the rendered script.
+
+        Raise
+        -----------------------------------------------------------------------
+        KeyError: When a placeholder has no value.
+        '''
+
+        script = self._script.clone()
+
+        for path, keyword, value, items in self._plan:
+
+            statement = script[path[0]]
+
+            for position in path[1:]:
+                statement = statement.get_value()[position]
+
+            if keyword is not None:
+                statement.set_keyowrd(keyword.format_map(values))
+
+            if value is not None:
+                statement.set_value(value.format_map(values))
+
+            elif items is not None:
+                statement.set_value([item.format_map(values) if isinstance(item, str) else item for item in items])
+
+        return script
+
+    def write(self, filePath:str, values:typing.Mapping[str,typing.Any], stats:'ParseStats' = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Write the rendered text to a file, the same as `write_many()` of the
+        rendered script: a file that already has the same bytes is left
+        alone, and any other file is replaced at once.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `filePath` (str) : the path of the file want to write. Couldn't be
+        the original path of Heart of Iron IV.
+        - `values` (Mapping[str, Any]) : the value of each placeholder by name.
+        - `stats` (ParseStats) : the collector to add the `text` and `write`
+        phases and the size of the file to.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+
+        Raise
+        -----------------------------------------------------------------------
+        ViolatedPathException: When try to write the original game file.
+        KeyError: When a placeholder has no value.
+        '''
+
+        _writeFile(filePath, lambda: self._format.format_map(values), stats)
+
+    def render_many(self,
+                    items:typing.Iterable[tuple[str,typing.Mapping[str,typing.Any]]],
+                    workers:int = 1,
+                    errors:dict[str,Exception] = None,
+                    stats:'ParseStats' = None) -> list[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Write the rendered text to many files. Each file is one
+        `format_map()` call and one write of the encoded bytes, so the cost
+        is about the size of the output. With several workers, the files are
+        written by a thread pool, so waiting for the disk overlaps.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `items` (Iterable[tuple[str, Mapping]]) : the path and the values of
+        each file.
+        - `workers` (int) : the number of threads. Files are written in this
+        thread when it's 1.
+        - `errors` (dict) : if given, the exception of each failed file is put
+        into it by path instead of being raised.
+        - `stats` (ParseStats) : the collector to add the record of each
+        written file to.
+
+        Return
+        -----------------------------------------------------------------------
+        list[str] : the paths written, in the order of `items`.
+
+        Raise
+        -----------------------------------------------------------------------
+        Any exception of a failed file, like ViolatedPathException or
+        KeyError, if `errors` isn't given. The other files are still written.
+
+        Usage
+        -----------------------------------------------------------------------
+        >>> items = [(f"{out}/{tag}.txt", {"TAG" : tag, "COST" : cost}) for tag, cost in costs.items()]
+        >>> template.render_many(items, workers = 4)
+        '''
+
+        items = list(items)
+        failed:dict[str,Exception] = {}
+
+        if workers is None or workers > 1:
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+                futures = {executor.submit(self.write, path, values, stats) : path for path, values in items}
+
+                for future in concurrent.futures.as_completed(futures):
+
+                    if future.exception() is not None:
+                        failed[futures[future]] = future.exception()
+
+        else:
+
+            for path, values in items:
+
+                try:
+                    self.write(path, values, stats)
+
+                except Exception as error:
+                    failed[path] = error
+
+        if failed and errors is None:
+            raise failed[min(failed)]
+
+        if errors is not None:
+            errors.update(failed)
+
+        return [path for path, _ in items if not path in failed]
+
+    def _getPlan(self) -> list[tuple[tuple[int,...],typing.Optional[str],typing.Optional[str],typing.Optional[list]]]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Find the Statements of the compiled script with a
+        placeholder.
+
+        Return
+        -----------------------------------------------------------------------
+        list[tuple] : `(path, keyword, value, items)` of each Statement. The
+        path is the position at each level. The others are the format
+        strings of the keyword, of a text value and of the items of a list
+        value, or None without placeholder.
+        '''
+
+        plan = []
+        stack = [((), self._script._getStatements())]
+
+        while stack:
+
+            prefix, statements = stack.pop()
+
+            for position, statement in enumerate(statements):
+
+                path = prefix + (position,)
+                keyword = self._getField(statement._keyword)
+                value = statement.get_value()
+                text = None
+                items = None
+
+                if isinstance(value, str):
+                    text = self._getField(value)
+
+                elif isinstance(value, PDXscript):
+                    stack.append((path, value._getStatements()))
+
+                elif isinstance(value, list) and value and isinstance(value[0], Statement):
+                    stack.append((path, value))
+
+                elif isinstance(value, list):
+
+                    if any(self._getField(item) is not None for item in value):
+                        items = [self._getFormat(item) if isinstance(item, str) else item for item in value]
+
+                if keyword is not None or text is not None or items is not None:
+                    plan.append((path, keyword, text, items))
+
+        return plan
+
+    def _getFormat(self, text:str) -> str:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the format string of a text: the brackets
+        escaped and each placeholder to replace turned into a format field.
+        '''
+
+        def getField(match:re.Match) -> str:
+
+            if not self._isReplaced(match.group(1)):
+                return match.group(0)
+
+            return "{" + match.group(1) + "}"
+
+        return _PLACEHOLDER_PATTERN.sub(getField, text.replace("{", "{{").replace("}", "}}"))
+
+    def _isReplaced(self, name:str) -> bool:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Check whether a placeholder name is one to replace.
+        '''
+
+        return self._filter is None or name in self._filter
+
+    def _getField(self, text:typing.Any) -> typing.Optional[str]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Get the format string of a keyword or value, or None
+        if it has no placeholder to replace.
+        '''
+
+        if not isinstance(text, str) or not "$" in text:
+            return None
+
+        if not any(self._isReplaced(name) for name in _PLACEHOLDER_PATTERN.findall(text)):
+            return None
+
+        return self._getFormat(text)
@@ -0,0 +1,466 @@
+'''
+workspace.py
+
+This module keeps the parsed scripts of a directory in memory and up to
+date while the files are edited, like for an editor or a validation
+service.
+
+Class
+-----------------------------------------------------------------------
+- `Workspace` : The scripts of a directory, parsed again as the files
+                change.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import Workspace
+>>> workspace = Workspace(mod_root, "common/**/*.txt")
+>>> workspace.subscribe(lambda event: print(sorted(event["changed"])))
+>>> workspace.start()
+>>> workspace.get("common/national_focus/finland.txt").find("focus_tree")
+>>> workspace.stop()
+'''
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import typing
+
+from .pdxscript import PDXscript
+from .loader import _getPaths
+
+# Changes of a watched directory that wake the watching thread up. A file
+# is only reported once it's closed after writing.
+_INOTIFY_MASK = 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+
+Event = dict[str,typing.Any]
+
+class Workspace:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    The scripts of the files under a directory matching a glob pattern,
+    read once and parsed again as the files change. Each check compares
+    the modification time and size of every file with the last ones, so
+    only the added and changed files are read, and a changed file only
+    parses the blocks that changed (see `PDXscript.reload()`).
+
+    The checks run when `poll()` is called, or in a thread started by
+    `start()`. The thread checks every `interval` seconds, and at once when
+    a file is written on Linux, where it's woken up by inotify.
+
+    The scripts are a snapshot replaced as a whole after each check, so
+    `get_scripts()` never mixes files from before and after a change. A
+    changed file gets a new PDXscript object, and the one of the last
+    snapshot stays as it was. Statements out of the changed blocks are the
+    same objects in both, so don't change the scripts of a workspace.
+
+    A file that fails to parse keeps its last script, and the exception is
+    kept until the file is parsed again.
+
+    Function
+    -----------------------------------------------------------------------
+    - `__init__()` : Read every matching file under a directory.
+    - `get()` : Get the script of a file.
+    - `get_scripts()` : Get the scripts of every file.
+    - `get_errors()` : Get the exceptions of the files that failed to parse.
+    - `subscribe()` : Call a function with every change.
+    - `unsubscribe()` : Stop calling a function with the changes.
+    - `poll()` : Check the files for changes now.
+    - `start()` : Check the files for changes in a thread.
+    - `stop()` : Stop the thread.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> workspace = Workspace(mod_root, "events/*.txt", interval = 0.5)
+    >>> def onChange(event):
+    >>>     for path, script in event["changed"].items():
+    >>>         validate(path, script)
+    >>> workspace.subscribe(onChange)
+    >>> workspace.start()
+    '''
+
+    def __init__(self,
+                 root:str,
+                 pattern:str = "**/*.txt",
+                 interval:float = 1.0,
+                 inotify:bool = True,
+                 stats:'ParseStats' = None) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Read every file under `root` matching the glob `pattern`. A file
+        that fails to parse is kept in `get_errors()` instead of raising.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `root` (str) : the directory to watch.
+        - `pattern` (str) : the glob pattern relative to root.
+        - `interval` (float) : the seconds between two checks of the thread.
+        - `inotify` (bool) : wake the thread up when a file is written, on
+        Linux. The files are still checked every `interval`.
+        - `stats` (ParseStats) : the collector to add the record of each file
+        read to.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self._root = root
+        self._pattern = pattern
+        self._interval = interval
+        self._inotify = inotify
+        self._stats = stats
+        self._sources:dict[str,'PDXscript'] = {}
+        self._stamps:dict[str,tuple[int,int]] = {}
+        self._scripts:dict[str,'PDXscript'] = {}
+        self._errors:dict[str,Exception] = {}
+        self._subscribers:list[typing.Callable[[Event],None]] = []
+        self._lock = threading.Lock()
+        self._thread:typing.Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._failure:typing.Optional[BaseException] = None
+
+        self._update()
+
+    def get(self, path:str) -> typing.Optional['PDXscript']:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the script of a file.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `path` (str) : the path of the file relative to the root.
+
+        Return
+        -----------------------------------------------------------------------
+        PDXscript | None : the script, or None if there's no such file or it
+        never parsed.
+        '''
+
+        return self._scripts.get(path.replace("\\", "/"))
+
+    def get_scripts(self) -> dict[str,'PDXscript']:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the scripts of every file, all from the same check.
+
+        Return
+        -----------------------------------------------------------------------
+        dict[str, PDXscript] : the scripts by relative path with `/`
+        separators, in path order.
+        '''
+
+        return dict(self._scripts)
+
+    def get_errors(self) -> dict[str,Exception]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Get the exceptions of the files that failed to parse the last time
+        they were read.
+
+        Return
+        -----------------------------------------------------------------------
+        dict[str, Exception] : the exceptions by relative path.
+        '''
+
+        return dict(self._errors)
+
+    def subscribe(self, callback:typing.Callable[[Event],None]) -> typing.Callable[[Event],None]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Call a function with every change found, in the thread that found
+        it. The change is a dict of:
+
+        - `added` (dict[str, PDXscript]) : the scripts of the new files.
+        - `changed` (dict[str, PDXscript]) : the new scripts of the changed files.
+        - `removed` (list[str]) : the paths of the removed files.
+        - `failed` (dict[str, Exception]) : the exceptions of the files that
+        failed to parse.
+
+        The snapshot is already replaced when it's called.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `callback` (Callable[[dict], None]) : the function to call.
+
+        Return
+        -----------------------------------------------------------------------
+        Callable : the function, so it can be used as a decorator.
+        '''
+
+        self._subscribers.append(callback)
+
+        return callback
+
+    def unsubscribe(self, callback:typing.Callable[[Event],None]) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Stop calling a function with the changes.
+
+        Parameters
+        -----------------------------------------------------------------------
+        - `callback` (Callable[[dict], None]) : the function given to
+        `subscribe()`.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+        '''
+
+        self._subscribers.remove(callback)
+
+    def poll(self) -> typing.Optional[Event]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Check the files for changes now, in this thread, and call the
+        subscribers with the change if there's one.
+
+        Return
+        -----------------------------------------------------------------------
+        dict | None : the change, see `subscribe()`, or None if nothing
+        changed.
+
+        Raise
+        -----------------------------------------------------------------------
+        Any exception of a subscriber, after the snapshot is replaced.
+        '''
+
+        with self._lock:
+            event = self._update()
+
+        if event is not None:
+
+            for callback in list(self._subscribers):
+                callback(event)
+
+        return event
+
+    def start(self) -> 'Workspace':
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Check the files for changes in a daemon thread until `stop()`.
+
+        Return
+        -----------------------------------------------------------------------
+        Workspace : this workspace.
+        '''
+
+        if self._thread is not None:
+            return self
+
+        self._stopping.clear()
+        self._failure = None
+        self._thread = threading.Thread(target = self._run, name = "pdxscript-workspace", daemon = True)
+        self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Stop the thread started by `start()` and wait for it to end. It ends
+        after the check it's in, if any. Between checks it ends at once
+        without inotify, and with inotify when it's woken up by a change or
+        `interval` is over.
+
+        Return
+        -----------------------------------------------------------------------
+        There's no return of this method.
+
+        Raise
+        -----------------------------------------------------------------------
+        The exception that stopped the thread, like one of a subscriber.
+        '''
+
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+        if self._failure is not None:
+            failure, self._failure = self._failure, None
+            raise failure
+
+    def _run(self) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Check the files every `interval`, or when inotify
+        wakes the thread up, until `stop()`.
+        '''
+
+        watcher = None
+
+        if self._inotify and sys.platform.startswith("linux"):
+
+            try:
+                watcher = _Inotify(self._root)
+
+            except (OSError, AttributeError):
+                watcher = None
+
+        try:
+            while not self._stopping.is_set():
+
+                if watcher is None:
+                    self._stopping.wait(self._interval)
+
+                elif watcher.wait(self._interval):
+                    watcher.watch(self._root)
+
+                if not self._stopping.is_set():
+                    self.poll()
+
+        except BaseException as error:
+            self._failure = error
+
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    def _update(self) -> typing.Optional[Event]:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Internal method. Read the added and changed files and replace the
+        snapshot.
+
+        Return
+        -----------------------------------------------------------------------
+        dict | None : the change, or None if nothing changed.
+        '''
+
+        paths = {os.path.relpath(path, self._root).replace(os.sep, "/") : path for path in _getPaths(self._root, self._pattern)}
+        scripts = dict(self._scripts)
+        errors = dict(self._errors)
+        added:dict[str,'PDXscript'] = {}
+        changed:dict[str,'PDXscript'] = {}
+        failed:dict[str,Exception] = {}
+        removed = sorted(self._stamps.keys() - paths.keys())
+
+        for relative in removed:
+            del self._stamps[relative]
+            self._sources.pop(relative, None)
+            scripts.pop(relative, None)
+            errors.pop(relative, None)
+
+        for relative, path in paths.items():
+
+            try:
+                status = os.stat(path)
+
+            except FileNotFoundError:
+                continue
+
+            stamp = (status.st_mtime_ns, status.st_size)
+
+            if self._stamps.get(relative) == stamp:
+                continue
+
+            self._stamps[relative] = stamp
+            source = self._sources.get(relative)
+
+            try:
+                if source is None:
+                    source = self._sources[relative] = PDXscript(path, stats = self._stats, incremental = True)
+
+                elif not source.reload(stats = self._stats):
+                    continue
+
+            except Exception as error:
+                failed[relative] = errors[relative] = error
+                continue
+
+            errors.pop(relative, None)
+
+            script = PDXscript()
+            script._element = source._element
+
+            if relative in scripts:
+                changed[relative] = script
+            else:
+                added[relative] = script
+
+            scripts[relative] = script
+
+        self._scripts = dict(sorted(scripts.items()))
+        self._errors = errors
+
+        if not added and not changed and not removed and not failed:
+            return None
+
+        return {"added" : added, "changed" : changed, "removed" : removed, "failed" : failed}
+
+class _Inotify:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal class. An inotify instance watching every directory under a
+    root, through the C library, used to wake the watching thread up.
+    '''
+
+    def __init__(self, root:str) -> None:
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno = True)
+
+        self._addWatch = libc.inotify_add_watch
+        self._addWatch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1() failed")
+
+        self.watch(root)
+
+    def watch(self, root:str) -> None:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Watch every directory under the root. A directory already watched
+        keeps its watch.
+        '''
+
+        for directory, _, _ in os.walk(root):
+            self._addWatch(self._fd, os.fsencode(directory), _INOTIFY_MASK)
+
+    def wait(self, timeout:float) -> bool:
+        '''
+        Description
+        -----------------------------------------------------------------------
+        Wait for a change and drop the pending events.
+
+        Return
+        -----------------------------------------------------------------------
+        bool : whether something changed before the timeout.
+        '''
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+
+        if not readable:
+            return False
+
+        try:
+            while os.read(self._fd, 1 << 16):
+                pass
+
+        except BlockingIOError:
+            pass
+
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
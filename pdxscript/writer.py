@@ -0,0 +1,209 @@
+'''
+writer.py
+
+This module writes many pdx script files at once, skipping the files
+whose content wouldn't change.
+
+Function
+-----------------------------------------------------------------------
+- `write_many` : Write many scripts with a thread pool, replacing only the
+                 changed files.
+
+Usage
+-----------------------------------------------------------------------
+>>> from pdxscript import write_many
+>>> summary = write_many({f"{out}/{tag}.txt" : script for tag, script in scripts.items()}, workers = 8)
+>>> print(len(summary["written"]), "written,", len(summary["skipped"]), "unchanged")
+'''
+
+import concurrent.futures
+import os
+import stat
+import typing
+
+from .pdxscript import PDXscript
+
+# Flags of the temporary file. Made with mode 0o666 like open() does, so
+# the kernel applies the umask to a new file.
+_TEMP_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+
+def write_many(scripts:typing.Mapping[str,'PDXscript'],
+               workers:int = None,
+               errors:dict[str,Exception] = None,
+               stats:'ParseStats' = None) -> dict[str,typing.Any]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Write many scripts, the same as `write()` of each, in a thread pool.
+    A file that already has the same bytes is left alone, so its
+    modification time and whatever depends on it don't change. Any other
+    file is written to a temporary file in the same directory, then
+    renamed over the old one, so a reader never sees half a file and a
+    failed write leaves the old file as it was.
+
+    The text is made under the GIL, so the threads mostly overlap reading
+    the old files and writing the new ones.
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `scripts` (Mapping[str, PDXscript]) : the script to write to each
+    path. Couldn't be the original path of Heart of Iron IV.
+    - `workers` (int) : the number of threads. Default to the thread pool
+    default. Files are written in this thread when it's 1.
+    - `errors` (dict) : if given, the exception of each failed file is put
+    into it by path instead of being raised.
+    - `stats` (ParseStats) : the collector to add the record of each
+    written or skipped file to, with the `text` and `write` phases.
+
+    Return
+    -----------------------------------------------------------------------
+    dict : `written` and `skipped`, the lists of paths in the order of
+    `scripts`, and `failed`, the exception of each failed file by path.
+
+    Raise
+    -----------------------------------------------------------------------
+    Any exception of a failed file, like ViolatedPathException, if `errors`
+    isn't given. The other files are still written.
+
+    Usage
+    -----------------------------------------------------------------------
+    >>> failed = {}
+    >>> summary = write_many(scripts, errors = failed)
+    >>> for path, error in summary["failed"].items():
+    >>>     print(path, error)
+    '''
+
+    items = list(scripts.items())
+    written:dict[str,bool] = {}
+    failed:dict[str,Exception] = {}
+
+    if workers is None or workers > 1:
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+            futures = {executor.submit(_writeFile, path, script.dumps, stats, script) : path for path, script in items}
+
+            for future in concurrent.futures.as_completed(futures):
+
+                if future.exception() is not None:
+                    failed[futures[future]] = future.exception()
+                else:
+                    written[futures[future]] = future.result()
+
+    else:
+
+        for path, script in items:
+
+            try:
+                written[path] = _writeFile(path, script.dumps, stats, script)
+
+            except Exception as error:
+                failed[path] = error
+
+    if failed and errors is None:
+        raise failed[min(failed)]
+
+    if errors is not None:
+        errors.update(failed)
+
+    return {"written" : [path for path, _ in items if written.get(path) is True],
+            "skipped" : [path for path, _ in items if written.get(path) is False],
+            "failed" : {path : failed[path] for path, _ in items if path in failed}}
+
+def _writeFile(path:str,
+               render:typing.Callable[[],str],
+               stats:'ParseStats' = None,
+               script:'PDXscript' = None) -> bool:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Write the rendered text unless the file has the same
+    bytes. The text goes to a temporary file in the same directory that is
+    renamed over the old file. It keeps the permissions of the old file, or
+    gets the ones a new file gets from open().
+
+    Parameters
+    -----------------------------------------------------------------------
+    - `path` (str) : the path of the file. Couldn't be the original path of
+    Heart of Iron IV.
+    - `render` (Callable[[], str]) : get the text of the file.
+    - `stats` (ParseStats) : the collector to add the `text` and `write`
+    phases and the size of the file to.
+    - `script` (PDXscript) : the written script, counted by `stats`.
+
+    Return
+    -----------------------------------------------------------------------
+    bool : whether the file was written.
+    '''
+
+    PDXscript._checkPath(path)
+
+    timer = stats._start("write", path) if stats is not None else None
+    data = render().encode("utf-8-sig")
+
+    if timer is not None:
+        timer.lap("text")
+
+    try:
+        status = os.stat(path)
+
+    except FileNotFoundError:
+        status = None
+
+    changed = status is None or status.st_size != len(data) or _readFile(path) != data
+
+    if changed:
+        temp_path, descriptor = _openTemp(path)
+
+        try:
+            with os.fdopen(descriptor, "wb") as tempFile:
+                tempFile.write(data)
+
+            if status is not None:
+                os.chmod(temp_path, stat.S_IMODE(status.st_mode))
+
+            os.replace(temp_path, path)
+
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    if timer is not None:
+        timer.lap("write")
+        timer.count(bytes = len(data))
+        timer.stop(script)
+
+    return changed
+
+def _openTemp(path:str) -> tuple[str,int]:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Create a new temporary file next to a path, trying
+    another name while one is taken.
+
+    Return
+    -----------------------------------------------------------------------
+    tuple[str, int] : the path and the descriptor of the temporary file.
+    '''
+
+    while True:
+        temp_path = f"{path}.{os.urandom(4).hex()}.tmp"
+
+        try:
+            return temp_path, os.open(temp_path, _TEMP_FLAGS, 0o666)
+
+        except FileExistsError:
+            continue
+
+def _readFile(path:str) -> bytes:
+    '''
+    Description
+    -----------------------------------------------------------------------
+    Internal function. Get the bytes of a file.
+    '''
+
+    with open(path, "rb") as file:
+        return file.read()
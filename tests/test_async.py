@@ -0,0 +1,157 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import threading
+
+import pytest
+
+from pdxscript import PDXscript, ParseStats, aiter_directory
+
+def _write(tmp_path, count:int, broken:tuple[int,...] = ()) -> list[str]:
+    paths = []
+
+    for index in range(count):
+        path = tmp_path / f"{index:02}.txt"
+        path.write_text("a = { b = 1 } }" if index in broken else f"file = {index}\n", encoding = "utf-8")
+        paths.append(str(path))
+
+    return paths
+
+@contextlib.contextmanager
+def _getBlocked():
+    # A single worker held by a task until the block ends, so everything
+    # submitted meanwhile waits in the queue of the pool.
+    gate = threading.Event()
+
+    with concurrent.futures.ThreadPoolExecutor(1) as pool:
+        pool.submit(gate.wait)
+
+        try:
+            yield pool
+
+        finally:
+            gate.set()
+
+@pytest.mark.parametrize("executor", [None, concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor])
+def test_aload(tmp_path, executor):
+
+    good, bad = _write(tmp_path, 2, broken = (1,))
+
+    async def _run(pool):
+        script = await PDXscript.aload(good, pool)
+
+        assert script.dumps() == PDXscript(good).dumps()
+
+        with pytest.raises(IndexError):
+            await PDXscript.aload(bad, pool)
+
+    if executor is None:
+        asyncio.run(_run(None))
+        return
+
+    with executor(2) as pool:
+        asyncio.run(_run(pool))
+
+@pytest.mark.parametrize("executor", [None, concurrent.futures.ProcessPoolExecutor])
+def test_awrite(tmp_path, executor):
+
+    script = PDXscript.loads("a = { b = 1 }")
+    path = tmp_path / "out.txt"
+
+    async def _run(pool):
+        await script.awrite(str(path), pool)
+
+        with pytest.raises(IsADirectoryError):
+            await script.awrite(str(tmp_path), pool)
+
+    if executor is None:
+        asyncio.run(_run(None))
+
+    else:
+        with executor(1) as pool:
+            asyncio.run(_run(pool))
+
+    assert PDXscript(str(path)).dumps() == script.dumps()
+
+def test_aload_cancelled(tmp_path):
+
+    path, = _write(tmp_path, 1)
+    records = []
+    stats = ParseStats(records.append)
+
+    async def _run(pool):
+        task = asyncio.ensure_future(PDXscript.aload(path, pool, stats = stats))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        # A bound on the wait, so loads left running fail instead of hanging.
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 5)
+
+    with _getBlocked() as pool:
+        asyncio.run(_run(pool))
+
+    # The load was still queued, so it never ran.
+    assert records == []
+
+def test_aiter_directory_failed(tmp_path):
+
+    paths = _write(tmp_path, 6, broken = (2, 4))
+
+    async def _collect(errors):
+        return {path : script.dumps() async for path, script in aiter_directory(str(tmp_path), "*.txt", limit = 2, errors = errors)}
+
+    errors = {}
+    scripts = asyncio.run(_collect(errors))
+
+    assert sorted(scripts) == [paths[0], paths[1], paths[3], paths[5]]
+    assert scripts[paths[3]] == PDXscript(paths[3]).dumps()
+    assert sorted(errors) == [paths[2], paths[4]]
+    assert all(isinstance(error, IndexError) for error in errors.values())
+
+    with pytest.raises(IndexError):
+        asyncio.run(_collect(None))
+
+@pytest.mark.parametrize("leave", ["break", "cancel"])
+def test_aiter_directory_cancelled(tmp_path, leave):
+
+    paths = _write(tmp_path, 8)
+    records = []
+    stats = ParseStats(lambda record: records.append(record["path"]))
+
+    async def _iterate(pool, started):
+        async with contextlib.aclosing(aiter_directory(str(tmp_path), "*.txt", pool, limit = 3, stats = stats)) as scripts:
+            started.set()
+
+            async for path, _ in scripts:
+                if leave == "break":
+                    break
+
+    async def _run(pool):
+        started = asyncio.Event()
+        task = asyncio.ensure_future(_iterate(pool, started))
+
+        if leave == "cancel":
+            await started.wait()
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(task, 5)
+
+        else:
+            await task
+
+    if leave == "break":
+        # A free pool so the first file comes, then the rest are cancelled.
+        with concurrent.futures.ThreadPoolExecutor(1) as pool:
+            asyncio.run(_run(pool))
+
+        assert 1 <= len(records) <= 3
+        assert set(records) <= set(paths[:3])
+
+    else:
+        with _getBlocked() as pool:
+            asyncio.run(_run(pool))
+
+        assert records == []
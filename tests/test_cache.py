@@ -0,0 +1,142 @@
+import os
+
+import pytest
+
+from pdxscript import PDXscript, ParseCache
+from pdxscript import cache as cache_module
+
+TEXT = "focus_tree = { id = tree focus = { id = FIN_a cost = 10 } }\ncountry = FIN\n"
+
+def _write(path, text:str, mtime_ns:int = None) -> str:
+    path.write_text(text, encoding = "utf-8")
+
+    if mtime_ns is not None:
+        os.utime(path, ns = (mtime_ns, mtime_ns))
+
+    return str(path)
+
+def test_round_trip(tmp_path):
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _write(tmp_path / "a.txt", TEXT)
+
+    assert cache.get(path) is None
+
+    script = cache.load(path)
+    cached = cache.get(path)
+
+    assert cached is not None
+    assert cached.dumps() == script.dumps() == PDXscript(path).dumps()
+    assert cached.get_hash() == script.get_hash()
+
+def test_stale(tmp_path):
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _write(tmp_path / "a.txt", TEXT, 10 ** 18)
+    cache.load(path)
+
+    # Another mtime.
+    os.utime(path, ns = (10 ** 18 + 1, 10 ** 18 + 1))
+
+    assert cache.get(path) is None
+
+    # Another size with the same mtime.
+    cache.load(path)
+    _write(tmp_path / "a.txt", TEXT + "added = yes\n", 10 ** 18 + 1)
+
+    assert cache.get(path) is None
+    assert cache.load(path).find("added") is not None
+
+def test_verify_hash(tmp_path):
+
+    path = _write(tmp_path / "a.txt", TEXT, 10 ** 18)
+    plain = ParseCache(str(tmp_path / "plain"))
+    verified = ParseCache(str(tmp_path / "verified"), verify_hash = True)
+    plain.load(path)
+    verified.load(path)
+
+    # The same size and mtime: only the hash tells.
+    _write(tmp_path / "a.txt", TEXT.replace("FIN", "SWE"), 10 ** 18)
+
+    assert plain.get(path).dumps() == PDXscript.loads(TEXT).dumps()
+    assert verified.get(path) is None
+    assert verified.load(path).find("country").get_value() == "SWE"
+    assert verified.get(path) is not None
+
+def test_version(tmp_path, monkeypatch):
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _write(tmp_path / "a.txt", TEXT)
+    cache.load(path)
+    stamp = cache_module._STAMP
+
+    monkeypatch.setattr(cache_module, "_STAMP", (cache_module.CACHE_VERSION + 1,) + stamp[1:])
+
+    assert cache.get(path) is None
+
+    cache.load(path)
+
+    assert cache.get(path) is not None
+
+    monkeypatch.setattr(cache_module, "_STAMP", stamp)
+
+    assert cache.get(path) is None
+
+@pytest.mark.parametrize("corrupt", ["truncated header", "truncated tree", "garbage", "empty", "not a tuple"])
+def test_corrupt(tmp_path, corrupt):
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _write(tmp_path / "a.txt", TEXT)
+    cache.load(path)
+    entry = cache._getEntryPath(path)
+
+    with open(entry, "rb") as entryFile:
+        data = entryFile.read()
+
+    size = int.from_bytes(data[:4], "little")
+    data = {
+        "truncated header" : data[:4 + size // 2],
+        "truncated tree" : data[:4 + size + (len(data) - 4 - size) // 2],
+        "garbage" : os.urandom(len(data)),
+        "empty" : b"",
+        "not a tuple" : (5).to_bytes(4, "little") + b"i\x01\x00\x00\x00" + data[4 + size:],
+    }[corrupt]
+
+    with open(entry, "wb") as entryFile:
+        entryFile.write(data)
+
+    assert cache.get(path) is None
+    assert cache.load(path).dumps() == PDXscript(path).dumps()
+    assert cache.get(path) is not None
+
+def test_eviction(tmp_path):
+
+    paths = [_write(tmp_path / f"{index}.txt", TEXT * 20) for index in range(4)]
+    probe = ParseCache(str(tmp_path / "probe"))
+    probe.load(paths[0])
+    size = os.path.getsize(probe._getEntryPath(paths[0]))
+
+    # Room for two entries and a half.
+    cache = ParseCache(str(tmp_path / "cache"), max_bytes = size * 5 // 2)
+
+    for time, path in enumerate(paths[:2]):
+        cache.load(path)
+        os.utime(cache._getEntryPath(path), ns = (10 ** 18 + time, 10 ** 18 + time))
+
+    # The first one is used again, so the second is the least recently used.
+    assert cache.get(paths[0]) is not None
+
+    cache.load(paths[2])
+
+    assert cache.get(paths[0]) is not None
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[2]) is not None
+    assert sum(entry_size for entry_size, _, _ in cache._getEntries()) <= size * 5 // 2
+
+    # An entry bigger than the whole cache is kept as the newest one.
+    small = ParseCache(str(tmp_path / "small"), max_bytes = size // 2)
+    small.load(paths[0])
+    small.load(paths[3])
+
+    assert small.get(paths[0]) is None
+    assert small.get(paths[3]) is not None
@@ -0,0 +1,137 @@
+import pytest
+
+from pdxscript import PDXscript, Statement
+
+SOURCE = """
+focus_tree = {
+    id = tree
+    focus = { id = a cost = 1 reward = { add = { value = 1 } } }
+    focus = { id = b cost = 2 reward = { add = { value = 2 } } }
+}
+other = yes
+"""
+
+PATHS = ["focus_tree/focus", "focus_tree/focus[id=a]", "focus_tree/focus[cost=5]", "*/*/reward/add/value", "other"]
+
+def _check(script:PDXscript, text:str) -> None:
+    # The script reads the same as a fresh parse of the text, including the
+    # kept hashes and filter indexes.
+    fresh = PDXscript.loads(text)
+
+    assert script.dumps() == fresh.dumps()
+    assert script.get_hash() == fresh.get_hash()
+
+    for path in PATHS:
+        assert [statement.get_hash() for statement in script.select(path)] == [statement.get_hash() for statement in fresh.select(path)], path
+
+def _warm(*scripts:PDXscript) -> None:
+    for script in scripts:
+        script.get_hash()
+
+        for path in PATHS:
+            script.select(path)
+
+@pytest.mark.parametrize("edited", ["clone", "original"])
+def test_edit_one_side(edited):
+
+    original = PDXscript.loads(SOURCE)
+    clone = original.clone()
+    _warm(original, clone)
+    target, other = (clone, original) if edited == "clone" else (original, clone)
+
+    target.select("focus_tree/focus[id=a]/cost")[0].set_value("5")
+
+    _check(target, SOURCE.replace("cost = 1", "cost = 5"))
+    _check(other, SOURCE)
+
+@pytest.mark.parametrize("edited", ["clone", "original"])
+def test_nested_edit(edited):
+
+    original = PDXscript.loads(SOURCE)
+    clone = original.clone()
+    _warm(original, clone)
+    target, other = (clone, original) if edited == "clone" else (original, clone)
+
+    target.select("focus_tree/focus[id=b]/reward/add/value")[0].set_value("7")
+    target.find("focus_tree").get_value().find_all("focus")[0].get_value().find("reward").set_keyowrd("effect")
+
+    text = SOURCE.replace("value = 2", "value = 7").replace("reward = { add = { value = 1", "effect = { add = { value = 1")
+    _check(target, text)
+    _check(other, SOURCE)
+
+def test_clone_of_clone():
+
+    original = PDXscript.loads(SOURCE)
+    first = original.clone()
+    second = first.clone()
+    _warm(original, first, second)
+
+    first.select("focus_tree/focus[id=a]/reward/add/value")[0].set_value("3")
+    second.find("other").set_value("no")
+
+    _check(original, SOURCE)
+    _check(first, SOURCE.replace("value = 1", "value = 3"))
+    _check(second, SOURCE.replace("other = yes", "other = no"))
+
+    third = first.clone()
+    third.select("focus_tree/id")[0].set_value("copy")
+
+    _check(first, SOURCE.replace("value = 1", "value = 3"))
+    _check(third, SOURCE.replace("value = 1", "value = 3").replace("id = tree", "id = copy"))
+
+def test_remove_and_append():
+
+    original = PDXscript.loads(SOURCE)
+    clone = original.clone()
+    _warm(original, clone)
+    tree = clone.find("focus_tree").get_value()
+
+    tree.remove(tree.find_all("focus")[0])
+    tree.append(Statement("focus", PDXscript.loads("id = c cost = 5")))
+    original.append(Statement("added", "yes"))
+
+    head, _, tail = SOURCE.partition("    focus = { id = a")
+    tail = tail.partition("\n")[2]
+    text = head + tail.replace("}\nother", "focus = { id = c cost = 5 }\n}\nother")
+    _check(clone, text)
+    _check(original, SOURCE + "added = yes\n")
+
+    original.remove(original.find("other"))
+
+    _check(clone, text)
+    _check(original, SOURCE.replace("other = yes\n", "") + "added = yes\n")
+
+def test_handle_before_clone():
+
+    original = PDXscript.loads(SOURCE)
+    handle = original.select("focus_tree/focus[id=a]/cost")[0]
+    clone = original.clone()
+    original.get_hash()
+    clone.get_hash()
+
+    # Got before cloning and not handed out since, so it's shared by both.
+    handle.set_value("5")
+
+    for script in (original, clone):
+        assert script.dumps() == PDXscript.loads(SOURCE.replace("cost = 1", "cost = 5")).dumps()
+        assert script.get_hash() == PDXscript.loads(SOURCE.replace("cost = 1", "cost = 5")).get_hash()
+
+    # Got again, the original has its own copy and the handle is only held
+    # by the clone.
+    original.select("focus_tree/focus[id=a]/cost")[0].set_value("6")
+    handle.set_value("8")
+
+    _check(original, SOURCE.replace("cost = 1", "cost = 6"))
+    _check(clone, SOURCE.replace("cost = 1", "cost = 8"))
+
+def test_edit_every_child():
+
+    original = PDXscript.loads("\n".join(f"key_{index} = {index}" for index in range(200)))
+    clone = original.clone()
+    _warm(original, clone)
+
+    for index in range(0, 200, 2):
+        clone[index].set_value("x")
+
+    _check(clone, "\n".join(f"key_{index} = {'x' if index % 2 == 0 else index}" for index in range(200)))
+    _check(original, "\n".join(f"key_{index} = {index}" for index in range(200)))
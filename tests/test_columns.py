@@ -0,0 +1,67 @@
+import array
+import datetime
+import math
+
+import pytest
+
+from pdxscript import PDXscript, to_columns
+
+SCRIPTS = {
+    "a.txt" : PDXscript.loads("id = 1 cost = 10 ai = yes start = 1936.1.1 tag = FIN"),
+    "b.txt" : PDXscript.loads("id = 2 cost = 2.5 ai = no start = 1939.9.1.12"),
+}
+
+COLUMNS = ["id", "cost", "ai", "start", "tag"]
+
+def test_get_value_typed():
+
+    script = PDXscript.loads("cost = 10 start = 1936.1.1")
+
+    assert script[0].get_value(typed = True) == 10
+    assert script[1].get_value(typed = True) == datetime.date(1936, 1, 1)
+
+def test_to_columns_without_numpy():
+
+    table = to_columns(SCRIPTS, COLUMNS, use_numpy = False)
+
+    assert table["file"] == ["a.txt", "b.txt"]
+    assert table["id"] == array.array("q", [1, 2])
+    assert table["cost"] == array.array("d", [10.0, 2.5])
+    assert table["ai"] == array.array("b", [True, False])
+    assert table["start"] == [datetime.date(1936, 1, 1), datetime.datetime(1939, 9, 1, 12)]
+    assert table["tag"] == ["FIN", None]
+
+def test_to_columns_with_numpy():
+
+    numpy = pytest.importorskip("numpy")
+
+    table = to_columns(SCRIPTS, COLUMNS, use_numpy = True)
+
+    assert table["file"].dtype == object
+    assert table["file"].tolist() == ["a.txt", "b.txt"]
+    assert table["id"].dtype == numpy.int64
+    assert table["id"].tolist() == [1, 2]
+    assert table["cost"].dtype == numpy.float64
+    assert table["cost"].tolist() == [10.0, 2.5]
+    assert table["ai"].dtype == numpy.bool_
+    assert table["ai"].tolist() == [True, False]
+    assert table["start"].dtype == numpy.dtype("datetime64[h]")
+    assert table["start"].tolist() == [datetime.datetime(1936, 1, 1), datetime.datetime(1939, 9, 1, 12)]
+    assert table["tag"].dtype == object
+    assert table["tag"].tolist() == ["FIN", None]
+
+def test_to_columns_missing_with_numpy():
+
+    numpy = pytest.importorskip("numpy")
+
+    table = to_columns(SCRIPTS.values(), ["tag", "start", "missing"], use_numpy = True)
+
+    assert "file" not in table
+    assert table["missing"].dtype == numpy.float64
+    assert all(math.isnan(value) for value in table["missing"])
+
+    table = to_columns([SCRIPTS["a.txt"], PDXscript.loads("id = 3")], {"start" : "start", "id" : "id"}, use_numpy = True)
+
+    assert table["start"].dtype == numpy.dtype("datetime64[D]")
+    assert numpy.isnat(table["start"][1])
+    assert table["id"].tolist() == [1, 3]
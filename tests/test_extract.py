@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks.corpus import generate
+from pdxscript import PDXscript
+
+TRICKY = """
+# A comment with a } and a { in it
+countries = {
+    FIN = {
+        name = "Suomi { not a block"
+        capital = 111 # closing } in a comment
+        politics = { ruling_party = "neutrality" parties = { neutrality = { popularity = 0.5 } } }
+    }
+    SWE = {
+        name = "}"
+        tag = "SWE"
+        politics = { ruling_party = "democratic" }
+    }
+    "GER" = { name = "Deutsches \\" Reich" units = { division = { id = 1 } division = { id = 2 } } }
+}
+states = {
+    s1 = { owner = FIN core = { "FIN" } }
+    s2 = { owner = SWE }
+    s3 = { owner = FIN name = "#not a comment" }
+}
+countries = { ENG = { name = "{{" } }
+"""
+
+SELECTORS = [
+    "countries",
+    "countries/FIN",
+    "countries/*/name",
+    "countries/*[tag=\"SWE\"]",
+    "countries/*/politics/parties/*",
+    "countries/\"GER\"/units/division",
+    "states/*[owner=FIN]",
+    "states/*[owner=FIN]/name",
+    "missing/path",
+]
+
+def _check(path:str, selectors:list[str], chunk_size:int) -> None:
+    # Whatever extract() finds is what select() finds on the whole tree.
+    script = PDXscript(path)
+    found = PDXscript.extract(path, selectors, chunk_size = chunk_size)
+
+    assert list(found) == list(dict.fromkeys(selectors))
+
+    for selector in selectors:
+        assert [statement.get_hash() for statement in found[selector]] == [statement.get_hash() for statement in script.select(selector)], selector
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 17, 64, 1 << 20])
+def test_tricky(tmp_path, chunk_size):
+
+    path = tmp_path / "tricky.txt"
+    path.write_text(TRICKY, encoding = "utf-8")
+
+    _check(str(path), SELECTORS, chunk_size)
+
+@pytest.mark.parametrize("chunk_size", [17, 4093, 1 << 20])
+def test_save(tmp_path, chunk_size):
+
+    path = tmp_path / "save.txt"
+    path.write_text(generate("save", 1 << 17), encoding = "utf-8")
+    selectors = ["player", "countries/C0001", "countries/*/politics/ruling_party", "countries/*[capital=262]/units", "countries/C0003/variables/var_2"]
+
+    _check(str(path), selectors, chunk_size)
+
+def test_invalid_selector(tmp_path):
+
+    path = tmp_path / "tricky.txt"
+    path.write_text(TRICKY, encoding = "utf-8")
+
+    with pytest.raises(ValueError):
+        PDXscript.extract(str(path), ["countries/*[tag="])
@@ -0,0 +1,95 @@
+import pytest
+
+from pdxscript import PDXscript, Statement, diff
+
+SOURCE = """
+focus_tree = {
+    id = FIN_tree
+    focus = { id = FIN_a cost = 1 reward = { add = { value = 1 } } }
+    focus = { id = FIN_b cost = 2 reward = { add = { value = 2 } } }
+}
+country = { tag = FIN }
+"""
+
+def _getHashes(script:PDXscript) -> list:
+    # The hash of the script and of every Statement in it, depth first.
+    hashes = [script.get_hash()]
+
+    for statement in script:
+        hashes.append(statement.get_hash())
+
+        if isinstance(statement.get_value(), PDXscript):
+            hashes.extend(_getHashes(statement.get_value()))
+
+    return hashes
+
+def _getWarm() -> PDXscript:
+    script = PDXscript.loads(SOURCE)
+    _getHashes(script)
+    return script
+
+def test_formatting():
+
+    compact = PDXscript.loads(" ".join(SOURCE.split()))
+
+    assert compact.get_hash() == PDXscript.loads(SOURCE).get_hash()
+    assert PDXscript.loads(SOURCE.replace("cost = 2", "cost = 3")).get_hash() != compact.get_hash()
+    assert PDXscript.loads(SOURCE.replace("cost = 2", "cost > 2")).get_hash() != compact.get_hash()
+
+EDITS = {
+    "top" : (lambda script: script.find("country").set_value(PDXscript.loads("tag = SWE")),
+             SOURCE.replace("tag = FIN", "tag = SWE")),
+    "nested" : (lambda script: script.find("focus_tree").get_value().find_all("focus")[1].get_value().find("reward").get_value().find("add").get_value().find("value").set_value("5"),
+                SOURCE.replace("value = 2", "value = 5")),
+    "select" : (lambda script: script.select("focus_tree/focus[id=FIN_a]/reward/add/value")[0].set_value("5"),
+                SOURCE.replace("value = 1", "value = 5")),
+    "keyword" : (lambda script: script.select("*/focus/cost")[0].set_keyowrd("price"),
+                 SOURCE.replace("cost = 1", "price = 1")),
+    "operator" : (lambda script: script.select("*/focus/cost")[1].set_operator("#G"),
+                  SOURCE.replace("cost = 2", "cost > 2")),
+    "append" : (lambda script: script.find("focus_tree").get_value().find("focus").get_value().append(Statement("ai", "yes")),
+                SOURCE.replace("} } }\n    focus = { id = FIN_b", "} } ai = yes }\n    focus = { id = FIN_b")),
+    "pop" : (lambda script: script.select("focus_tree/focus")[1].get_value().pop(0),
+             SOURCE.replace("{ id = FIN_b cost = 2", "{ cost = 2")),
+}
+
+@pytest.mark.parametrize("edit", EDITS)
+def test_invalidation(edit):
+
+    function, text = EDITS[edit]
+    script = _getWarm()
+    function(script)
+
+    assert script.dumps() == PDXscript.loads(text).dumps()
+    assert _getHashes(script) == _getHashes(PDXscript.loads(text))
+
+def test_handle_after_find():
+
+    script = _getWarm()
+    tree = script.find("focus_tree")
+    focus = tree.get_value().find("focus")
+    value = focus.get_value().find("reward").get_value().find("add").get_value().find("value")
+    _getHashes(script)
+    old = (tree.get_hash(), focus.get_hash())
+
+    value.set_value("9")
+    text = SOURCE.replace("value = 1", "value = 9")
+    fresh = PDXscript.loads(text)
+
+    assert _getHashes(script) == _getHashes(fresh)
+    assert (tree.get_hash(), focus.get_hash()) != old
+    assert focus.get_hash() == fresh.select("focus_tree/focus")[0].get_hash()
+
+    assert [(change, path) for change, path, _, _ in diff(PDXscript.loads(SOURCE), script)] == [("changed", "focus_tree/focus[0]/reward/add/value")]
+
+def test_held_twice():
+
+    script = _getWarm()
+    cost = script.select("focus_tree/focus/cost")[0]
+    script.find("country").get_value().append(cost)
+    _getHashes(script)
+
+    cost.set_value("7")
+    text = SOURCE.replace("cost = 1", "cost = 7").replace("tag = FIN", "tag = FIN cost = 7")
+
+    assert _getHashes(script) == _getHashes(PDXscript.loads(text))
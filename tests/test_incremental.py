@@ -0,0 +1,63 @@
+import random
+import re
+
+import pytest
+
+from benchmarks.corpus import KINDS, generate
+from pdxscript import PDXscript
+
+ASSIGNMENT = re.compile(r"^(\s*[^\s=#\"{}]+ = )[^\s#\"{}]+$")
+
+def _getEdited(generator:random.Random, lines:list[str]) -> list[str]:
+    # One edit of a whole line that keeps the script well-formed: brackets
+    # and quotes stay balanced on every line that's touched.
+    lines = list(lines)
+    index = generator.randrange(len(lines) + 1)
+    line = lines[index] if index < len(lines) else ""
+    indent = line[:len(line) - len(line.lstrip())]
+    plain = "{" not in line and "}" not in line and line.count("\"") % 2 == 0
+    choice = generator.random()
+
+    if choice < 0.3 and ASSIGNMENT.match(line):
+        lines[index] = ASSIGNMENT.sub(lambda match: match.group(1) + str(generator.randint(0, 99)), line)
+
+    elif choice < 0.5 and plain and index < len(lines):
+        del lines[index]
+
+    elif choice < 0.6 and plain and index < len(lines):
+        lines.insert(index, line)
+
+    elif choice < 0.8:
+        lines.insert(index, f"{indent}added_{generator.randint(0, 9)} = yes")
+
+    else:
+        lines.insert(index, f"{indent}added = {{ flag = {generator.randint(0, 9)} # }}")
+        lines.insert(index + 1, f"{indent}}}")
+
+    return lines
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_reload(kind, tmp_path):
+
+    generator = random.Random(kind)
+    path = tmp_path / f"{kind}.txt"
+    lines = generate(kind, 1 << 15).split("\n")
+    path.write_text("\n".join(lines), encoding = "utf-8")
+    script = PDXscript(str(path), incremental = True)
+
+    for step in range(40):
+        old = lines
+
+        for _ in range(generator.randint(1, 3)):
+            lines = _getEdited(generator, lines)
+
+        path.write_text("\n".join(lines), encoding = "utf-8")
+
+        assert script.reload() == (lines != old)
+
+        full = PDXscript(str(path))
+
+        assert script.dumps() == full.dumps(), f"{kind} step {step}"
+        assert script.get_hash() == full.get_hash()
+
+    assert not script.reload()
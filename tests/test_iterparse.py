@@ -0,0 +1,71 @@
+import pytest
+
+from benchmarks.corpus import KINDS, generate
+from pdxscript import PDXscript, ScriptNotClosedException
+
+TRICKY = """
+# A comment with a } and a { in it
+flag = yes
+countries = {
+    FIN = { name = "Suomi { not a block" capital = 111 # closing } in a comment
+    }
+    SWE = { name = "}" core = { "SWE" "NOR" } }
+}
+"quoted" = "value # not a comment"
+empty = { }
+list = { 1 2 3 }
+last = { a = { b = { c = d } } }
+"""
+
+def _check(path:str, chunk_size:int) -> None:
+    # iterparse() yields what iterating the whole parse does.
+    script = PDXscript(path)
+    statements = list(PDXscript.iterparse(path, chunk_size = chunk_size))
+
+    assert len(statements) == len(script)
+    assert [statement.get_hash() for statement in statements] == [statement.get_hash() for statement in script]
+
+    streamed = PDXscript()
+
+    for statement in statements:
+        streamed.append(statement)
+
+    assert streamed.dumps() == script.dumps()
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 17, 64, 1 << 20])
+def test_tricky(tmp_path, chunk_size):
+
+    path = tmp_path / "tricky.txt"
+    path.write_text(TRICKY, encoding = "utf-8")
+
+    _check(str(path), chunk_size)
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_corpus(tmp_path, kind):
+
+    path = tmp_path / f"{kind}.txt"
+    path.write_text(generate(kind, 1 << 15), encoding = "utf-8")
+
+    _check(str(path), 4093)
+
+def test_streaming(tmp_path):
+
+    # The first Statements come before the end of the file is read.
+    path = tmp_path / "unclosed.txt"
+    path.write_text("a = 1\nb = { c = 2 }\nd = { e = { f = 3 }\n", encoding = "utf-8")
+    statements = PDXscript.iterparse(str(path), chunk_size = 4)
+
+    assert next(statements).get_keyword() == "a"
+    assert next(statements).get_keyword() == "b"
+
+    with pytest.raises(ScriptNotClosedException):
+        next(statements)
+
+@pytest.mark.parametrize("text", ["a = {", "a = { b = { c = 1 }", "a = 1 b = { 1 2"])
+def test_not_closed(tmp_path, text):
+
+    path = tmp_path / "unclosed.txt"
+    path.write_text(text, encoding = "utf-8")
+
+    with pytest.raises(ScriptNotClosedException):
+        list(PDXscript.iterparse(str(path), chunk_size = 3))
@@ -0,0 +1,138 @@
+import pytest
+
+from pdxscript import Overlay, PDXscript
+
+LAYERS = {
+    "vanilla" : {
+        "events/finland.txt" : "country_event = { id = fin.1 title = vanilla } country_event = { id = fin.2 title = vanilla }",
+        "events/sweden.txt" : "country_event = { id = swe.1 title = vanilla }",
+        "events/sub/deep.txt" : "country_event = { id = deep.1 title = vanilla }",
+        "common/national_focus/finland.txt" : """
+focus_tree = {
+    id = finnish_focus
+    focus = { id = FIN_a cost = 1 }
+    focus = { id = FIN_b cost = 2 }
+}
+""",
+        "common/national_focus/generic.txt" : "focus_tree = { id = generic_focus focus = { id = GEN_a cost = 1 } }",
+    },
+    "first" : {
+        "events/sweden.txt" : "country_event = { id = swe.1 title = first }",
+        "events/first.txt" : "country_event = { id = fin.2 title = first } news_event = { id = fin.2 title = news }",
+        "common/national_focus/more.txt" : "focus_tree = { id = more_focus focus = { id = FIN_b cost = 20 } focus = { id = MORE_a } }",
+    },
+    "second" : {
+        "events/second.txt" : "country_event = { id = fin.2 title = second }",
+        "common/national_focus/zzz.txt" : "focus_tree = { id = last_focus focus = { id = MORE_a cost = 30 } }",
+    },
+}
+
+def _getOverlay(tmp_path, replace_paths:dict[str,list[str]] = {}) -> Overlay:
+    overlay = Overlay()
+
+    for name, files in LAYERS.items():
+
+        for relative, text in files.items():
+            path = tmp_path / name / relative
+            path.parent.mkdir(parents = True, exist_ok = True)
+            path.write_text(text, encoding = "utf-8")
+
+        overlay.add_layer(name, str(tmp_path / name), replace_paths.get(name, ()))
+
+    return overlay
+
+def _getTitles(scripts:dict[str,PDXscript]) -> dict[str,list[tuple[str,str]]]:
+    return {path : [(statement.get_value().find("id").get_value(), statement.get_value().find("title").get_value()) for statement in script]
+            for path, script in scripts.items()}
+
+def test_precedence(tmp_path):
+
+    overlay = _getOverlay(tmp_path)
+    events = overlay.resolve("events/**/*.txt")
+
+    assert _getTitles(events) == {
+        "events/finland.txt" : [("fin.1", "vanilla")],
+        "events/first.txt" : [("fin.2", "news")],
+        "events/second.txt" : [("fin.2", "second")],
+        "events/sub/deep.txt" : [("deep.1", "vanilla")],
+        "events/sweden.txt" : [("swe.1", "first")],
+    }
+    assert overlay.get_file_origin("events/sweden.txt") == "first"
+    assert overlay.get_file_origin("events\\finland.txt") == "vanilla"
+    assert overlay.get_overrides() == [
+        (("country_event", "fin.2"), ("first", "events/first.txt"), ("vanilla", "events/finland.txt")),
+        (("country_event", "fin.2"), ("second", "events/second.txt"), ("first", "events/first.txt")),
+    ]
+
+    statement = events["events/second.txt"][0]
+
+    assert overlay.get_origin(statement) == ("second", "events/second.txt")
+    assert overlay.get_origin(statement.get_value().find("title")) == ("second", "events/second.txt")
+    assert overlay.get_origin(PDXscript.loads("a = b")[0]) is None
+
+def test_replace_path(tmp_path):
+
+    overlay = _getOverlay(tmp_path, {"second" : ["events/"]})
+    events = overlay.resolve("events/**/*.txt")
+
+    # Files directly in the replaced directory of earlier layers are dropped,
+    # the ones in sub directories aren't.
+    assert _getTitles(events) == {
+        "events/second.txt" : [("fin.2", "second")],
+        "events/sub/deep.txt" : [("deep.1", "vanilla")],
+    }
+    assert overlay.get_overrides() == []
+
+    overlay = _getOverlay(tmp_path, {"first" : ["events"]})
+
+    assert list(overlay.resolve("events/**/*.txt")) == ["events/first.txt", "events/second.txt", "events/sub/deep.txt", "events/sweden.txt"]
+    assert overlay.get_file_origin("events/sweden.txt") == "first"
+
+def test_add_mod(tmp_path):
+
+    overlay = _getOverlay(tmp_path)
+    descriptor = tmp_path / "mod/descriptor.mod"
+    (tmp_path / "mod/events").mkdir(parents = True)
+    (tmp_path / "mod/events/mod.txt").write_text("country_event = { id = mod.1 title = mod }", encoding = "utf-8")
+    descriptor.write_text("name = \"My Mod\"\nreplace_path = \"events\"\nversion = \"1.0\"\n", encoding = "utf-8")
+    overlay.add_mod(str(descriptor))
+
+    assert _getTitles(overlay.resolve("events/*.txt")) == {"events/mod.txt" : [("mod.1", "mod")]}
+    assert overlay.get_file_origin("events/mod.txt") == "My Mod"
+
+def test_nested_objects(tmp_path):
+
+    overlay = _getOverlay(tmp_path)
+    focuses = overlay.resolve("common/national_focus/*.txt", objects = "focus_tree/focus")
+
+    def _getFocuses(path):
+        return [(focus.get_value().find("id").get_value(), focus.get_value().find("cost").get_value() if focus.get_value().find("cost") else None)
+                for focus in focuses[path].select("focus_tree/focus")]
+
+    assert _getFocuses("common/national_focus/finland.txt") == [("FIN_a", "1")]
+    assert _getFocuses("common/national_focus/generic.txt") == [("GEN_a", "1")]
+    assert _getFocuses("common/national_focus/more.txt") == [("FIN_b", "20")]
+    assert _getFocuses("common/national_focus/zzz.txt") == [("MORE_a", "30")]
+    assert overlay.get_overrides() == [
+        (("focus", "FIN_b"), ("first", "common/national_focus/more.txt"), ("vanilla", "common/national_focus/finland.txt")),
+        (("focus", "MORE_a"), ("second", "common/national_focus/zzz.txt"), ("first", "common/national_focus/more.txt")),
+    ]
+
+    tree = focuses["common/national_focus/finland.txt"][0]
+
+    assert tree.get_value().find("id").get_value() == "finnish_focus"
+    assert overlay.get_origin(tree) == ("vanilla", "common/national_focus/finland.txt")
+    assert overlay.get_origin(tree.get_value().find("focus")) == ("vanilla", "common/national_focus/finland.txt")
+
+    # Top-level objects by default: the trees have different ids.
+    overlay.resolve("common/national_focus/*.txt")
+
+    assert overlay.get_overrides() == []
+
+@pytest.mark.parametrize("objects", ["*/focus", "focus_tree/*"])
+def test_nested_wildcard(tmp_path, objects):
+
+    overlay = _getOverlay(tmp_path)
+    focuses = overlay.resolve("common/national_focus/*.txt", objects = objects)
+
+    assert sum(len(script.select("focus_tree/focus")) for script in focuses.values()) == 4
@@ -0,0 +1,109 @@
+import pytest
+
+from pdxscript import PDXscript, Statement
+
+SOURCE = """
+focus_tree = {
+    id = FIN_tree
+    focus = { id = FIN_a cost = 1 reward = { add = yes } }
+    focus = { id = FIN_b cost = 2 reward = { add = no } }
+    focus = { id = FIN_c cost = 1 }
+}
+country = { tag = FIN }
+"""
+
+KEYWORDS = ["focus_tree", "country", "renamed", "added"]
+
+PATHS = [
+    "focus_tree/focus",
+    "focus_tree/focus[id=FIN_a]",
+    "focus_tree/focus[id=FIN_x]",
+    "focus_tree/focus[cost=1]",
+    "focus_tree/*[cost=3]",
+    "*/focus/reward",
+    "focus_tree/renamed",
+    "*[tag=FIN]",
+]
+
+def _getResults(script:PDXscript) -> tuple:
+    # What find(), find_all() and select() give, as the keyword and hash of
+    # each Statement found.
+    def _get(statements):
+        return [(statement.get_keyword(), statement.get_hash()) for statement in statements if statement is not None]
+
+    return ([_get([script.find(keyword)]) for keyword in KEYWORDS],
+            [_get(script.find_all(keyword)) for keyword in KEYWORDS],
+            [_get(script.select(path)) for path in PATHS])
+
+def _getWarm() -> PDXscript:
+    script = PDXscript.loads(SOURCE)
+    _getResults(script)
+    return script
+
+def test_select():
+
+    script = PDXscript.loads(SOURCE)
+
+    assert [statement.get_value().find("id").get_value() for statement in script.select("focus_tree/focus[cost=1]")] == ["FIN_a", "FIN_c"]
+    assert script.select("focus_tree/focus[id=FIN_b]/reward/add")[0].get_value() == "no"
+    assert len(script.select("*/*")) == 5
+
+    with pytest.raises(ValueError):
+        script.select("focus_tree/focus[id=")
+
+EDITS = {
+    "value" : (lambda script: script.select("focus_tree/focus[id=FIN_a]/cost")[0].set_value("3"),
+               SOURCE.replace("id = FIN_a cost = 1", "id = FIN_a cost = 3")),
+    "id" : (lambda script: script.select("focus_tree/focus/id")[1].set_value("FIN_x"),
+            SOURCE.replace("id = FIN_b", "id = FIN_x")),
+    "keyword" : (lambda script: script.find("focus_tree").get_value().find("focus").set_keyowrd("renamed"),
+                 SOURCE.replace("focus = { id = FIN_a", "renamed = { id = FIN_a")),
+    "top keyword" : (lambda script: script.find("country").set_keyowrd("renamed"),
+                     SOURCE.replace("country =", "renamed =")),
+    "nested" : (lambda script: script.find("focus_tree").get_value().find_all("focus")[2].get_value().find("cost").set_value("3"),
+                SOURCE.replace("id = FIN_c cost = 1", "id = FIN_c cost = 3")),
+    "nested tag" : (lambda script: script.find("country").get_value().find("tag").set_value("SWE"),
+                    SOURCE.replace("tag = FIN", "tag = SWE")),
+    "block" : (lambda script: script.find("focus_tree").get_value().find("focus").set_value(PDXscript.loads("id = FIN_x cost = 1")),
+               SOURCE.replace("{ id = FIN_a cost = 1 reward = { add = yes } }", "{ id = FIN_x cost = 1 }")),
+    "append" : (lambda script: script.find("focus_tree").get_value().append(Statement("focus", PDXscript.loads("id = FIN_d cost = 1"))),
+                SOURCE.replace("    focus = { id = FIN_c cost = 1 }\n", "    focus = { id = FIN_c cost = 1 }\n    focus = { id = FIN_d cost = 1 }\n")),
+    "insert" : (lambda script: script.insert(Statement("added", "yes"), 0),
+                "added = yes\n" + SOURCE),
+    "pop" : (lambda script: script.find("focus_tree").get_value().pop(1),
+             SOURCE.replace("    focus = { id = FIN_a cost = 1 reward = { add = yes } }\n", "")),
+    "remove" : (lambda script: script.remove(script.find("country")),
+                SOURCE.replace("country = { tag = FIN }\n", "")),
+    "setitem" : (lambda script: script.find("focus_tree").get_value().__setitem__(3, Statement("renamed", "yes")),
+                 SOURCE.replace("focus = { id = FIN_c cost = 1 }", "renamed = yes")),
+}
+
+@pytest.mark.parametrize("edit", EDITS)
+def test_invalidation(edit):
+
+    function, text = EDITS[edit]
+    script = _getWarm()
+    function(script)
+
+    assert script.dumps() == PDXscript.loads(text).dumps()
+    assert _getResults(script) == _getResults(PDXscript.loads(text))
+
+def test_handle_after_find():
+
+    script = _getWarm()
+    focus = script.find("focus_tree").get_value().find_all("focus")[1]
+    reward = focus.get_value().find("reward")
+    _getResults(script)
+
+    reward.get_value().find("add").set_value("yes")
+    focus.get_value().find("id").set_value("FIN_x")
+    focus.get_value().find("cost").set_value("1")
+    text = SOURCE.replace("{ id = FIN_b cost = 2 reward = { add = no } }", "{ id = FIN_x cost = 1 reward = { add = yes } }")
+
+    assert _getResults(script) == _getResults(PDXscript.loads(text))
+
+    reward.set_keyowrd("renamed")
+    text = text.replace("{ id = FIN_x cost = 1 reward =", "{ id = FIN_x cost = 1 renamed =")
+
+    assert _getResults(script) == _getResults(PDXscript.loads(text))
+    assert script.dumps() == PDXscript.loads(text).dumps()
@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+from pdxscript import SymbolIndex, SymbolRule
+
+FILES = {
+    "common/national_focus/finland.txt" : """
+focus_tree = {
+    id = finnish_focus
+    focus = { id = FIN_a completion_reward = { country_event = finland.1 add_ideas = FIN_idea } }
+    focus = { id = FIN_b prerequisite = { focus = FIN_a } }
+}
+""",
+    "events/finland.txt" : """
+country_event = {
+    id = finland.1
+    trigger = { has_completed_focus = FIN_b is_ai = yes }
+    option = { set_country_flag = FIN_flag my_effect = yes }
+}
+""",
+    "common/ideas/finland.txt" : "ideas = { country = { FIN_idea = { modifier = { stability_factor = 0.1 } } } }",
+    "common/scripted_effects/effects.txt" : "my_effect = { add_stability = 0.1 }",
+    "history/common/ideas/not_ideas.txt" : "ideas = { country = { not_an_idea = { cost = 1 } } }",
+}
+
+def _write(root, files:dict[str,str]) -> None:
+    for relative, text in files.items():
+        path = root / relative
+        path.parent.mkdir(parents = True, exist_ok = True)
+        path.write_text(text, encoding = "utf-8")
+
+def _getNames(index:SymbolIndex) -> dict:
+    return {(kind, role) : index.get_names(kind, role)
+            for kind in ("focus", "event", "idea", "country_flag", "scripted_effect")
+            for role in ("definition", "reference")}
+
+def test_build(tmp_path):
+
+    _write(tmp_path, FILES)
+    index = SymbolIndex()
+
+    assert index.update(str(tmp_path)) == len(FILES)
+    assert _getNames(index) == {
+        ("focus", "definition") : ["FIN_a", "FIN_b"],
+        ("focus", "reference") : ["FIN_a", "FIN_b"],
+        ("event", "definition") : ["finland.1"],
+        ("event", "reference") : ["finland.1"],
+        ("idea", "definition") : ["FIN_idea"],
+        ("idea", "reference") : ["FIN_idea"],
+        ("country_flag", "definition") : ["FIN_flag"],
+        ("country_flag", "reference") : [],
+        ("scripted_effect", "definition") : ["my_effect"],
+        ("scripted_effect", "reference") : [],
+    }
+
+    focus = str(tmp_path / "common/national_focus/finland.txt")
+
+    assert index.get_definitions("focus", "FIN_a") == [(focus, 0, "focus_tree/focus/id")]
+    assert index.get_references("event", "finland.1") == [(focus, 0, "focus_tree/focus/completion_reward/country_event")]
+    assert index.get_files() == sorted(str(tmp_path / relative) for relative in FILES)
+
+@pytest.mark.parametrize("path, matching", [
+    ("common/ideas/*.txt", ["common/ideas/finland.txt"]),
+    ("*/ideas/*.txt", ["common/ideas/finland.txt"]),
+    ("*/*/ideas/*.txt", ["history/common/ideas/not_ideas.txt"]),
+    ("ideas/*.txt", []),
+])
+def test_rule_path(tmp_path, path, matching):
+
+    _write(tmp_path, FILES)
+    index = SymbolIndex(rules = [SymbolRule("idea", "definition", "*", depth = 3, path = path)])
+    index.update(str(tmp_path))
+
+    assert sorted({location for name in index.get_names("idea") for location, _, _ in index.get_definitions("idea", name)}) == [str(tmp_path / relative) for relative in matching]
+
+def test_scripted_effect_references(tmp_path):
+
+    _write(tmp_path, FILES)
+    index = SymbolIndex(rules = [SymbolRule("scripted_effect", "reference", "*", value = "yes")])
+    index.update(str(tmp_path))
+
+    assert index.get_names("scripted_effect", "reference") == ["is_ai", "my_effect"]
+
+def test_update(tmp_path):
+
+    _write(tmp_path, FILES)
+    index = SymbolIndex(str(tmp_path / "cache/symbols.idx"))
+    index.update(str(tmp_path))
+
+    assert index.update(str(tmp_path)) == 0
+
+    # A changed file is read again, and only that one.
+    _write(tmp_path, {"events/finland.txt" : FILES["events/finland.txt"].replace("finland.1", "finland.22")})
+
+    assert index.update(str(tmp_path)) == 1
+    assert index.get_definitions("event", "finland.1") == []
+    assert [path for path, _, _ in index.get_definitions("event", "finland.22")] == [str(tmp_path / "events/finland.txt")]
+    assert index.get_references("event", "finland.1") != []
+
+    # A removed file, and files that don't match the pattern anymore, are
+    # dropped.
+    os.remove(tmp_path / "common/ideas/finland.txt")
+
+    assert index.update(str(tmp_path), pattern = "common/**/*.txt") == 0
+    assert index.get_files() == sorted(str(tmp_path / relative) for relative in ("common/national_focus/finland.txt", "common/scripted_effects/effects.txt"))
+    assert index.get_names("idea") == []
+    assert index.get_names("event") == []
+
+    index.save()
+    loaded = SymbolIndex(str(tmp_path / "cache/symbols.idx"))
+
+    assert loaded.get_files() == index.get_files()
+    assert _getNames(loaded) == _getNames(index)
+    assert loaded.update(str(tmp_path), pattern = "common/**/*.txt") == 0
+
+    # An index saved with other rules is read again from the files.
+    other = SymbolIndex(str(tmp_path / "cache/symbols.idx"), rules = [SymbolRule("focus", "definition", "id")])
+
+    assert other.get_files() == []
+
+def test_errors(tmp_path):
+
+    _write(tmp_path, {"broken.txt" : "a = { b = 1 } }", "good.txt" : "set_country_flag = FLAG"})
+    index = SymbolIndex()
+    failed = {}
+
+    assert index.update(str(tmp_path), errors = failed) == 1
+    assert list(failed) == [str(tmp_path / "broken.txt")]
+    assert index.get_names("country_flag") == ["FLAG"]
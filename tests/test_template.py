@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from pdxscript import PDXscript, Template, ViolatedPathException
+
+SOURCE = """
+$TAG$_focus = {
+    id = $TAG$_industry
+    cost = $COST$
+    text = "{ $TAG$ } {{0}}"
+    allowed = { original_tag = $TAG$ }
+    effect = { add_ideas = { $TAG$_idea other_idea } }
+    scripted = { $PARAMETER$ = yes }
+}
+loose = "$COST$ }{"
+"""
+
+VALUES = [
+    {"TAG" : "FIN", "COST" : 10},
+    {"TAG" : "SWE", "COST" : 2.5, "PARAMETER" : "unused"},
+    {"TAG" : "{x}", "COST" : "}"},
+]
+
+@pytest.mark.parametrize("values", VALUES)
+def test_render(values):
+
+    template = Template(PDXscript.loads(SOURCE), names = ["TAG", "COST"])
+    text = template.render(values)
+
+    assert text == template.render_script(values).dumps()
+    assert "$PARAMETER$" in text
+    assert "$TAG$" not in text and "$COST$" not in text
+    assert "{{0}}" in text
+
+def test_render_all_names():
+
+    template = Template(PDXscript.loads(SOURCE))
+    values = dict(VALUES[0], PARAMETER = "flag")
+
+    assert template.get_names() == {"TAG", "COST", "PARAMETER"}
+    assert template.render(values) == template.render_script(values).dumps()
+    assert "flag = yes" in template.render(values)
+
+    with pytest.raises(KeyError):
+        template.render(VALUES[0])
+
+def test_render_script_is_separate():
+
+    script = PDXscript.loads(SOURCE)
+    template = Template(script)
+    values = dict(VALUES[0], PARAMETER = "flag")
+    text = template.render(values)
+    first = template.render_script(values)
+    first[0].get_value()[1].set_value("99")
+
+    assert template.render_script(values).dumps() == text
+    assert script.dumps() == PDXscript.loads(SOURCE).dumps()
+
+def test_write(tmp_path):
+
+    template = Template(PDXscript.loads(SOURCE), names = ["TAG", "COST"])
+    path = str(tmp_path / "FIN.txt")
+    template.write(path, VALUES[0])
+
+    assert PDXscript(path).dumps() == template.render_script(VALUES[0]).dumps()
+
+    os.utime(path, ns = (0, 0))
+    template.write(path, VALUES[0])
+
+    assert os.stat(path).st_mtime_ns == 0
+
+    template.write(path, VALUES[1])
+
+    assert os.stat(path).st_mtime_ns != 0
+    assert os.listdir(tmp_path) == ["FIN.txt"]
+
+    with pytest.raises(ViolatedPathException):
+        template.write(str(tmp_path / "Steam/steamapps/common/Hearts of Iron IV/a.txt"), VALUES[0])
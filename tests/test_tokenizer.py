@@ -0,0 +1,81 @@
+import io
+import random
+import time
+
+import pytest
+
+from benchmarks.corpus import KINDS, generate
+from pdxscript import PDXscript
+
+PIECES = (
+    "a", "FIN_x", "1.5", "-2", "@cost", "x.y", "Öst",
+    "=", "<", ">", " = ", "{", "}", "{ ", " }", "a={b=1}", "a = {c}",
+    "\"q w\"", "\"a{b}\"", "\"}\"", "\"x \\\" y\"", "\"\\\\\"", "\"#\"", "\"\"",
+    "# c {", "#}\"", " # x = 1",
+    " ", "\t", "\n", "\n\n", "\r", "\r\n", "\r\n\r\n",
+)
+
+def _getTokens(text:str) -> tuple[list[str],list[str]]:
+    # Line breaks as reading a file in text mode gives them, like the text
+    # both tokenizers get from the readers. The last line is left as it is.
+    text = io.StringIO(text, newline = None).read()
+    parser = PDXscript()
+
+    return parser._getToken(text.splitlines(keepends = True)), parser._scanToken(text)
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_corpus(kind):
+
+    legacy, tokens = _getTokens(generate(kind, 1 << 16))
+
+    assert tokens == legacy
+
+@pytest.mark.parametrize("seed", range(8))
+def test_snippets(seed):
+
+    generator = random.Random(seed)
+
+    for _ in range(500):
+        text = "".join(generator.choice(PIECES) for _ in range(generator.randint(0, 30)))
+        legacy, tokens = _getTokens(text)
+
+        assert tokens == legacy, repr(text)
+
+@pytest.mark.parametrize("text", [
+    "a = 1",
+    "a = \"x y\"",
+    "a = { b = 1 }",
+    "a = 1 # no line break",
+    "a = 1\r\nb = 2",
+    "a = 1\rb = 2\r",
+    "a = \"unterminated",
+])
+def test_last_line(text):
+
+    legacy, tokens = _getTokens(text)
+
+    assert tokens == legacy
+
+@pytest.mark.parametrize("kind", ["strings", "save", "comments"])
+def test_not_slower(kind):
+
+    # The corpora where quotes and comments leave the bulk split. The best
+    # of a few runs, so the check holds on a busy machine.
+    text = generate(kind, 1 << 20)
+    lines = text.splitlines(keepends = True)
+    parser = PDXscript()
+
+    def _getTime(function) -> float:
+        best = float("inf")
+
+        for _ in range(5):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+
+        return best
+
+    legacy = _getTime(lambda: parser._getToken(lines))
+    scan = _getTime(lambda: parser._scanToken(text))
+
+    assert scan < legacy * 1.25, f"{kind}: {scan:.3f}s against {legacy:.3f}s"
@@ -0,0 +1,139 @@
+import os
+import threading
+
+import pytest
+
+from pdxscript import PDXscript, Workspace
+
+def _write(root, relative:str, text:str) -> None:
+    # A new mtime every time, so a rewrite with the same size is seen.
+    path = root / relative
+    path.parent.mkdir(parents = True, exist_ok = True)
+    mtime = path.stat().st_mtime_ns + 10 ** 9 if path.exists() else None
+    path.write_text(text, encoding = "utf-8")
+
+    if mtime is not None:
+        os.utime(path, ns = (mtime, mtime))
+
+@pytest.fixture
+def workspace(tmp_path):
+    _write(tmp_path, "common/a.txt", "a = { value = 1 }\n")
+    _write(tmp_path, "common/b.txt", "b = yes\n")
+    _write(tmp_path, "other.txt", "ignored = yes\n")
+    return Workspace(str(tmp_path), "common/*.txt", inotify = False)
+
+def test_initial(workspace):
+
+    assert list(workspace.get_scripts()) == ["common/a.txt", "common/b.txt"]
+    assert workspace.get("common\\a.txt").find("a").get_value().find("value").get_value() == "1"
+    assert workspace.get("other.txt") is None
+    assert workspace.get_errors() == {}
+    assert workspace.poll() is None
+
+def test_add_change_remove(workspace, tmp_path):
+
+    events = []
+    workspace.subscribe(events.append)
+
+    _write(tmp_path, "common/c.txt", "c = yes\n")
+    _write(tmp_path, "common/a.txt", "a = { value = 2 }\n")
+    os.remove(tmp_path / "common/b.txt")
+    event = workspace.poll()
+
+    assert events == [event]
+    assert list(event["added"]) == ["common/c.txt"]
+    assert list(event["changed"]) == ["common/a.txt"]
+    assert event["removed"] == ["common/b.txt"]
+    assert event["failed"] == {}
+    assert list(workspace.get_scripts()) == ["common/a.txt", "common/c.txt"]
+    assert workspace.get("common/a.txt") is event["changed"]["common/a.txt"]
+    assert workspace.get("common/a.txt").dumps() == PDXscript.loads("a = { value = 2 }").dumps()
+
+    # A file written again with the same text isn't a change.
+    _write(tmp_path, "common/c.txt", "c = yes\n")
+
+    assert workspace.poll() is None
+    assert len(events) == 1
+
+    workspace.unsubscribe(events.append)
+    _write(tmp_path, "common/c.txt", "c = no\n")
+
+    assert workspace.poll() is not None
+    assert len(events) == 1
+
+def test_failed(workspace, tmp_path):
+
+    last = workspace.get("common/a.txt")
+    _write(tmp_path, "common/a.txt", "a = { value = 3 } }\n")
+    event = workspace.poll()
+
+    assert list(event["failed"]) == ["common/a.txt"]
+    assert event["changed"] == {}
+    assert list(workspace.get_errors()) == ["common/a.txt"]
+    assert workspace.get("common/a.txt") is last
+    assert workspace.poll() is None
+    assert list(workspace.get_errors()) == ["common/a.txt"]
+
+    _write(tmp_path, "common/a.txt", "a = { value = 4 }\n")
+    event = workspace.poll()
+
+    assert list(event["changed"]) == ["common/a.txt"]
+    assert workspace.get_errors() == {}
+    assert workspace.get("common/a.txt").dumps() == PDXscript.loads("a = { value = 4 }").dumps()
+
+    # A removed file drops its error too.
+    _write(tmp_path, "common/b.txt", "b = { } }\n")
+    workspace.poll()
+    os.remove(tmp_path / "common/b.txt")
+    workspace.poll()
+
+    assert workspace.get_errors() == {}
+
+def test_snapshot(workspace, tmp_path):
+
+    scripts = workspace.get_scripts()
+    old = workspace.get("common/a.txt")
+    text = old.dumps()
+    _write(tmp_path, "common/a.txt", "a = { value = 5 }\nadded = yes\n")
+    _write(tmp_path, "common/d.txt", "d = yes\n")
+    workspace.poll()
+
+    assert old.dumps() == text
+    assert old.find("added") is None
+    assert scripts["common/a.txt"] is old
+    assert list(scripts) == ["common/a.txt", "common/b.txt"]
+    assert workspace.get("common/a.txt") is not old
+    assert workspace.get("common/a.txt").find("added") is not None
+    assert scripts["common/b.txt"] is workspace.get("common/b.txt")
+
+@pytest.mark.parametrize("inotify", [False, True])
+def test_thread(tmp_path, inotify):
+
+    _write(tmp_path, "a.txt", "a = 1\n")
+    workspace = Workspace(str(tmp_path), "*.txt", interval = 0.05, inotify = inotify)
+    seen = threading.Event()
+    workspace.subscribe(lambda event: seen.set() if "a.txt" in event["changed"] else None)
+    workspace.start()
+
+    try:
+        _write(tmp_path, "a.txt", "a = 2\n")
+
+        assert seen.wait(10)
+
+    finally:
+        workspace.stop()
+
+    def _fail(event):
+        raise RuntimeError("subscriber failed")
+
+    workspace.subscribe(_fail)
+    workspace.start()
+    _write(tmp_path, "a.txt", "a = 3\n")
+
+    while workspace._thread.is_alive():
+        workspace._thread.join(0.05)
+
+    with pytest.raises(RuntimeError):
+        workspace.stop()
+
+    workspace.stop()
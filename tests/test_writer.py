@@ -0,0 +1,98 @@
+import os
+import stat
+
+import pytest
+
+from pdxscript import PDXscript, ViolatedPathException, write_many
+from pdxscript import writer
+
+def _getScripts(directory, count:int = 3) -> dict[str,PDXscript]:
+    return {str(directory / f"{index}.txt") : PDXscript.loads(f"id = {index} name = \"file {index}\"") for index in range(count)}
+
+def test_skip_unchanged(tmp_path):
+
+    scripts = _getScripts(tmp_path)
+    summary = write_many(scripts, workers = 1)
+
+    assert summary["written"] == list(scripts)
+    assert summary["skipped"] == []
+
+    for path, script in scripts.items():
+        with open(path, "rb") as file:
+            assert file.read() == script.dumps().encode("utf-8-sig")
+
+    first = str(tmp_path / "0.txt")
+    os.utime(first, ns = (0, 0))
+    scripts[first] = PDXscript.loads("id = 0 name = \"changed\"")
+    summary = write_many(scripts, workers = 2)
+
+    assert summary["written"] == [first]
+    assert summary["skipped"] == list(scripts)[1:]
+    assert os.stat(first).st_mtime_ns != 0
+    assert PDXscript(first).dumps() == scripts[first].dumps()
+
+    os.utime(first, ns = (0, 0))
+    summary = write_many(scripts)
+
+    assert summary["written"] == []
+    assert os.stat(first).st_mtime_ns == 0
+
+def test_atomic_replace(tmp_path, monkeypatch):
+
+    path = str(tmp_path / "a.txt")
+    write_many({path : PDXscript.loads("a = 1")})
+    inode = os.stat(path).st_ino
+
+    write_many({path : PDXscript.loads("a = 2")})
+
+    assert os.stat(path).st_ino != inode
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+    def _replace(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(writer.os, "replace", _replace)
+    failed = {}
+    summary = write_many({path : PDXscript.loads("a = 3")}, errors = failed)
+
+    assert summary["failed"] == failed
+    assert isinstance(failed[path], OSError)
+    assert PDXscript(path).dumps() == PDXscript.loads("a = 2").dumps()
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+@pytest.mark.skipif(os.name == "nt", reason = "no POSIX permissions")
+def test_permissions(tmp_path):
+
+    old = tmp_path / "old.txt"
+    new = tmp_path / "new.txt"
+    old.write_text("a = 0", encoding = "utf-8")
+    os.chmod(old, 0o604)
+    umask = os.umask(0o027)
+
+    try:
+        write_many({str(old) : PDXscript.loads("a = 1"), str(new) : PDXscript.loads("a = 1")})
+
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(os.stat(old).st_mode) == 0o604
+    assert stat.S_IMODE(os.stat(new).st_mode) == 0o640
+
+def test_game_path(tmp_path):
+
+    game = str(tmp_path / "Steam/steamapps/common/Hearts of Iron IV/common/a.txt")
+    other = str(tmp_path / "b.txt")
+    scripts = {game : PDXscript.loads("a = 1"), other : PDXscript.loads("b = 1")}
+
+    with pytest.raises(ViolatedPathException):
+        write_many(scripts)
+
+    assert os.path.exists(other)
+    os.remove(other)
+
+    failed = {}
+    summary = write_many(scripts, workers = 1, errors = failed)
+
+    assert summary["written"] == [other]
+    assert isinstance(failed[game], ViolatedPathException)
+    assert not os.path.exists(os.path.dirname(game))